@@ -1,24 +1,394 @@
 from __future__ import annotations
 
+import atexit
+import gzip
+import hashlib
 import json
+import os
+import queue
+import threading
+import time
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
+
+from app import metrics
 
 AUDIT_LOG_PATH = Path("logs/audit.log.jsonl")
+AUDIT_QUEUE_MAX = 10000
+AUDIT_BATCH_MAX = 1000
+AUDIT_FLUSH_INTERVAL_SECONDS = float(
+    os.environ.get("CHECKSUM_REGISTRY_AUDIT_FLUSH_INTERVAL", "0.05")
+)
+# "flush": バッチごとに OS へ書き出す / "fsync": バッチごとに fsync まで行う
+AUDIT_DURABILITY = os.environ.get("CHECKSUM_REGISTRY_AUDIT_DURABILITY", "flush")
+# 現行ファイルがこのサイズ・経過時間を超えたら圧縮セグメントへ切り出す
+AUDIT_ROTATE_BYTES = int(os.environ.get("CHECKSUM_REGISTRY_AUDIT_ROTATE_BYTES", 64 * 1024**2))
+AUDIT_ROTATE_SECONDS = float(os.environ.get("CHECKSUM_REGISTRY_AUDIT_ROTATE_SECONDS", 86400))
+SEGMENT_SUFFIX = ".jsonl.gz"
+# 圧縮は書き込みスレッドとは別のスレッドで行う。9 より速く、圧縮率の差は小さい
+SEGMENT_COMPRESSLEVEL = 6
+SEGMENT_INDEX_SUFFIX = ".index.json"
+RAW_SEGMENT_SUFFIX = ".jsonl"
+
+# セグメントの切り出しと、問い合わせ時の（セグメント一覧 + 現行ファイル）の取得を排他する
+rotation_lock = threading.Lock()
 
 
 def _utc_now_iso8601_seconds() -> str:
     return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def log_event(action: str, status: str, details: dict[str, Any] | None = None) -> None:
+def segments_dir(path: Path) -> Path:
+    # logs/audit.log.jsonl -> logs/audit.log.segments/
+    return path.with_name(path.name.removesuffix(".jsonl") + ".segments")
+
+
+def _line_timestamp(line: str) -> str | None:
+    try:
+        return str(json.loads(line)["timestamp_utc"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _first_timestamp(path: Path) -> str | None:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return _line_timestamp(f.readline())
+    except FileNotFoundError:
+        return None
+
+
+def _age_seconds(timestamp_utc: str) -> float:
+    started = datetime.strptime(timestamp_utc, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=UTC)
+    return (datetime.now(UTC) - started).total_seconds()
+
+
+def compress_segment(raw_path: Path) -> Path:
+    # 切り出した JSONL を gzip へ圧縮し、時刻範囲・action/status 件数・sha256 の索引を並べて置く。
+    # 索引を書いた後に元ファイルを消すため、途中で止まっても再実行できる
+    target = raw_path.with_name(raw_path.name.removesuffix(RAW_SEGMENT_SUFFIX) + SEGMENT_SUFFIX)
+    tmp_target = target.with_name(target.name + ".tmp")
+    index: dict[str, Any] = {
+        "segment": target.name,
+        "first_timestamp_utc": None,
+        "last_timestamp_utc": None,
+        "lines": 0,
+        "actions": {},
+        "statuses": {},
+    }
+    with (
+        raw_path.open("rb") as src,
+        gzip.open(tmp_target, "wb", compresslevel=SEGMENT_COMPRESSLEVEL) as dst,
+    ):
+        for line in src:
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            dst.write(line)
+            index["lines"] += 1
+            try:
+                record = json.loads(line)
+                timestamp = str(record["timestamp_utc"])
+                action = str(record["action"])
+                status = str(record["status"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if index["first_timestamp_utc"] is None or timestamp < index["first_timestamp_utc"]:
+                index["first_timestamp_utc"] = timestamp
+            if index["last_timestamp_utc"] is None or timestamp > index["last_timestamp_utc"]:
+                index["last_timestamp_utc"] = timestamp
+            index["actions"][action] = index["actions"].get(action, 0) + 1
+            index["statuses"][status] = index["statuses"].get(status, 0) + 1
+
+    digest = hashlib.sha256()
+    with tmp_target.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    index["sha256"] = digest.hexdigest()
+    index["size_bytes"] = tmp_target.stat().st_size
+    os.replace(tmp_target, target)
+
+    index_path = target.with_name(
+        target.name.removesuffix(SEGMENT_SUFFIX) + SEGMENT_INDEX_SUFFIX
+    )
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+    tmp_index.write_text(json.dumps(index, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_index, index_path)
+    raw_path.unlink()
+    return target
+
+
+_Item = tuple[str, str] | threading.Event | None
+
+
+class AuditWriter:
+    # 監査ログの行を有界キューに積み、書き込みスレッドが開いたままのファイルへまとめて追記する。
+    # キューが満杯の場合は呼び出し側を待たせずに破棄し、破棄件数を次のバッチで記録する。
+    # ローテーションは名前の変更のみ行い、gzip 圧縮は圧縮スレッドへ渡す（書き込みを止めない）。
+    def __init__(
+        self,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        durability: str = AUDIT_DURABILITY,
+        queue_max: int = AUDIT_QUEUE_MAX,
+        batch_max: int = AUDIT_BATCH_MAX,
+    ) -> None:
+        if durability not in {"flush", "fsync"}:
+            raise ValueError(f"unsupported audit durability: {durability}")
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.batch_max = batch_max
+        self._queue: queue.Queue[_Item] = queue.Queue(maxsize=queue_max)
+        self._thread: threading.Thread | None = None
+        self._compress_queue: queue.Queue[Path | None] = queue.Queue()
+        self._compressor: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._files: dict[str, TextIO] = {}
+        # 現行ファイル先頭行の timestamp_utc（時間によるローテーション判定用）
+        self._first_timestamps: dict[str, str | None] = {}
+        self.rotate_bytes = AUDIT_ROTATE_BYTES
+        self.rotate_seconds = AUDIT_ROTATE_SECONDS
+        self._stats_lock = threading.Lock()
+        self._stats = {"written": 0, "dropped": 0, "batches": 0}
+        self._unreported_drops = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, path: str, line: str) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((path, line))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["dropped"] += 1
+                self._unreported_drops += 1
+
+    def flush(self, timeout: float | None = None) -> bool:
+        # 呼び出し時点までに受け付けた行の書き込み完了を待つ
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+        # 切り出し済みセグメントの圧縮が終わるまで待つ
+        with self._lock:
+            compressor = self._compressor
+            self._compressor = None
+            if compressor is not None:
+                self._compress_queue.put(None)
+        if compressor is not None:
+            compressor.join()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                first = self._queue.get()
+                if first is None:
+                    return
+                batch: list[tuple[str, str]] = []
+                events: list[threading.Event] = []
+                stopping = False
+                item: _Item = first
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is None:
+                        stopping = True
+                        break
+                    if isinstance(item, threading.Event):
+                        # flush 要求はそれまでの行を書き終えた時点で応答する
+                        events.append(item)
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_max:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                    except queue.Empty:
+                        break
+                self._write(batch)
+                for event in events:
+                    event.set()
+                if stopping:
+                    return
+        finally:
+            self._close_files()
+
+    def _write(self, batch: list[tuple[str, str]]) -> None:
+        with self._stats_lock:
+            dropped, self._unreported_drops = self._unreported_drops, 0
+        if dropped:
+            line = _record_line("audit_dropped", "warning", {"dropped": dropped})
+            path = batch[-1][0] if batch else os.path.abspath(AUDIT_LOG_PATH)
+            batch.append((path, line))
+        if not batch:
+            return
+
+        by_path: dict[str, list[str]] = {}
+        for path, line in batch:
+            by_path.setdefault(path, []).append(line)
+        for path, lines in by_path.items():
+            try:
+                f = self._file(path)
+                if self._should_rotate(path, f):
+                    self._rotate(path)
+                    f = self._file(path)
+                if self._first_timestamps.get(path) is None:
+                    self._first_timestamps[path] = _line_timestamp(lines[0])
+                f.write("".join(lines))
+                f.flush()
+                if self.durability == "fsync":
+                    os.fsync(f.fileno())
+            except (OSError, ValueError):
+                with self._stats_lock:
+                    self._stats["dropped"] += len(lines)
+                continue
+            with self._stats_lock:
+                self._stats["written"] += len(lines)
+        with self._stats_lock:
+            self._stats["batches"] += 1
+
+    def _file(self, path: str) -> TextIO:
+        # 外部で移動・削除された場合は開き直す
+        f = self._files.get(path)
+        if f is not None:
+            try:
+                if os.stat(path).st_ino == os.fstat(f.fileno()).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            f.close()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        f = open(path, "a", encoding="utf-8")
+        self._files[path] = f
+        self._first_timestamps[path] = _first_timestamp(Path(path))
+        return f
+
+    def _should_rotate(self, path: str, f: TextIO) -> bool:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return False
+        if size >= self.rotate_bytes:
+            return True
+        first = self._first_timestamps.get(path)
+        return first is not None and _age_seconds(first) >= self.rotate_seconds
+
+    def _rotate(self, path: str) -> None:
+        # 現行ファイルをセグメントディレクトリへ移してから圧縮する
+        f = self._files.pop(path)
+        f.close()
+        first = self._first_timestamps.pop(path, None) or _utc_now_iso8601_seconds()
+        target_dir = segments_dir(Path(path))
+        target_dir.mkdir(parents=True, exist_ok=True)
+        stamp = first.replace("-", "").replace(":", "")
+        raw_path = target_dir / f"{stamp}-{time.time_ns()}{RAW_SEGMENT_SUFFIX}"
+        with rotation_lock:
+            os.replace(path, raw_path)
+        # 圧縮されるまでは問い合わせが元の JSONL を読む
+        self._submit_compress(target_dir)
+
+    def _submit_compress(self, target_dir: Path) -> None:
+        with self._lock:
+            if self._compressor is None or not self._compressor.is_alive():
+                self._compressor = threading.Thread(
+                    target=self._run_compressor, name="audit-compressor", daemon=True
+                )
+                self._compressor.start()
+            self._compress_queue.put(target_dir)
+
+    def _run_compressor(self) -> None:
+        while True:
+            target_dir = self._compress_queue.get()
+            if target_dir is None:
+                return
+            # 前回の圧縮が中断していた場合も含めて圧縮する。失敗した分は次の切り出し時に再実行する
+            for leftover in sorted(target_dir.glob(f"*{RAW_SEGMENT_SUFFIX}")):
+                try:
+                    compress_segment(leftover)
+                except OSError:
+                    continue
+
+    def _close_files(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def _record_line(action: str, status: str, details: dict[str, Any] | None) -> str:
     record = {
         "timestamp_utc": _utc_now_iso8601_seconds(),
         "action": action,
         "status": status,
         "details": details or {},
     }
-    AUDIT_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with AUDIT_LOG_PATH.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+_writer: AuditWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AuditWriter()
+            atexit.register(_writer.stop)
+        return _writer
+
+
+def log_event(action: str, status: str, details: dict[str, Any] | None = None) -> None:
+    # 書き込みはバックグラウンドで行う。ファイルを直接読む場合は先に flush_audit_log() を呼ぶ
+    line = _record_line(action, status, details)
+    get_audit_writer().submit(os.path.abspath(AUDIT_LOG_PATH), line)
+
+
+def flush_audit_log(timeout: float | None = None) -> bool:
+    return get_audit_writer().flush(timeout)
+
+
+def audit_stats() -> dict[str, int]:
+    return get_audit_writer().stats()
+
+
+def stop_audit_writer() -> None:
+    with _writer_lock:
+        writer = _writer
+    if writer is not None:
+        writer.stop()
+
+
+# 収集（/metrics の応答）時にだけ取得する
+metrics.gauge(
+    "checksum_registry_audit_queued",
+    "Audit log lines waiting for the writer thread.",
+    lambda: audit_stats()["queued"],
+)
+metrics.gauge(
+    "checksum_registry_audit_dropped",
+    "Audit log lines dropped since process start (queue full or write error).",
+    lambda: audit_stats()["dropped"],
+)
+metrics.gauge(
+    "checksum_registry_audit_written",
+    "Audit log lines written since process start.",
+    lambda: audit_stats()["written"],
+)
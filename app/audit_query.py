@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import gzip
+import json
+from collections.abc import Generator, Iterator
+from pathlib import Path
+from typing import IO, Any, cast
+
+from app import audit
+from app.audit import (
+    RAW_SEGMENT_SUFFIX,
+    SEGMENT_INDEX_SUFFIX,
+    SEGMENT_SUFFIX,
+    rotation_lock,
+    segments_dir,
+)
+
+AUDIT_QUERY_DEFAULT_LIMIT = 100
+AUDIT_QUERY_MAX_LIMIT = 1000
+
+# (索引（無ければ None）, セグメントのパス)
+_Segment = tuple[dict[str, Any] | None, Path]
+
+
+def _list_segments(path: Path) -> list[_Segment]:
+    root = segments_dir(path)
+    if not root.exists():
+        return []
+    stems: set[str] = set()
+    for child in root.iterdir():
+        for suffix in (SEGMENT_SUFFIX, RAW_SEGMENT_SUFFIX):
+            if child.name.endswith(suffix):
+                stems.add(child.name.removesuffix(suffix))
+
+    out: list[_Segment] = []
+    for stem in sorted(stems):
+        index_path = root / (stem + SEGMENT_INDEX_SUFFIX)
+        raw_path = root / (stem + RAW_SEGMENT_SUFFIX)
+        # 索引が書かれるまでは圧縮途中として元の JSONL を読む
+        if index_path.exists():
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            out.append((index, root / (stem + SEGMENT_SUFFIX)))
+        elif raw_path.exists():
+            out.append((None, raw_path))
+        else:
+            out.append((None, root / (stem + SEGMENT_SUFFIX)))
+    return out
+
+
+def _segment_may_match(
+    index: dict[str, Any],
+    action: str | None,
+    status: str | None,
+    since: str | None,
+    until: str | None,
+) -> bool:
+    if action is not None and action not in index.get("actions", {}):
+        return False
+    if status is not None and status not in index.get("statuses", {}):
+        return False
+    first = index.get("first_timestamp_utc")
+    last = index.get("last_timestamp_utc")
+    if first is None or last is None:
+        return bool(index.get("lines", 0) > 0)
+    if since is not None and last < since:
+        return False
+    return not (until is not None and first > until)
+
+
+def _open_segment(segment: Path) -> IO[bytes]:
+    if segment.name.endswith(RAW_SEGMENT_SUFFIX):
+        try:
+            return segment.open("rb")
+        except FileNotFoundError:
+            # 一覧取得後に圧縮が終わった
+            stem = segment.name.removesuffix(RAW_SEGMENT_SUFFIX)
+            segment = segment.with_name(stem + SEGMENT_SUFFIX)
+    return cast(IO[bytes], gzip.open(segment, "rb"))
+
+
+def _matching(
+    lines: IO[bytes],
+    action: str | None,
+    status: str | None,
+    since: str | None,
+    until: str | None,
+) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        if action is not None and record.get("action") != action:
+            continue
+        if status is not None and record.get("status") != status:
+            continue
+        timestamp = str(record.get("timestamp_utc", ""))
+        if since is not None and timestamp < since:
+            continue
+        if until is not None and timestamp > until:
+            continue
+        yield record
+
+
+def iter_audit_records(
+    action: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    stats: dict[str, int] | None = None,
+    path: Path | None = None,
+) -> Generator[dict[str, Any], None, None]:
+    # 圧縮セグメント（古い順）→ 現行ファイルの順に返す。索引で条件に合わないセグメントは開かない。
+    # since / until は timestamp_utc と同じ "YYYY-MM-DDTHH:MM:SSZ" 形式で渡す
+    target = audit.AUDIT_LOG_PATH if path is None else path
+    counters = stats if stats is not None else {}
+    counters.setdefault("segments_scanned", 0)
+    counters.setdefault("segments_skipped", 0)
+
+    # セグメント一覧と現行ファイルは切り出しと排他して同時点のものを取る
+    with rotation_lock:
+        segments = _list_segments(target)
+        try:
+            active: IO[bytes] | None = target.open("rb")
+        except FileNotFoundError:
+            active = None
+
+    try:
+        for index, segment in segments:
+            if index is not None and not _segment_may_match(index, action, status, since, until):
+                counters["segments_skipped"] += 1
+                continue
+            counters["segments_scanned"] += 1
+            with _open_segment(segment) as lines:
+                yield from _matching(lines, action, status, since, until)
+        if active is not None:
+            yield from _matching(active, action, status, since, until)
+    finally:
+        if active is not None:
+            active.close()
+
+
+def query_audit(
+    action: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = AUDIT_QUERY_DEFAULT_LIMIT,
+) -> tuple[list[dict[str, Any]], dict[str, int]]:
+    stats: dict[str, int] = {}
+    items: list[dict[str, Any]] = []
+    records = iter_audit_records(action, status, since, until, stats)
+    try:
+        for record in records:
+            items.append(record)
+            if len(items) >= limit:
+                break
+    finally:
+        records.close()
+    return items, stats
@@ -8,10 +8,21 @@ from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
-from app.ledger import verify_chain
+from app import ledger
+from app.audit import (
+    RAW_SEGMENT_SUFFIX,
+    SEGMENT_INDEX_SUFFIX,
+    flush_audit_log,
+    rotation_lock,
+    segments_dir,
+)
+from app.ledger import LEDGER_BACKENDS, ledger_lock, open_store, verify_chain
+from app.ledger_store import LedgerStore
+from app.sqlite_store import SqliteLedgerStore
 
-LEDGER_PATH = Path("data/ledger.json")
 ANCHOR_PATH = Path("anchors/latest.json")
+MERKLE_ANCHOR_PATH = Path("anchors/merkle.json")
+CHECKPOINTS_PATH = Path("data/ledger.checkpoints.json")
 PUBLIC_KEY_PATH = Path("keys/public_key.pem")
 AUDIT_LOG_PATH = Path("logs/audit.log.jsonl")
 
@@ -38,9 +49,67 @@ def _copy_atomic(src: Path, dst: Path) -> None:
     os.replace(tmp, dst)
 
 
+def _copy_into_backup(
+    src: Path, backup_dir: Path, files: dict[str, Any], sha256: str | None = None
+) -> None:
+    rel = src.as_posix()
+    dst = backup_dir / rel
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(src, dst)
+    files[rel] = {
+        "sha256": sha256 or _sha256_file(dst),
+        "size_bytes": dst.stat().st_size,
+    }
+
+
+def _copy_audit_log(backup_dir: Path, files: dict[str, Any]) -> None:
+    # 現行ファイルとセグメント一覧は切り出しと排他して取得する。
+    # 圧縮済みセグメントは変更されないため、索引に記録済みの sha256 を使い再計算しない
+    root = segments_dir(AUDIT_LOG_PATH)
+    with rotation_lock:
+        if AUDIT_LOG_PATH.exists():
+            _copy_into_backup(AUDIT_LOG_PATH, backup_dir, files)
+        segment_files = sorted(root.iterdir()) if root.exists() else []
+
+    for src in segment_files:
+        if src.name.endswith(SEGMENT_INDEX_SUFFIX):
+            _copy_audit_segment(src, backup_dir, files)
+        elif src.name.endswith(RAW_SEGMENT_SUFFIX):
+            # 圧縮途中のセグメント。複製前に圧縮が終わった場合は圧縮済みの方を複製する
+            try:
+                _copy_into_backup(src, backup_dir, files)
+            except FileNotFoundError:
+                index_path = src.with_name(
+                    src.name.removesuffix(RAW_SEGMENT_SUFFIX) + SEGMENT_INDEX_SUFFIX
+                )
+                if index_path not in segment_files:
+                    _copy_audit_segment(index_path, backup_dir, files)
+
+
+def _copy_audit_segment(index_path: Path, backup_dir: Path, files: dict[str, Any]) -> None:
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    segment = index_path.with_name(index["segment"])
+    _copy_into_backup(segment, backup_dir, files, sha256=index["sha256"])
+    _copy_into_backup(index_path, backup_dir, files)
+
+
+def _backup_sqlite_ledger(
+    store: SqliteLedgerStore, backup_dir: Path, files: dict[str, Any]
+) -> None:
+    # WAL 上の未反映分も含めるため、ファイル複製ではなく SQLite のバックアップ機能を使う
+    rel = store.path.as_posix()
+    dst = backup_dir / rel
+    store.backup_to(dst)
+    files[rel] = {
+        "sha256": _sha256_file(dst),
+        "size_bytes": dst.stat().st_size,
+    }
+
+
 def perform_backup(backup_root: Path = Path("backups")) -> Path:
-    if not LEDGER_PATH.exists():
-        raise FileNotFoundError(f"ledger not found: {LEDGER_PATH}")
+    store = ledger._store()
+    if not store.exists():
+        raise FileNotFoundError(f"ledger not found: {store.data_files()[0]}")
 
     backup_root.mkdir(parents=True, exist_ok=True)
     backup_dir = backup_root / _utc_stamp()
@@ -50,20 +119,27 @@ def perform_backup(backup_root: Path = Path("backups")) -> Path:
         backup_dir = backup_root / f"{_utc_stamp()}-{suffix}"
     backup_dir.mkdir(parents=True, exist_ok=False)
 
-    candidates = [LEDGER_PATH, ANCHOR_PATH, PUBLIC_KEY_PATH, AUDIT_LOG_PATH]
     files: dict[str, Any] = {}
-
-    for src in candidates:
-        if not src.exists():
-            continue
-        rel = src.as_posix()
-        dst = backup_dir / rel
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
-        files[rel] = {
-            "sha256": _sha256_file(dst),
-            "size_bytes": dst.stat().st_size,
-        }
+    # 書き込み待ちの監査ログを含めて複製する
+    flush_audit_log()
+    # 追記途中の台帳とアンカーを取り込まないよう、台帳ロック内で複製する
+    with ledger_lock():
+        if isinstance(store, SqliteLedgerStore):
+            _backup_sqlite_ledger(store, backup_dir, files)
+            ledger_files = []
+        else:
+            ledger_files = store.data_files()
+        candidates = [
+            *ledger_files,
+            ANCHOR_PATH,
+            MERKLE_ANCHOR_PATH,
+            CHECKPOINTS_PATH,
+            PUBLIC_KEY_PATH,
+        ]
+        for src in candidates:
+            if src.exists():
+                _copy_into_backup(src, backup_dir, files)
+    _copy_audit_log(backup_dir, files)
 
     manifest = {
         "created_at_utc": (
@@ -86,20 +162,34 @@ def restore_backup(backup_dir: Path, restore_public_key: bool = False) -> None:
 
     _ = json.loads(manifest_path.read_text(encoding="utf-8"))
 
-    ledger_backup = backup_dir / LEDGER_PATH.as_posix()
-    if not ledger_backup.exists():
-        raise FileNotFoundError(f"backup ledger not found: {ledger_backup}")
-    _copy_atomic(ledger_backup, LEDGER_PATH)
-
+    # バックアップ時の保存先の種類によらず、現在の保存先へ書き直す
+    ledger_backup: LedgerStore | None = None
+    for backend in LEDGER_BACKENDS:
+        candidate = open_store(backend, backup_dir)
+        if candidate.exists():
+            ledger_backup = candidate
+            break
+    if ledger_backup is None:
+        raise FileNotFoundError(f"backup ledger not found: {backup_dir}")
     anchor_backup = backup_dir / ANCHOR_PATH.as_posix()
-    if anchor_backup.exists():
-        _copy_atomic(anchor_backup, ANCHOR_PATH)
+    merkle_backup = backup_dir / MERKLE_ANCHOR_PATH.as_posix()
+    checkpoints_backup = backup_dir / CHECKPOINTS_PATH.as_posix()
+    with ledger_lock():
+        # セグメント構成は復旧先で新しい generation として書き直す
+        ledger._store().rewrite(ledger_backup.header(), ledger_backup.iter_blocks())
+        if anchor_backup.exists():
+            _copy_atomic(anchor_backup, ANCHOR_PATH)
+        if merkle_backup.exists():
+            _copy_atomic(merkle_backup, MERKLE_ANCHOR_PATH)
+        if checkpoints_backup.exists():
+            _copy_atomic(checkpoints_backup, CHECKPOINTS_PATH)
 
     if restore_public_key:
         pub_backup = backup_dir / PUBLIC_KEY_PATH.as_posix()
         if pub_backup.exists():
             _copy_atomic(pub_backup, PUBLIC_KEY_PATH)
 
-    ok, index, reason = verify_chain()
+    # バックアップ内のチェックポイントは信頼せず、genesis から全件検証する
+    ok, index, reason = verify_chain(full=True)
     if not ok:
         raise ValueError(f"restored ledger verification failed: index={index}, reason={reason}")
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from types import TracebackType
+from typing import Any, cast
+
+# 台帳のバイナリ表現（任意）。JSON 形式と相互に無損失で変換でき、block_hash は変わらない。
+#   <name>.bin     : MAGIC, ヘッダ長(u32), 台帳ヘッダ JSON, ブロックレコード...
+#   <name>.offsets : ブロックごとのレコード開始位置（u64 LE）の配列。index で直接引ける
+# ブロックレコード: 固定長ヘッダ + 可変長ペイロード。
+#   compact: ハッシュ・署名を生バイトで持ち、ペイロードは entry の canonical JSON
+#   raw    : 固定欄に収まらないブロック（旧形式・欄の過不足など）。ペイロードはブロック全体の JSON
+MAGIC = b"CRLBIN01"
+OFFSETS_SUFFIX = ".offsets"
+FLAG_COMPACT = 0x01
+# record_len, flags, index, timestamp_utc, prev_hash, block_hash, signing_key_id,
+# signature, payload_len
+RECORD_HEADER = struct.Struct("<IBQ20s32s32s8s64sI")
+OFFSET = struct.Struct("<Q")
+COMPACT_KEYS = frozenset(
+    {"index", "timestamp_utc", "prev_hash", "entry", "block_hash", "signing_key_id", "signature"}
+)
+
+
+def _canonical(obj: Any) -> bytes:
+    text = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def _raw_hex(value: Any, size: int) -> bytes | None:
+    # 小文字 hex で、戻したときに同じ文字列になる場合だけ生バイトにする
+    if not isinstance(value, str) or len(value) != size * 2:
+        return None
+    try:
+        raw = bytes.fromhex(value)
+    except ValueError:
+        return None
+    return raw if raw.hex() == value else None
+
+
+def _raw_signature(value: Any) -> bytes | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if len(raw) != 64 or base64.b64encode(raw).decode("ascii") != value:
+        return None
+    return raw
+
+
+def encode_block(block: dict[str, Any]) -> bytes:
+    fields: tuple[Any, ...] | None = None
+    if set(block) == COMPACT_KEYS and isinstance(block["entry"], dict):
+        index = block["index"]
+        timestamp = block["timestamp_utc"]
+        prev_hash = _raw_hex(block["prev_hash"], 32)
+        block_hash = _raw_hex(block["block_hash"], 32)
+        key_id = _raw_hex(block["signing_key_id"], 8)
+        signature = _raw_signature(block["signature"])
+        if (
+            isinstance(index, int)
+            and not isinstance(index, bool)
+            and 0 <= index < 2**64
+            and isinstance(timestamp, str)
+            and timestamp.isascii()
+            and len(timestamp) == 20
+            and None not in (prev_hash, block_hash, key_id, signature)
+        ):
+            fields = (
+                FLAG_COMPACT,
+                index,
+                timestamp.encode("ascii"),
+                prev_hash,
+                block_hash,
+                key_id,
+                signature,
+            )
+            payload = _canonical(block["entry"])
+
+    if fields is None:
+        index = block.get("index")
+        position = index if isinstance(index, int) and 0 <= index < 2**64 else 0
+        fields = (0, position, b"", b"", b"", b"", b"")
+        payload = _canonical(block)
+    record_len = RECORD_HEADER.size + len(payload)
+    return RECORD_HEADER.pack(record_len, *fields, len(payload)) + payload
+
+
+def decode_block(data: bytes | mmap.mmap, offset: int = 0) -> dict[str, Any]:
+    (
+        _,
+        flags,
+        index,
+        timestamp,
+        prev_hash,
+        block_hash,
+        key_id,
+        signature,
+        payload_len,
+    ) = RECORD_HEADER.unpack_from(data, offset)
+    start = offset + RECORD_HEADER.size
+    payload = json.loads(bytes(data[start : start + payload_len]))
+    if not flags & FLAG_COMPACT:
+        return cast(dict[str, Any], payload)
+    return {
+        "index": index,
+        "timestamp_utc": timestamp.decode("ascii"),
+        "prev_hash": prev_hash.hex(),
+        "entry": payload,
+        "block_hash": block_hash.hex(),
+        "signing_key_id": key_id.hex(),
+        "signature": base64.b64encode(signature).decode("ascii"),
+    }
+
+
+def offsets_path(path: Path) -> Path:
+    return path.with_name(path.name + OFFSETS_SUFFIX)
+
+
+def _fsync_write(path: Path, data: bytes, mode: str) -> None:
+    with path.open(mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_binary_ledger(
+    path: Path, header: dict[str, Any], blocks: Iterable[dict[str, Any]]
+) -> int:
+    # 一時ファイルへ書き出してから置き換える。offsets を後に置き換えるため、
+    # 途中で止まっても offsets が指すレコードは常に揃っている
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_data = path.with_name(path.name + ".tmp")
+    tmp_offsets = offsets_path(path).with_name(offsets_path(path).name + ".tmp")
+    header_bytes = _canonical({k: v for k, v in header.items() if k not in {"blocks", "storage"}})
+    count = 0
+    with tmp_data.open("wb") as data, tmp_offsets.open("wb") as offsets:
+        data.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        position = data.tell()
+        for block in blocks:
+            record = encode_block(block)
+            data.write(record)
+            offsets.write(OFFSET.pack(position))
+            position += len(record)
+            count += 1
+        for f in (data, offsets):
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_data, path)
+    os.replace(tmp_offsets, offsets_path(path))
+    return count
+
+
+def append_binary_blocks(path: Path, blocks: Iterable[dict[str, Any]]) -> int:
+    # レコードを書いて fsync した後に offsets を追記する（offsets にない末尾は読まれない）
+    with BinaryLedgerReader(path) as reader:
+        expected = len(reader)
+        position = reader.data_end()
+    records = bytearray()
+    offsets = bytearray()
+    for block in blocks:
+        if block.get("index") != expected:
+            raise ValueError("block index does not follow ledger tail")
+        offsets += OFFSET.pack(position + len(records))
+        records += encode_block(block)
+        expected += 1
+    if not records:
+        return 0
+    with path.open("r+b") as f:
+        f.truncate(position)
+        f.seek(position)
+        f.write(records)
+        f.flush()
+        os.fsync(f.fileno())
+    _fsync_write(offsets_path(path), bytes(offsets), "ab")
+    return len(offsets) // OFFSET.size
+
+
+class BinaryLedgerReader:
+    # .bin と .offsets を mmap し、index 指定で1ブロックだけを復号する
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # 途中で失敗した場合は開いた分をすべて閉じてから送出する
+        with ExitStack() as stack:
+            data_file = stack.enter_context(path.open("rb"))
+            offsets_file = stack.enter_context(offsets_path(path).open("rb"))
+            data = stack.enter_context(mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ))
+            if data[: len(MAGIC)] != MAGIC:
+                raise ValueError("not a binary ledger file")
+            # 書き込み途中の offsets（8 バイト未満の端数）は無視する
+            size = os.fstat(offsets_file.fileno()).st_size // OFFSET.size * OFFSET.size
+            offsets = (
+                stack.enter_context(
+                    mmap.mmap(offsets_file.fileno(), size, access=mmap.ACCESS_READ)
+                )
+                if size
+                else None
+            )
+            stack.pop_all()
+        self._data_file = data_file
+        self._offsets_file = offsets_file
+        self._data = data
+        self._offsets: mmap.mmap | None = offsets
+        self._count = size // OFFSET.size
+
+    def __enter__(self) -> BinaryLedgerReader:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._offsets is not None:
+            self._offsets.close()
+            self._offsets = None
+        if not self._data.closed:
+            self._data.close()
+        self._offsets_file.close()
+        self._data_file.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def header(self) -> dict[str, Any]:
+        (length,) = struct.unpack_from("<I", self._data, len(MAGIC))
+        start = len(MAGIC) + 4
+        return cast(dict[str, Any], json.loads(bytes(self._data[start : start + length])))
+
+    def _offset(self, index: int) -> int:
+        assert self._offsets is not None
+        (offset,) = OFFSET.unpack_from(self._offsets, index * OFFSET.size)
+        return int(offset)
+
+    def data_end(self) -> int:
+        # offsets が指す最後のレコードの終端（ヘッダのみの場合はヘッダの終端）
+        if self._count == 0:
+            (length,) = struct.unpack_from("<I", self._data, len(MAGIC))
+            return len(MAGIC) + 4 + int(length)
+        offset = self._offset(self._count - 1)
+        (record_len,) = struct.unpack_from("<I", self._data, offset)
+        return offset + int(record_len)
+
+    def block(self, index: int) -> dict[str, Any]:
+        if not 0 <= index < self._count:
+            raise IndexError("block index out of range")
+        return decode_block(self._data, self._offset(index))
+
+    def iter_blocks(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        for index in range(max(start, 0), self._count):
+            yield decode_block(self._data, self._offset(index))
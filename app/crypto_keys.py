@@ -5,7 +5,9 @@ import hashlib
 import os
 import stat
 import sys
+import threading
 from pathlib import Path
+from typing import Any
 
 from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.primitives import serialization
@@ -13,7 +15,10 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey,
 
 
 def load_public_key(path: str = "keys/public_key.pem") -> Ed25519PublicKey:
-    pem = Path(path).read_bytes()
+    return _public_key_from_pem(Path(path).read_bytes())
+
+
+def _public_key_from_pem(pem: bytes) -> Ed25519PublicKey:
     key = serialization.load_pem_public_key(pem)
     if not isinstance(key, Ed25519PublicKey):
         raise TypeError("public key is not Ed25519")
@@ -80,3 +85,130 @@ def verify_block_hash(
         return True
     except (ValueError, InvalidSignature):
         return False
+
+
+def _key_file_identity(path: str) -> tuple[Any, ...]:
+    # 権限変更（chmod）でも再検証されるよう st_mode を含める
+    resolved = Path(path).resolve()
+    st = os.stat(resolved)
+    return (str(resolved), st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino, st.st_mode)
+
+
+class VerifyingKey:
+    # 読込済みの公開鍵と鍵ID。ブロックごとの検証ではこれを使い回し、鍵ファイルを確認しない
+    def __init__(self, public_key: Ed25519PublicKey, key_id: str) -> None:
+        self.public_key = public_key
+        self.key_id = key_id
+
+    def verify(self, block_hash_hex: str, signature_b64: str) -> bool:
+        return verify_block_hash(self.public_key, block_hash_hex, signature_b64)
+
+
+class SigningKey:
+    # 読込済みの秘密鍵と鍵ID。まとめて署名する間はこれを使い回す
+    def __init__(self, private_key: Ed25519PrivateKey, key_id: str) -> None:
+        self.private_key = private_key
+        self.key_id = key_id
+
+    def sign(self, block_hash_hex: str) -> tuple[str, str]:
+        block_hash_bytes = bytes.fromhex(block_hash_hex)
+        if len(block_hash_bytes) != 32:
+            raise ValueError("block_hash_hex must be 32 bytes (64 hex chars)")
+        signature_b64 = base64.b64encode(self.private_key.sign(block_hash_bytes)).decode("ascii")
+        return signature_b64, self.key_id
+
+
+class Verifier:
+    # 公開鍵と鍵IDを保持し、鍵ファイルが変わった場合のみ再読込する
+    def __init__(self, path: str = "keys/public_key.pem") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._identity: tuple[Any, ...] | None = None
+        self._public_key: Ed25519PublicKey | None = None
+        self._key_id = ""
+        self._pem = ""
+
+    def _current(self) -> tuple[Ed25519PublicKey, str, str]:
+        identity = _key_file_identity(self.path)
+        with self._lock:
+            if self._public_key is None or identity != self._identity:
+                # 返す PEM と検証に使う鍵を同じ読込結果から作る（読込は1回）
+                pem = Path(self.path).read_bytes()
+                public_key = _public_key_from_pem(pem)
+                self._public_key = public_key
+                self._key_id = key_id_from_public_key(public_key)
+                self._pem = pem.decode("utf-8")
+                self._identity = identity
+            return self._public_key, self._key_id, self._pem
+
+    def load(self) -> VerifyingKey:
+        # 鍵ファイルの確認はこの1回だけ（検証1回分・範囲1つ分の間で使い回す）
+        public_key, key_id, _ = self._current()
+        return VerifyingKey(public_key, key_id)
+
+    @property
+    def public_key(self) -> Ed25519PublicKey:
+        return self._current()[0]
+
+    @property
+    def key_id(self) -> str:
+        return self._current()[1]
+
+    @property
+    def public_key_pem(self) -> str:
+        return self._current()[2]
+
+    def verify(self, block_hash_hex: str, signature_b64: str) -> bool:
+        return self.load().verify(block_hash_hex, signature_b64)
+
+
+class Signer:
+    # 秘密鍵の読込・権限検証・鍵ID算出を一度だけ行い、鍵ファイルが変わった場合のみ再読込する
+    def __init__(self, path: str = "keys/private_key.pem") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._identity: tuple[Any, ...] | None = None
+        self._private_key: Ed25519PrivateKey | None = None
+        self._key_id = ""
+
+    def _current(self) -> tuple[Ed25519PrivateKey, str]:
+        identity = _key_file_identity(self.path)
+        with self._lock:
+            if self._private_key is None or identity != self._identity:
+                private_key = load_private_key(self.path)
+                self._private_key = private_key
+                self._key_id = key_id_from_public_key(private_key.public_key())
+                self._identity = identity
+            return self._private_key, self._key_id
+
+    def load(self) -> SigningKey:
+        # 鍵ファイルの確認はこの1回だけ（追記1回分のブロックの署名で使い回す）
+        return SigningKey(*self._current())
+
+    @property
+    def key_id(self) -> str:
+        return self._current()[1]
+
+    def sign(self, block_hash_hex: str) -> tuple[str, str]:
+        return self.load().sign(block_hash_hex)
+
+
+_signers: dict[str, Signer] = {}
+_verifiers: dict[str, Verifier] = {}
+_registry_lock = threading.Lock()
+
+
+def get_signer(path: str = "keys/private_key.pem") -> Signer:
+    key = str(Path(path).resolve())
+    with _registry_lock:
+        if key not in _signers:
+            _signers[key] = Signer(key)
+        return _signers[key]
+
+
+def get_verifier(path: str = "keys/public_key.pem") -> Verifier:
+    key = str(Path(path).resolve())
+    with _registry_lock:
+        if key not in _verifiers:
+            _verifiers[key] = Verifier(key)
+        return _verifiers[key]
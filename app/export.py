@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from app import ledger
+
+EXPORT_KINDS = ("records", "blocks")
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def record_item(block: dict[str, Any]) -> dict[str, Any]:
+    entry = block["entry"]
+    return {
+        "index": block["index"],
+        "timestamp_utc": block["timestamp_utc"],
+        "name": entry["name"],
+        "version": entry["version"],
+        "sha256": entry["file_sha256"],
+        "file_size_bytes": entry["file_size_bytes"],
+        "original_filename": entry["original_filename"],
+        "signing_key_id": block.get("signing_key_id"),
+        "signature": block.get("signature"),
+    }
+
+
+def iter_export_lines(kind: str = "records", start: int = 0) -> Iterator[bytes]:
+    # 台帳をセグメント単位で読みながら NDJSON の行を返す（台帳全体はメモリに載せない）。
+    # 書き出し開始時点の末尾までを対象とし、途中で追記されたブロックは含めない
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"unsupported export kind: {kind}")
+    store = ledger._store()
+    if not store.exists():
+        return
+    with ledger.ledger_lock():
+        end, _ = store.tail()
+
+    for block in store.iter_blocks(start):
+        if block["index"] >= end:
+            break
+        if kind == "blocks":
+            yield (json.dumps(block, ensure_ascii=False, sort_keys=True) + "\n").encode("utf-8")
+            continue
+        entry = block.get("entry")
+        if isinstance(entry, dict) and entry.get("type") == "record":
+            yield (json.dumps(record_item(block), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def chunked(lines: Iterable[bytes]) -> Iterator[bytes]:
+    # 1行ごとの送信を避け、EXPORT_CHUNK_BYTES 程度にまとめて返す
+    buffer: list[bytes] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzip_chunks(lines: Iterable[bytes]) -> Iterator[bytes]:
+    # gzip 形式で逐次圧縮する
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunked(lines):
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
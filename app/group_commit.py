@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from app import ledger, profiling
+
+GROUP_COMMIT_WINDOW_SECONDS = 0.002
+GROUP_COMMIT_MAX_BATCH = 256
+
+# (entry, future, 要求元の RequestTrace, 受付時刻)
+_Pending = tuple[
+    dict[str, Any], "Future[dict[str, Any]]", "profiling.RequestTrace | None", float
+]
+
+
+class DuplicateRecordError(ValueError):
+    pass
+
+
+class GroupCommitWriter:
+    # 同時に届いた登録要求を単一の書き込みスレッドでまとめ、1回の append_records で確定する。
+    # 直前のコミット中に溜まった要求は待たずに次のコミットへまとめ、
+    # 1件だけのときも最大 window_seconds しか待たない。
+    def __init__(
+        self,
+        window_seconds: float = GROUP_COMMIT_WINDOW_SECONDS,
+        max_batch: int = GROUP_COMMIT_MAX_BATCH,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._queue: queue.Queue[list[_Pending] | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, entry: dict[str, Any]) -> Future[dict[str, Any]]:
+        return self.submit_many([entry])[0]
+
+    def submit_many(self, entries: list[dict[str, Any]]) -> list[Future[dict[str, Any]]]:
+        # まとめて渡された entries は分割せず同じコミットで確定する
+        trace = profiling.current_trace()
+        submitted = time.perf_counter()
+        pending: list[_Pending] = [(entry, Future(), trace, submitted) for entry in entries]
+        if not pending:
+            return []
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="ledger-group-commit", daemon=True
+                )
+                self._thread.start()
+            self._queue.put(pending)
+        return [future for _, future, _, _ in pending]
+
+    def stop(self) -> None:
+        # 受付済みの要求をすべて確定してから書き込みスレッドを止める
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+            if thread is None:
+                return
+            self._queue.put(None)
+        thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = list(first)
+            stopping = False
+            deadline = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.extend(item)
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch: list[_Pending]) -> None:
+        # コミット全体の内訳（ロック待ち・検証・追記など）を、結果を返す前に各要求の内訳へ加える
+        started = time.perf_counter()
+        batch_trace = profiling.RequestTrace()
+        accepted: list[_Pending] = []
+        duplicates: list[_Pending] = []
+        new_blocks: list[dict[str, Any]] = []
+        error: Exception | None = None
+        with profiling.active_trace(batch_trace):
+            try:
+                # 受付時の重複確認後に同じ name/version が届いた場合（別プロセスを含む）に備え、
+                # 台帳ロック内で重複確認から追記までを行う
+                with ledger.ledger_lock():
+                    ledger_index = ledger.load_name_version_index()
+                    seen: set[tuple[str, str]] = set()
+                    for pending in batch:
+                        entry, future, _, _ = pending
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        key = (entry["name"], entry["version"])
+                        if key in seen or ledger_index.find_name_version(*key) is not None:
+                            duplicates.append(pending)
+                            continue
+                        seen.add(key)
+                        accepted.append(pending)
+
+                    new_blocks = ledger.append_records([entry for entry, _, _, _ in accepted])
+            except Exception as err:
+                error = err
+
+        for _, _, trace, submitted in batch:
+            if trace is not None:
+                trace.add("group_commit_wait", started - submitted)
+                trace.merge(batch_trace)
+        for _, future, _, _ in duplicates:
+            future.set_exception(DuplicateRecordError("same name/version already exists"))
+        if error is not None:
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future, _, _), block in zip(accepted, new_blocks, strict=True):
+            future.set_result(block)
+
+
+_writer: GroupCommitWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_group_commit_writer() -> GroupCommitWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = GroupCommitWriter()
+        return _writer
+
+
+def stop_group_commit_writer() -> None:
+    with _writer_lock:
+        writer = _writer
+    if writer is not None:
+        writer.stop()
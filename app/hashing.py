@@ -1,10 +1,26 @@
 ﻿from __future__ import annotations
 
 import hashlib
+import time
 from typing import Any
 
+from app import metrics
+from app.profiling import record_phase
+
 CHUNK_SIZE = 4194304
 
+# スループット = rate(bytes_total) / rate(seconds_total)
+UPLOAD_HASH_BYTES = metrics.counter(
+    "checksum_registry_upload_hash_bytes_total",
+    "Uploaded bytes hashed.",
+    ("path",),
+)
+UPLOAD_HASH_SECONDS = metrics.counter(
+    "checksum_registry_upload_hash_seconds_total",
+    "Time spent receiving and hashing uploads.",
+    ("path",),
+)
+
 
 def sha256_file_path(path: str) -> tuple[str, int]:
     hasher = hashlib.sha256()
@@ -22,6 +38,7 @@ def sha256_file_path(path: str) -> tuple[str, int]:
 
 
 async def sha256_upload_file(upload_file: Any) -> tuple[str, int]:
+    started = time.perf_counter()
     hasher = hashlib.sha256()
     size_bytes = 0
 
@@ -32,9 +49,8 @@ async def sha256_upload_file(upload_file: Any) -> tuple[str, int]:
         hasher.update(chunk)
         size_bytes += len(chunk)
 
-    try:
-        await upload_file.seek(0)
-    except Exception:
-        pass
-
+    elapsed = time.perf_counter() - started
+    UPLOAD_HASH_SECONDS.inc(elapsed, ("upload_file",))
+    record_phase("upload_hash:upload_file", elapsed)
+    UPLOAD_HASH_BYTES.inc(size_bytes, ("upload_file",))
     return hasher.hexdigest(), size_bytes
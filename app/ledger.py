@@ -1,41 +1,179 @@
 ﻿from __future__ import annotations
 
+import bisect
 import hashlib
+import heapq
 import json
 import os
+import sys
+import threading
 import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from datetime import UTC, datetime
+from itertools import islice
 from pathlib import Path
 from typing import Any, cast
 
-from app.crypto_keys import (
-    key_id_from_public_key,
-    load_private_key,
-    load_public_key,
-    sign_block_hash,
-    verify_block_hash,
+from app import metrics
+from app.crypto_keys import SigningKey, VerifyingKey, get_signer, get_verifier
+from app.ledger_store import (
+    LedgerStore,
+    SegmentedLedgerStore,
+    _atomic_write_json,
+    _file_identity,
 )
+from app.merkle import (
+    MerkleTree,
+    frontier_append,
+    frontier_root,
+    leaf_hash,
+    signed_root_digest,
+)
+from app.sqlite_store import SqliteLedgerStore
 
 LEDGER_PATH = Path("data/ledger.json")
+SQLITE_LEDGER_PATH = Path("data/ledger.sqlite3")
+# "segmented"（既定: data/ledger.json + JSONL セグメント）/ "sqlite"（data/ledger.sqlite3）
+LEDGER_BACKEND = os.environ.get("CHECKSUM_REGISTRY_LEDGER_BACKEND", "segmented")
+LEDGER_BACKENDS = ("segmented", "sqlite")
 ANCHOR_PATH = Path("anchors/latest.json")
 LOCK_PATH = Path("data/ledger.lock")
+VERIFIED_CHECKPOINT_PATH = Path("data/ledger.verified.json")
+MERKLE_ANCHOR_PATH = Path("anchors/merkle.json")
+CHECKPOINTS_PATH = Path("data/ledger.checkpoints.json")
+# ブロック数がこの倍数になるごとに署名付きチェックポイントを記録する（0 以下で無効）
+CHECKPOINT_INTERVAL = int(os.environ.get("CHECKSUM_REGISTRY_CHECKPOINT_INTERVAL", "1000"))
+# verify_chain(from_checkpoint=...) で最新の有効な定期チェックポイントを指す
+LATEST_CHECKPOINT = -1
 GENESIS_PREV_HASH = "0" * 64
 SCHEMA_VERSION = "0.2"
 HASH_ALGORITHM = "sha256"
 SIGNATURE_ALGORITHM = "ed25519"
 CANONICAL_JSON_LABEL = "JCS-STRICT"
+SHA256_HEX_CHARS = frozenset("0123456789abcdef")
 LOCK_TIMEOUT_SECONDS = 5.0
-LOCK_RETRY_SECONDS = 0.05
+
+LOCK_WAIT_SECONDS = metrics.histogram(
+    "checksum_registry_ledger_lock_wait_seconds",
+    "Time spent waiting to acquire the ledger lock.",
+    phase="lock_wait",
+)
+LEDGER_LOAD_SECONDS = metrics.histogram(
+    "checksum_registry_ledger_load_seconds",
+    "Time spent reading and parsing ledger blocks into the cache.",
+    ("kind",),
+    phase="ledger_load",
+)
+LEDGER_LOAD_BLOCKS = metrics.counter(
+    "checksum_registry_ledger_load_blocks_total",
+    "Blocks read and parsed into the cache.",
+    ("kind",),
+)
+VERIFY_CHAIN_SECONDS = metrics.histogram(
+    "checksum_registry_verify_chain_seconds",
+    "verify_chain duration.",
+    ("mode",),
+    phase="verify_chain",
+)
+LEDGER_APPEND_SECONDS = metrics.histogram(
+    "checksum_registry_ledger_append_seconds",
+    "Time spent appending blocks to the ledger store.",
+    phase="ledger_append",
+)
+VERIFY_CHAIN_BLOCKS = metrics.counter(
+    "checksum_registry_verify_chain_blocks_total",
+    "Blocks checked by verify_chain.",
+    ("mode",),
+)
+
+# プロセス内の台帳キャッシュ。台帳ファイルの同一性が変わったときのみ再読込する
+_cache_lock = threading.Lock()
+_cache: dict[str, Any] = {}
+_anchor_cache: dict[str, Any] = {}
 
 
 def _utc_now_iso8601_seconds() -> str:
     return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+# docs/ledger_spec.md で定義された canonical JSON 設定。
+# json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")) と同じ出力で、
+# 呼び出しごとのエンコーダ生成を省く
+_CANONICAL_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
 def _canonical_json_bytes(obj: Any) -> bytes:
-    # docs/ledger_spec.md で定義された canonical JSON 設定
-    text = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-    return text.encode("utf-8")
+    return _CANONICAL_ENCODER.encode(obj).encode("utf-8")
+
+
+# ensure_ascii=False の json.dumps と同じ文字列表現（C 実装）
+_encode_json_str = json.encoder.encode_basestring
+
+
+def _canonical_entry_text(entry: Any) -> str | None:
+    # 既知の entry（record / type のみ）をキー順に直接組み立てる。それ以外は None
+    if type(entry) is not dict:
+        return None
+    if len(entry) == 1:
+        entry_type = entry.get("type")
+        if type(entry_type) is not str:
+            return None
+        return '{"type":' + _encode_json_str(entry_type) + "}"
+    if len(entry) != 6:
+        return None
+    try:
+        sha256 = entry["file_sha256"]
+        size = entry["file_size_bytes"]
+        name = entry["name"]
+        filename = entry["original_filename"]
+        entry_type = entry["type"]
+        version = entry["version"]
+    except KeyError:
+        return None
+    if not (
+        type(size) is int
+        and type(sha256) is str
+        and type(name) is str
+        and type(filename) is str
+        and type(entry_type) is str
+        and type(version) is str
+    ):
+        return None
+    return (
+        '{"file_sha256":' + _encode_json_str(sha256)
+        + ',"file_size_bytes":' + repr(size)
+        + ',"name":' + _encode_json_str(name)
+        + ',"original_filename":' + _encode_json_str(filename)
+        + ',"type":' + _encode_json_str(entry_type)
+        + ',"version":' + _encode_json_str(version)
+        + "}"
+    )
+
+
+def _canonical_block_body_bytes(body: dict[str, Any]) -> bytes:
+    # ブロック本体（index, timestamp_utc, prev_hash, entry）に特化した canonical JSON。
+    # _canonical_json_bytes とバイト単位で同一で、形や値の型が想定外の場合は汎用の経路へ戻す
+    if type(body) is dict and len(body) == 4:
+        try:
+            index = body["index"]
+            timestamp_utc = body["timestamp_utc"]
+            prev_hash = body["prev_hash"]
+            entry = body["entry"]
+        except KeyError:
+            return _canonical_json_bytes(body)
+        if type(index) is int and type(timestamp_utc) is str and type(prev_hash) is str:
+            entry_text = _canonical_entry_text(entry)
+            if entry_text is not None:
+                text = (
+                    '{"entry":' + entry_text
+                    + ',"index":' + repr(index)
+                    + ',"prev_hash":' + _encode_json_str(prev_hash)
+                    + ',"timestamp_utc":' + _encode_json_str(timestamp_utc)
+                    + "}"
+                )
+                return text.encode("utf-8")
+    return _canonical_json_bytes(body)
 
 
 def _sha256_hex(data: bytes) -> str:
@@ -43,7 +181,8 @@ def _sha256_hex(data: bytes) -> str:
 
 
 def _build_block_hash_from_body(block_body: dict[str, Any]) -> str:
-    return _sha256_hex(_canonical_json_bytes(block_body))
+    # ブロック本体専用。チェックポイント等の dict は _sha256_hex(_canonical_json_bytes(...)) で扱う
+    return _sha256_hex(_canonical_block_body_bytes(block_body))
 
 
 def _build_block_body(
@@ -69,10 +208,10 @@ def _extract_block_body(block: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def _build_signed_block(body: dict[str, Any]) -> dict[str, Any]:
-    private_key = load_private_key()
+def _build_signed_block(body: dict[str, Any], signer: SigningKey | None = None) -> dict[str, Any]:
+    # まとめて署名する場合は呼び出し側で読込済みの鍵を渡す
     block_hash = _build_block_hash_from_body(body)
-    signature_b64, signing_key_id = sign_block_hash(private_key, block_hash)
+    signature_b64, signing_key_id = (signer or get_signer().load()).sign(block_hash)
     return {
         **body,
         "block_hash": block_hash,
@@ -102,38 +241,100 @@ def _empty_ledger() -> dict[str, Any]:
     }
 
 
-def _atomic_write_json(path: Path, data: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    payload = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    tmp_path.write_text(payload, encoding="utf-8")
-    os.replace(tmp_path, path)
+def open_store(backend: str, root: Path = Path(".")) -> LedgerStore:
+    # root 配下の既定位置にある台帳（バックアップ内の台帳などにも使う）
+    if backend == "segmented":
+        return SegmentedLedgerStore(root / LEDGER_PATH)
+    if backend == "sqlite":
+        return SqliteLedgerStore(root / SQLITE_LEDGER_PATH)
+    raise ValueError(f"unsupported ledger backend: {backend}")
 
 
-def _acquire_lock() -> int:
-    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
-    deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
-    while True:
-        try:
-            return os.open(str(LOCK_PATH), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-        except FileExistsError as err:
-            if time.monotonic() >= deadline:
-                raise TimeoutError("ledger lock timeout") from err
-            time.sleep(LOCK_RETRY_SECONDS)
+def _store() -> LedgerStore:
+    return open_store(LEDGER_BACKEND)
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _os_lock(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    def _os_unlock(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _os_lock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _os_unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
 
 
-def _release_lock(fd: int) -> None:
+# プロセス内はスレッドロック（同一スレッドからは再入可）、
+# プロセス間は OS のファイルロックで排他する。
+# OS ロックはプロセス終了時に自動で解放されるため、ロックファイルは削除しない。
+_thread_write_lock = threading.RLock()
+_lock_depth = threading.local()
+_lock_stats_lock = threading.Lock()
+_lock_stats: dict[str, float] = {
+    "acquisitions": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+    "last_wait_seconds": 0.0,
+}
+
+
+def lock_wait_stats() -> dict[str, float]:
+    with _lock_stats_lock:
+        return dict(_lock_stats)
+
+
+def _record_lock_wait(wait_seconds: float) -> None:
+    with _lock_stats_lock:
+        _lock_stats["acquisitions"] += 1
+        _lock_stats["wait_seconds_total"] += wait_seconds
+        _lock_stats["wait_seconds_max"] = max(_lock_stats["wait_seconds_max"], wait_seconds)
+        _lock_stats["last_wait_seconds"] = wait_seconds
+    LOCK_WAIT_SECONDS.observe(wait_seconds)
+
+
+@contextmanager
+def ledger_lock() -> Iterator[None]:
+    # 台帳の読込→検証→追記→保存の一連を排他する
+    depth = getattr(_lock_depth, "value", 0)
+    if depth:
+        _lock_depth.value = depth + 1
+        try:
+            yield
+        finally:
+            _lock_depth.value = depth
+        return
+
+    started = time.perf_counter()
+    if not _thread_write_lock.acquire(timeout=LOCK_TIMEOUT_SECONDS):
+        raise TimeoutError("ledger lock timeout")
     try:
-        os.close(fd)
-    finally:
+        LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(LOCK_PATH), os.O_CREAT | os.O_RDWR)
         try:
-            LOCK_PATH.unlink()
-        except FileNotFoundError:
-            pass
+            _os_lock(fd)
+            _record_lock_wait(time.perf_counter() - started)
+            _lock_depth.value = 1
+            try:
+                yield
+            finally:
+                _lock_depth.value = 0
+                _os_unlock(fd)
+        finally:
+            os.close(fd)
+    finally:
+        _thread_write_lock.release()
 
 
-def _build_latest_anchor(ledger: dict[str, Any]) -> dict[str, Any]:
-    latest = ledger["blocks"][-1]
+def _build_latest_anchor(latest: dict[str, Any]) -> dict[str, Any]:
     return {
         "schema_version": SCHEMA_VERSION,
         "ledger_path": str(LEDGER_PATH).replace("\\", "/"),
@@ -145,47 +346,425 @@ def _build_latest_anchor(ledger: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def load_latest_anchor() -> dict[str, Any] | None:
+    # 最新アンカーのファイル同一性が変わらない限り、ファイルを読まずに前回の内容を返す。
+    # アンカーは追記・書き直しのたびに置き換えられるため、台帳末尾の検証子として使える
+    key = str(ANCHOR_PATH.resolve())
+    try:
+        identity = _file_identity(ANCHOR_PATH)
+    except FileNotFoundError:
+        return None
+    with _cache_lock:
+        if _anchor_cache.get("key") == key and _anchor_cache.get("identity") == identity:
+            return cast(dict[str, Any], _anchor_cache["anchor"])
+
+    loaded = json.loads(ANCHOR_PATH.read_text(encoding="utf-8"))
+    if not isinstance(loaded, dict):
+        raise ValueError("anchor root must be object")
+    with _cache_lock:
+        _anchor_cache.update(key=key, identity=identity, anchor=loaded)
+    return cast(dict[str, Any], loaded)
+
+
+class LedgerIndex:
+    # record ブロックの検索用インデックス。値はブロック index（台帳内の位置と一致）
+    def __init__(self) -> None:
+        self.by_sha256: dict[str, list[int]] = {}
+        self.by_name_version: dict[tuple[str, str], int] = {}
+        self.versions_by_name: dict[str, list[str]] = {}
+        self.by_name: dict[str, list[int]] = {}
+        # record ブロックの index と timestamp_utc（昇順に並んでいれば二分探索で範囲を絞る）
+        self.record_indexes: list[int] = []
+        self.record_timestamps: list[str] = []
+        self.timestamps_sorted = True
+        self._sorted_names: list[str] | None = None
+        self.indexed_blocks = 0
+
+    @classmethod
+    def from_blocks(cls, blocks: list[dict[str, Any]]) -> LedgerIndex:
+        index = cls()
+        index.sync(blocks)
+        return index
+
+    def add(self, block: dict[str, Any]) -> None:
+        self.indexed_blocks += 1
+        entry = block.get("entry")
+        if not isinstance(entry, dict) or entry.get("type") != "record":
+            return
+        name = str(entry.get("name"))
+        version = str(entry.get("version"))
+        timestamp = str(block.get("timestamp_utc"))
+        if self.record_timestamps and timestamp < self.record_timestamps[-1]:
+            self.timestamps_sorted = False
+        self.record_indexes.append(block["index"])
+        self.record_timestamps.append(timestamp)
+        if name not in self.by_name:
+            self._sorted_names = None
+        self.by_name.setdefault(name, []).append(block["index"])
+        self.by_sha256.setdefault(str(entry.get("file_sha256")), []).append(block["index"])
+        if (name, version) not in self.by_name_version:
+            self.by_name_version[(name, version)] = block["index"]
+            self.versions_by_name.setdefault(name, []).append(version)
+
+    def sync(self, blocks: list[dict[str, Any]]) -> None:
+        # 前回以降に追記されたブロックのみを取り込む
+        for block in blocks[self.indexed_blocks :]:
+            self.add(block)
+
+    def find_sha256(self, file_sha256: str) -> list[int]:
+        return self.by_sha256.get(file_sha256, [])
+
+    def find_name_version(self, name: str, version: str) -> int | None:
+        return self.by_name_version.get((name, version))
+
+    def versions(self, name: str) -> list[str]:
+        return self.versions_by_name.get(name, [])
+
+    def names_with_prefix(self, prefix: str) -> list[str]:
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self.by_name)
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        out: list[str] = []
+        for name in self._sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            out.append(name)
+        return out
+
+    def query_records(
+        self,
+        blocks: list[dict[str, Any]],
+        *,
+        name: str | None = None,
+        name_prefix: str | None = None,
+        version: str | None = None,
+        sha256: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        after: int | None = None,
+        limit: int = 100,
+    ) -> tuple[list[int], int | None]:
+        # 条件に一致する record の index を昇順で最大 limit 件返す。
+        # 続きがある場合は (最後に返した index) を次のカーソルとして返す
+        start = -1 if after is None else after
+        candidates: Iterable[int]
+        if sha256 is not None:
+            candidates = self._after(self.find_sha256(sha256), start)
+        elif name is not None and version is not None:
+            found = self.find_name_version(name, version)
+            candidates = [found] if found is not None and found > start else []
+        elif name is not None:
+            candidates = self._after(self.by_name.get(name, []), start)
+        elif name_prefix is not None:
+            candidates = heapq.merge(
+                *(
+                    self._after(self.by_name[n], start)
+                    for n in self.names_with_prefix(name_prefix)
+                )
+            )
+        else:
+            lo = bisect.bisect_right(self.record_indexes, start)
+            hi = len(self.record_indexes)
+            if self.timestamps_sorted:
+                if since is not None:
+                    lo = max(lo, bisect.bisect_left(self.record_timestamps, since))
+                if until is not None:
+                    hi = bisect.bisect_right(self.record_timestamps, until)
+            candidates = (self.record_indexes[k] for k in range(lo, hi))
+
+        out: list[int] = []
+        for i in candidates:
+            entry = blocks[i]["entry"]
+            timestamp = blocks[i]["timestamp_utc"]
+            if name is not None and entry.get("name") != name:
+                continue
+            if name_prefix is not None and not str(entry.get("name")).startswith(name_prefix):
+                continue
+            if version is not None and entry.get("version") != version:
+                continue
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp > until:
+                if self.timestamps_sorted:
+                    break
+                continue
+            if len(out) == limit:
+                return out, out[-1]
+            out.append(i)
+        return out, None
+
+    @staticmethod
+    def _after(indexes: list[int], start: int) -> Iterator[int]:
+        # 昇順リストのうち start より後ろの要素を、コピーせずに返す
+        return (indexes[k] for k in range(bisect.bisect_right(indexes, start), len(indexes)))
+
+
+def _cache_key() -> str:
+    path = SQLITE_LEDGER_PATH if LEDGER_BACKEND == "sqlite" else LEDGER_PATH
+    return f"{LEDGER_BACKEND}:{path.resolve()}"
+
+
+def _update_cache_after_append(
+    before: list[list[Any]],
+    after: list[list[Any]],
+    new_blocks: list[dict[str, Any]],
+) -> None:
+    with _cache_lock:
+        if _cache.get("key") == _cache_key() and _cache.get("identity") == before:
+            _cache["ledger"]["blocks"].extend(new_blocks)
+            _cache["identity"] = after
+        else:
+            _cache.clear()
+
+
 def load_ledger() -> dict[str, Any]:
-    if not LEDGER_PATH.exists():
-        ledger = _empty_ledger()
-        save_ledger(ledger)
-        return ledger
+    # 返却値はプロセス内で共有されるため、呼び出し側で変更しないこと
+    store = _store()
+    if not store.exists():
+        with ledger_lock():
+            if not store.exists():
+                save_ledger(_empty_ledger())
+    key = _cache_key()
+    # 読込中の追記で内容だけが新しくなる分には次回再読込されるため、同一性は読込前に取得する
+    identity = store.identity()
+    with _cache_lock:
+        if _cache.get("key") == key and _cache.get("identity") == identity:
+            return cast(dict[str, Any], _cache["ledger"])
+        cached = _cache.get("ledger") if _cache.get("key") == key else None
+        cached_identity = cast(list[list[Any]], _cache.get("identity"))
+
+    # 他プロセス（別ワーカー）による追記のみの場合は、増えた分だけを読み足す
+    if cached is not None and store.identity_extends(cached_identity):
+        blocks = cached["blocks"]
+        started = time.perf_counter()
+        new_blocks = list(store.iter_blocks(len(blocks)))
+        LEDGER_LOAD_SECONDS.observe(time.perf_counter() - started, ("incremental",))
+        LEDGER_LOAD_BLOCKS.inc(len(new_blocks), ("incremental",))
+        with _cache_lock:
+            if (
+                _cache.get("ledger") is cached
+                and _cache.get("identity") == cached_identity
+                and len(blocks) == len(cached["blocks"])
+                and blocks
+                and (not new_blocks or new_blocks[0].get("prev_hash") == blocks[-1]["block_hash"])
+            ):
+                blocks.extend(new_blocks)
+                _cache["identity"] = identity
+                return cast(dict[str, Any], cached)
+
+    started = time.perf_counter()
+    ledger = store.read()
+    LEDGER_LOAD_SECONDS.observe(time.perf_counter() - started, ("full",))
+    LEDGER_LOAD_BLOCKS.inc(len(ledger["blocks"]), ("full",))
+    with _cache_lock:
+        _cache.clear()
+        _cache.update(key=key, identity=identity, ledger=ledger)
+    return ledger
+
+
+def load_indexed_ledger() -> tuple[dict[str, Any], LedgerIndex]:
+    # キャッシュ済み台帳と、それに追随するインデックスを返す
+    ledger = load_ledger()
+    with _cache_lock:
+        if _cache.get("ledger") is ledger:
+            index = _cache.get("index")
+            if index is None:
+                index = _cache["index"] = LedgerIndex()
+            index.sync(ledger["blocks"])
+            return ledger, cast(LedgerIndex, index)
+    return ledger, LedgerIndex.from_blocks(ledger["blocks"])
+
+
+def load_name_version_index() -> LedgerIndex | SqliteLedgerStore:
+    # 重複確認用の find_name_version を持つもの。
+    # sqlite では索引への問い合わせ（台帳全体を読み込まない）、それ以外はメモリ上のインデックス
+    store = _store()
+    if isinstance(store, SqliteLedgerStore) and store.exists():
+        return store
+    return load_indexed_ledger()[1]
+
+
+def find_records(
+    *,
+    name: str | None = None,
+    name_prefix: str | None = None,
+    version: str | None = None,
+    sha256: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    after: int | None = None,
+    limit: int = 100,
+) -> tuple[list[dict[str, Any]], int | None]:
+    # LedgerIndex.query_records と同じ条件・カーソルで、一致した record ブロックを返す。
+    # sqlite では name_prefix 以外の条件を索引付きの問い合わせで処理する
+    store = _store()
+    if isinstance(store, SqliteLedgerStore) and name_prefix is None and store.exists():
+        found = store.find_blocks(
+            sha256=sha256,
+            name=name,
+            version=version,
+            since=since,
+            until=until,
+            after=after,
+            limit=limit + 1,
+        )
+        if len(found) > limit:
+            return found[:limit], found[limit - 1]["index"]
+        return found, None
+
+    ledger, ledger_index = load_indexed_ledger()
+    blocks = ledger["blocks"]
+    indexes, next_cursor = ledger_index.query_records(
+        blocks,
+        name=name,
+        name_prefix=name_prefix,
+        version=version,
+        sha256=sha256,
+        since=since,
+        until=until,
+        after=after,
+        limit=limit,
+    )
+    return [blocks[i] for i in indexes], next_cursor
+
+
+def load_merkle_tree() -> tuple[dict[str, Any], MerkleTree]:
+    # キャッシュ済み台帳と、それに追随する Merkle 木を返す
+    ledger = load_ledger()
+    with _cache_lock:
+        if _cache.get("ledger") is ledger:
+            tree = _cache.get("merkle")
+            if tree is None:
+                tree = _cache["merkle"] = MerkleTree()
+            tree.sync(ledger["blocks"])
+            return ledger, cast(MerkleTree, tree)
+    tree = MerkleTree()
+    tree.sync(ledger["blocks"])
+    return ledger, tree
+
+
+def _build_merkle_anchor(
+    tree_size: int, frontier: list[bytes], block_hash: str | None
+) -> dict[str, Any]:
+    # block_hash: 最後の葉（index が tree_size - 1 のブロック）の block_hash
+    root_hash = frontier_root(frontier).hex()
+    signature, key_id = get_signer().sign(signed_root_digest(tree_size, root_hash))
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "tree_algorithm": "RFC9162-SHA256",
+        "tree_size": tree_size,
+        "root_hash": root_hash,
+        "block_hash": block_hash,
+        "timestamp_utc": _utc_now_iso8601_seconds(),
+        "signing_key_id": key_id,
+        "signature": signature,
+        "frontier": [node.hex() for node in frontier],
+    }
 
-    loaded = json.loads(LEDGER_PATH.read_text(encoding="utf-8"))
+
+def _trusted_frontier(
+    previous: dict[str, Any] | None, tree_size: int, tail_block_hash: str
+) -> list[bytes] | None:
+    # 保存済みの frontier は署名対象外のため、大きさ・最後の葉の block_hash が台帳の末尾と一致し、
+    # frontier から求めた根が署名付きの根と一致する場合のみ使う（それ以外は None）
+    if previous is None:
+        return None
+    try:
+        if previous.get("tree_size") != tree_size:
+            return None
+        if previous.get("block_hash") != tail_block_hash:
+            return None
+        frontier = [bytes.fromhex(node) for node in previous["frontier"]]
+        if len(frontier) != bin(tree_size).count("1"):
+            return None
+        root_hash = frontier_root(frontier).hex()
+        if root_hash != previous["root_hash"]:
+            return None
+        verifier = get_verifier("keys/public_key.pem").load()
+        if previous.get("signing_key_id") != verifier.key_id:
+            return None
+        if not verifier.verify(signed_root_digest(tree_size, root_hash), previous["signature"]):
+            return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return frontier
+
+
+def _write_merkle_anchor(new_blocks: list[dict[str, Any]] | None = None) -> None:
+    # 呼び出し側で台帳ロックを保持していること。
+    # 直前の署名付きの根が追記前の末尾と一致する場合は frontier に追記分だけを足す（O(log n)）。
+    # 一致しない・改変されている場合は台帳全体から作り直す
+    frontier: list[bytes] | None = None
+    if new_blocks and new_blocks[0]["index"] > 0:
+        try:
+            previous = load_latest_merkle_anchor()
+        except ValueError:
+            previous = None
+        frontier = _trusted_frontier(
+            previous, new_blocks[0]["index"], new_blocks[0]["prev_hash"]
+        )
+    if frontier is not None and new_blocks:
+        tree_size = frontier_append(
+            frontier, new_blocks[0]["index"], (leaf_hash(b["block_hash"]) for b in new_blocks)
+        )
+        tail_block_hash: str | None = new_blocks[-1]["block_hash"]
+    else:
+        frontier = []
+        tail_block_hash = None
+
+        def tail_leaves() -> Iterator[bytes]:
+            nonlocal tail_block_hash
+            for block in _store().iter_blocks():
+                tail_block_hash = block["block_hash"]
+                yield leaf_hash(block["block_hash"])
+
+        tree_size = frontier_append(frontier, 0, tail_leaves())
+    _atomic_write_json(
+        MERKLE_ANCHOR_PATH, _build_merkle_anchor(tree_size, frontier, tail_block_hash)
+    )
+
+
+def load_latest_merkle_anchor() -> dict[str, Any] | None:
+    try:
+        loaded = json.loads(MERKLE_ANCHOR_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
     if not isinstance(loaded, dict):
-        raise ValueError("ledger root must be object")
+        raise ValueError("merkle anchor root must be object")
     return cast(dict[str, Any], loaded)
 
 
 def save_ledger(ledger: dict[str, Any]) -> None:
-    lock_fd = _acquire_lock()
-    try:
-        _atomic_write_json(LEDGER_PATH, ledger)
-        _atomic_write_json(ANCHOR_PATH, _build_latest_anchor(ledger))
-    finally:
-        _release_lock(lock_fd)
+    # 台帳全体の書き直し（新規作成・旧形式からの変換）。通常の登録は _append_blocks を使う
+    with ledger_lock():
+        with _cache_lock:
+            _cache.clear()
+        _store().rewrite(ledger, ledger["blocks"])
+        _atomic_write_json(ANCHOR_PATH, _build_latest_anchor(ledger["blocks"][-1]))
+        _write_merkle_anchor()
 
 
-def append_record(
+def _append_blocks(new_blocks: list[dict[str, Any]]) -> None:
+    with ledger_lock():
+        store = _store()
+        before = store.identity()
+        started = time.perf_counter()
+        store.append(new_blocks)
+        LEDGER_APPEND_SECONDS.observe(time.perf_counter() - started)
+        _update_cache_after_append(before, store.identity(), new_blocks)
+        _atomic_write_json(ANCHOR_PATH, _build_latest_anchor(new_blocks[-1]))
+        _write_merkle_anchor(new_blocks)
+        _extend_checkpoints(new_blocks)
+
+
+def _build_record_entry(
     name: str,
     version: str,
-    note: str,
     file_sha256: str,
     file_size_bytes: int,
     original_filename: str,
 ) -> dict[str, Any]:
-    del note  # ledger_spec.md v0.2のrecord定義にnoteフィールドは存在しない
-
-    ledger = load_ledger()
-    ok, index, reason = verify_chain(ledger)
-    if not ok:
-        raise ValueError(f"invalid ledger before append: index={index}, reason={reason}")
-
-    blocks = ledger["blocks"]
-    last_block = blocks[-1]
-    next_index = len(blocks)
-
-    entry = {
+    return {
         "type": "record",
         "name": name,
         "version": version,
@@ -193,41 +772,98 @@ def append_record(
         "file_size_bytes": file_size_bytes,
         "original_filename": original_filename,
     }
-    body = _build_block_body(
-        index=next_index,
-        timestamp_utc=_utc_now_iso8601_seconds(),
-        prev_hash=last_block["block_hash"],
-        entry=entry,
-    )
-    new_block = _build_signed_block(body)
-    blocks.append(new_block)
 
-    save_ledger(ledger)
-    return new_block
+
+def parse_record_entry(item: dict[str, Any]) -> dict[str, Any] | None:
+    # 登録 API と同じ入力制約で append_records 用の entry を作る。不正な項目は None
+    name = str(item.get("name") or "").strip()
+    version = str(item.get("version") or "").strip()
+    sha256_hex = str(item.get("sha256") or "")
+    size_bytes = item.get("file_size_bytes")
+    filename = str(item.get("original_filename") or "")
+    if not name or not version or len(name) > 100 or len(version) > 50 or not filename:
+        return None
+    if len(sha256_hex) != 64 or not SHA256_HEX_CHARS.issuperset(sha256_hex):
+        return None
+    if not isinstance(size_bytes, int) or isinstance(size_bytes, bool) or size_bytes < 0:
+        return None
+    return {
+        "name": name,
+        "version": version,
+        "file_sha256": sha256_hex,
+        "file_size_bytes": size_bytes,
+        "original_filename": filename,
+    }
 
 
-def verify_chain(ledger: dict[str, Any] | None = None) -> tuple[bool, int | None, str | None]:
-    target = load_ledger() if ledger is None else ledger
-    blocks = target.get("blocks")
-    if not isinstance(blocks, list) or len(blocks) == 0:
-        return (False, 0, "invalid_genesis")
+def append_record(
+    name: str,
+    version: str,
+    note: str,
+    file_sha256: str,
+    file_size_bytes: int,
+    original_filename: str,
+) -> dict[str, Any]:
+    del note  # ledger_spec.md v0.2のrecord定義にnoteフィールドは存在しない
 
-    try:
-        public_key = load_public_key("keys/public_key.pem")
-        expected_key_id = key_id_from_public_key(public_key)
-    except Exception:
-        return (False, 0, "unknown_key")
+    entry = _build_record_entry(name, version, file_sha256, file_size_bytes, original_filename)
+    return append_records([entry])[0]
 
-    genesis = blocks[0]
-    if genesis.get("index") != 0:
-        return (False, 0, "invalid_genesis")
-    if genesis.get("prev_hash") != GENESIS_PREV_HASH:
-        return (False, 0, "invalid_genesis")
-    genesis_entry = genesis.get("entry")
-    if not isinstance(genesis_entry, dict) or genesis_entry.get("type") != "genesis":
-        return (False, 0, "invalid_genesis")
 
-    for i, block in enumerate(blocks):
+def append_records(entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # 複数の record entry を1回の検証・1回の追記書き込み・1回のアンカー更新で登録する
+    if not entries:
+        return []
+
+    # 次 index の決定から追記・チェックポイント保存までを1回のロック取得内で行う
+    with ledger_lock():
+        store = _store()
+        if store.exists() and store.is_legacy():
+            save_ledger(load_ledger())
+
+        ok, index, reason = verify_chain()
+        if not ok:
+            raise ValueError(f"invalid ledger before append: index={index}, reason={reason}")
+
+        next_index, last_block = store.tail()
+        if last_block is None:
+            raise ValueError("invalid ledger before append: index=0, reason=invalid_genesis")
+
+        timestamp_utc = _utc_now_iso8601_seconds()
+        prev_hash = last_block["block_hash"]
+        signer = get_signer().load()
+        new_blocks: list[dict[str, Any]] = []
+        for offset, entry in enumerate(entries):
+            body = _build_block_body(
+                index=next_index + offset,
+                timestamp_utc=timestamp_utc,
+                prev_hash=prev_hash,
+                entry=_build_record_entry(
+                    entry["name"],
+                    entry["version"],
+                    entry["file_sha256"],
+                    entry["file_size_bytes"],
+                    entry["original_filename"],
+                ),
+            )
+            new_block = _build_signed_block(body, signer)
+            new_blocks.append(new_block)
+            prev_hash = new_block["block_hash"]
+
+        _append_blocks(new_blocks)
+        # 自身が署名して追記したブロックは検証済みとして扱う
+        _save_verified_checkpoint(new_blocks[-1], store.state())
+        return new_blocks
+
+
+def _verify_block_sequence(
+    blocks: Iterable[dict[str, Any]],
+    start: int,
+    prev_hash: str | None,
+    verifier: VerifyingKey,
+    expected_key_id: str,
+) -> tuple[bool, int | None, str | None]:
+    for i, block in enumerate(blocks, start=start):
         if block.get("index") != i:
             return (False, i, "index_mismatch")
 
@@ -236,10 +872,9 @@ def verify_chain(ledger: dict[str, Any] | None = None) -> tuple[bool, int | None
         if block_hash != expected_hash:
             return (False, i, "block_hash_mismatch")
 
-        if i > 0:
-            prev_hash = blocks[i - 1].get("block_hash")
-            if block.get("prev_hash") != prev_hash:
-                return (False, i, "prev_hash_mismatch")
+        if prev_hash is not None and block.get("prev_hash") != prev_hash:
+            return (False, i, "prev_hash_mismatch")
+        prev_hash = block_hash
 
         signature = block.get("signature")
         signing_key_id = block.get("signing_key_id")
@@ -250,13 +885,375 @@ def verify_chain(ledger: dict[str, Any] | None = None) -> tuple[bool, int | None
         if signing_key_id != expected_key_id:
             return (False, i, "unknown_key")
 
-        if not verify_block_hash(public_key, block_hash, signature):
+        if not verifier.verify(block_hash, signature):
             return (False, i, "signature_invalid")
 
     return (True, None, None)
 
 
+def _verify_genesis(genesis: dict[str, Any]) -> tuple[bool, int | None, str | None] | None:
+    if genesis.get("index") != 0:
+        return (False, 0, "invalid_genesis")
+    if genesis.get("prev_hash") != GENESIS_PREV_HASH:
+        return (False, 0, "invalid_genesis")
+    genesis_entry = genesis.get("entry")
+    if not isinstance(genesis_entry, dict) or genesis_entry.get("type") != "genesis":
+        return (False, 0, "invalid_genesis")
+    return None
+
+
+def _verified_checkpoint_hash(checkpoint: dict[str, Any]) -> str:
+    body = {k: checkpoint[k] for k in ("verified_index", "block_hash", "ledger_state")}
+    return _sha256_hex(_canonical_json_bytes(body))
+
+
+def _save_verified_checkpoint(latest: dict[str, Any], state: dict[str, Any] | None) -> None:
+    # state は検証対象ブロックを読み込む前（ロック保持中）に取得したもの。
+    # 読込後に追記・改ざんがあれば次回照合で不一致となり全件検証へ戻る。
+    # 秘密鍵を持たない検証専用環境では保存しない（次回は全件検証になる）
+    if state is None or state.get("block_count") != latest["index"] + 1:
+        return
+    try:
+        checkpoint: dict[str, Any] = {
+            "verified_index": latest["index"],
+            "block_hash": latest["block_hash"],
+            "ledger_state": state,
+        }
+        signature, key_id = get_signer().sign(_verified_checkpoint_hash(checkpoint))
+    except (OSError, ValueError, TypeError):
+        return
+    _atomic_write_json(
+        VERIFIED_CHECKPOINT_PATH,
+        {**checkpoint, "signing_key_id": key_id, "signature": signature},
+    )
+
+
+def _load_verified_checkpoint(
+    verifier: VerifyingKey,
+    expected_key_id: str,
+) -> dict[str, Any] | None:
+    # 署名・鍵ID・台帳ファイル状態のいずれかが一致しなければ None（全件検証へ戻す）
+    try:
+        loaded = json.loads(VERIFIED_CHECKPOINT_PATH.read_text(encoding="utf-8"))
+        if not isinstance(loaded, dict):
+            return None
+        checkpoint = cast(dict[str, Any], loaded)
+        if checkpoint.get("signing_key_id") != expected_key_id:
+            return None
+        if not isinstance(checkpoint.get("verified_index"), int):
+            return None
+        if not verifier.verify(_verified_checkpoint_hash(checkpoint), checkpoint["signature"]):
+            return None
+        if not _store().state_extends(checkpoint["ledger_state"]):
+            return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return checkpoint
+
+
+def _is_record_block(block: dict[str, Any]) -> bool:
+    entry = block.get("entry")
+    return isinstance(entry, dict) and entry.get("type") == "record"
+
+
+def _checkpoint_hash(checkpoint: dict[str, Any]) -> str:
+    body = {k: checkpoint[k] for k in ("index", "block_hash", "block_count", "record_count")}
+    return _sha256_hex(_canonical_json_bytes(body))
+
+
+def load_checkpoints() -> list[dict[str, Any]]:
+    # 署名は未検証のまま index 昇順で返す
+    try:
+        loaded = json.loads(CHECKPOINTS_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    if not isinstance(loaded, dict) or not isinstance(loaded.get("checkpoints"), list):
+        raise ValueError("checkpoints root must be object")
+    return cast(list[dict[str, Any]], loaded["checkpoints"])
+
+
+def _extend_checkpoints(new_blocks: list[dict[str, Any]]) -> None:
+    # 呼び出し側で台帳ロックを保持し、台帳が検証済みであること。
+    # 最後のチェックポイントより後のブロックだけを読み、境界ごとに署名付きで追加する
+    interval = CHECKPOINT_INTERVAL
+    if interval <= 0:
+        return
+    # 今回の追記で境界（block_count が interval の倍数）を越えなければファイルを読まない。
+    # 取りこぼした境界は次に境界を越えた追記でまとめて追加される
+    if (new_blocks[-1]["index"] + 1) // interval == new_blocks[0]["index"] // interval:
+        return
+    store = _store()
+    count, _ = store.tail()
+    try:
+        checkpoints = load_checkpoints()
+    except ValueError:
+        checkpoints = []
+    # 台帳が短く書き直された（復旧など）場合は末尾を越えるものを捨てる
+    checkpoints = [cp for cp in checkpoints if cp["index"] < count]
+    last = checkpoints[-1] if checkpoints else None
+    start = last["index"] + 1 if last is not None else 0
+    # start 以降で最初の境界（block_count が interval の倍数となる index）
+    if (start // interval + 1) * interval > count:
+        return
+
+    try:
+        signer = get_signer().load()
+    except (OSError, ValueError, TypeError):
+        return
+    record_count = last["record_count"] if last is not None else 0
+    for block in islice(store.iter_blocks(start), count - start):
+        if _is_record_block(block):
+            record_count += 1
+        if (block["index"] + 1) % interval:
+            continue
+        checkpoint: dict[str, Any] = {
+            "index": block["index"],
+            "block_hash": block["block_hash"],
+            "block_count": block["index"] + 1,
+            "record_count": record_count,
+        }
+        signature, key_id = signer.sign(_checkpoint_hash(checkpoint))
+        checkpoints.append(
+            {
+                **checkpoint,
+                "timestamp_utc": _utc_now_iso8601_seconds(),
+                "signing_key_id": key_id,
+                "signature": signature,
+            }
+        )
+    _atomic_write_json(
+        CHECKPOINTS_PATH,
+        {"schema_version": SCHEMA_VERSION, "interval": interval, "checkpoints": checkpoints},
+    )
+
+
+def _checkpoint_signed(
+    checkpoint: dict[str, Any], verifier: VerifyingKey, expected_key_id: str
+) -> bool:
+    try:
+        if checkpoint.get("signing_key_id") != expected_key_id:
+            return False
+        return verifier.verify(_checkpoint_hash(checkpoint), checkpoint["signature"])
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def _latest_valid_checkpoint(
+    verifier: VerifyingKey, expected_key_id: str
+) -> dict[str, Any] | None:
+    # 呼び出し側で台帳ロックを保持すること。
+    # 署名が正しく、ディスク上の同じ index のブロックと block_hash が一致する最新のもの
+    try:
+        checkpoints = load_checkpoints()
+    except (OSError, ValueError):
+        return None
+    for checkpoint in reversed(checkpoints):
+        if not _checkpoint_signed(checkpoint, verifier, expected_key_id):
+            continue
+        block = next(_store().iter_blocks(checkpoint["index"]), None)
+        if block is not None and block.get("block_hash") == checkpoint["block_hash"]:
+            return checkpoint
+    return None
+
+
+def verify_between_checkpoints(
+    first: int | None, last: int
+) -> tuple[bool, int | None, str | None]:
+    # index が first のチェックポイント（None は genesis）の直後から last のチェックポイントまでを
+    # チェックポイント区間ごとに検証し、各チェックポイントの block_hash・累積件数とも照合する。
+    # first / last がチェックポイントの index でなければ ValueError
+    try:
+        verifier = get_verifier("keys/public_key.pem").load()
+        expected_key_id = verifier.key_id
+    except Exception:
+        return (False, 0, "unknown_key")
+
+    by_index: dict[int, dict[str, Any]] = {
+        cp["index"]: cp for cp in load_checkpoints() if isinstance(cp.get("index"), int)
+    }
+    if last not in by_index or (first is not None and first not in by_index):
+        raise ValueError("checkpoint not found")
+    if first is not None and first >= last:
+        raise ValueError("first must precede last")
+
+    position = 0
+    prev_hash: str | None = None
+    record_count = 0
+    if first is not None:
+        begin = by_index[first]
+        if not _checkpoint_signed(begin, verifier, expected_key_id):
+            return (False, first, "checkpoint_invalid")
+        position = first + 1
+        prev_hash = begin["block_hash"]
+        record_count = begin["record_count"]
+
+    blocks_iter = _store().iter_blocks(position)
+    for index in sorted(i for i in by_index if position <= i <= last):
+        checkpoint = by_index[index]
+        if not _checkpoint_signed(checkpoint, verifier, expected_key_id):
+            return (False, index, "checkpoint_invalid")
+        blocks = list(islice(blocks_iter, index + 1 - position))
+        if position == 0 and blocks:
+            genesis_result = _verify_genesis(blocks[0])
+            if genesis_result is not None:
+                return genesis_result
+        result = _verify_block_sequence(blocks, position, prev_hash, verifier, expected_key_id)
+        if not result[0]:
+            return result
+        if len(blocks) != index + 1 - position:
+            return (False, position + len(blocks), "checkpoint_mismatch")
+        record_count += sum(1 for block in blocks if _is_record_block(block))
+        if (
+            blocks[-1]["block_hash"] != checkpoint["block_hash"]
+            or record_count != checkpoint["record_count"]
+        ):
+            return (False, index, "checkpoint_mismatch")
+        prev_hash = blocks[-1]["block_hash"]
+        position = index + 1
+    return (True, None, None)
+
+
+def verify_chain(
+    ledger: dict[str, Any] | None = None,
+    full: bool = False,
+    from_checkpoint: int | None = None,
+) -> tuple[bool, int | None, str | None]:
+    started = time.perf_counter()
+    result, mode, checked = _verify_chain(ledger, full, from_checkpoint)
+    VERIFY_CHAIN_SECONDS.observe(time.perf_counter() - started, (mode,))
+    VERIFY_CHAIN_BLOCKS.inc(checked, (mode,))
+    return result
+
+
+def _verify_from_checkpoint(
+    from_checkpoint: int,
+) -> tuple[tuple[bool, int | None, str | None], str, int] | None:
+    # 定期チェックポイント（LATEST_CHECKPOINT は最新の有効なもの）を信頼し、以降のみを検証する。
+    # それより前のブロックは検証しないため、結果は検証済みチェックポイントとして保存しない。
+    # 最新の有効なものが無ければ None（全件検証へ）。指定 index が存在しなければ ValueError
+    try:
+        verifier = get_verifier("keys/public_key.pem").load()
+        expected_key_id = verifier.key_id
+    except Exception:
+        return (False, 0, "unknown_key"), "checkpoint", 0
+
+    with ledger_lock():
+        if from_checkpoint == LATEST_CHECKPOINT:
+            checkpoint = _latest_valid_checkpoint(verifier, expected_key_id)
+            if checkpoint is None:
+                return None
+        else:
+            by_index = {cp.get("index"): cp for cp in load_checkpoints()}
+            if from_checkpoint not in by_index:
+                raise ValueError("checkpoint not found")
+            checkpoint = by_index[from_checkpoint]
+            if not _checkpoint_signed(checkpoint, verifier, expected_key_id):
+                return (False, from_checkpoint, "checkpoint_invalid"), "checkpoint", 0
+            block = next(_store().iter_blocks(from_checkpoint), None)
+            if block is None or block.get("block_hash") != checkpoint["block_hash"]:
+                return (False, from_checkpoint, "checkpoint_mismatch"), "checkpoint", 0
+        start = checkpoint["index"] + 1
+        new_blocks = list(_store().iter_blocks(start))
+    result = _verify_block_sequence(
+        new_blocks, start, checkpoint["block_hash"], verifier, expected_key_id
+    )
+    return result, "checkpoint", len(new_blocks)
+
+
+def _verify_chain(
+    ledger: dict[str, Any] | None,
+    full: bool,
+    from_checkpoint: int | None,
+) -> tuple[tuple[bool, int | None, str | None], str, int]:
+    # (検証結果, "incremental" | "checkpoint" | "full", 対象ブロック数)
+    # ledger 省略時はディスク上の台帳を対象とし、検証済みチェックポイント以降のみを検証する。
+    # from_checkpoint 指定時は定期チェックポイント以降のみを検証する（明示した場合のみ）。
+    # full=True または検証済みチェックポイントが台帳と一致しない場合は genesis から全件検証する。
+    if ledger is None and not full and _store().exists():
+        if from_checkpoint is not None:
+            partial = _verify_from_checkpoint(from_checkpoint)
+            if partial is not None:
+                return partial
+
+        try:
+            verifier = get_verifier("keys/public_key.pem").load()
+            expected_key_id = verifier.key_id
+        except Exception:
+            return (False, 0, "unknown_key"), "incremental", 0
+
+        checkpoint: dict[str, Any] | None = None
+        with ledger_lock():
+            checkpoint = _load_verified_checkpoint(verifier, expected_key_id)
+            if checkpoint is not None:
+                state = _store().state()
+                start = checkpoint["verified_index"] + 1
+                new_blocks = list(_store().iter_blocks(start))
+        if checkpoint is not None:
+            result = _verify_block_sequence(
+                new_blocks, start, checkpoint["block_hash"], verifier, expected_key_id
+            )
+            if result[0] and new_blocks:
+                _save_verified_checkpoint(new_blocks[-1], state)
+            return result, "incremental", len(new_blocks)
+
+    state = None
+    if ledger is None:
+        # 全件検証はプロセス内キャッシュを使わずに保存先から読む
+        with ledger_lock():
+            store = _store()
+            if not store.exists():
+                save_ledger(_empty_ledger())
+            target = store.read()
+            # 全件検証時のみ保存先の内容ダイジェスト（SQLite）を全行から作り直す
+            state = store.state(rehash=True)
+    else:
+        target = ledger
+    blocks = target.get("blocks")
+    if not isinstance(blocks, list) or len(blocks) == 0:
+        return (False, 0, "invalid_genesis"), "full", 0
+
+    try:
+        verifier = get_verifier("keys/public_key.pem").load()
+        expected_key_id = verifier.key_id
+    except Exception:
+        return (False, 0, "unknown_key"), "full", 0
+
+    genesis_result = _verify_genesis(blocks[0])
+    if genesis_result is not None:
+        return genesis_result, "full", 1
+
+    result = _verify_block_sequence(blocks, 0, None, verifier, expected_key_id)
+    if result[0] and ledger is None:
+        _save_verified_checkpoint(blocks[-1], state)
+    return result, "full", len(blocks)
+
+
 def ensure_ledger_exists() -> None:
-    ledger = load_ledger()
-    if not ANCHOR_PATH.exists():
-        _atomic_write_json(ANCHOR_PATH, _build_latest_anchor(ledger))
+    with ledger_lock():
+        ledger = load_ledger()
+        if _store().is_legacy():
+            save_ledger(ledger)
+        if not ANCHOR_PATH.exists():
+            _atomic_write_json(ANCHOR_PATH, _build_latest_anchor(ledger["blocks"][-1]))
+        merkle_anchor = load_latest_merkle_anchor()
+        if merkle_anchor is None or merkle_anchor.get("tree_size") != len(ledger["blocks"]):
+            _write_merkle_anchor()
+
+
+def _ledger_block_count() -> int | None:
+    store = _store()
+    return store.tail()[0] if store.exists() else None
+
+
+def _ledger_file_bytes() -> int | None:
+    store = _store()
+    if not store.exists():
+        return None
+    return sum(path.stat().st_size for path in store.data_files())
+
+
+# 収集（/metrics の応答）時にだけ計算する
+metrics.gauge("checksum_registry_ledger_blocks", "Blocks in the ledger.", _ledger_block_count)
+metrics.gauge(
+    "checksum_registry_ledger_file_bytes", "Total size of the ledger files.", _ledger_file_bytes
+)
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Protocol, cast
+
+from app import metrics
+
+STORAGE_FORMAT = "segmented-jsonl"
+SEGMENT_MAX_BLOCKS = 1024
+SEGMENT_SUFFIX = ".jsonl"
+
+ATOMIC_WRITE_SECONDS = metrics.histogram(
+    "checksum_registry_atomic_write_seconds",
+    "Time spent writing a JSON file atomically.",
+    ("file",),
+    phase="atomic_write",
+)
+ATOMIC_WRITE_BYTES = metrics.counter(
+    "checksum_registry_atomic_write_bytes_total",
+    "Bytes written by atomic JSON writes.",
+    ("file",),
+)
+
+
+def _atomic_write_json(path: Path, data: dict[str, Any]) -> None:
+    started = time.perf_counter()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(payload, encoding="utf-8")
+    os.replace(tmp_path, path)
+    ATOMIC_WRITE_SECONDS.observe(time.perf_counter() - started, (path.name,))
+    ATOMIC_WRITE_BYTES.inc(len(payload.encode("utf-8")), (path.name,))
+
+
+def _block_line(block: dict[str, Any]) -> bytes:
+    text = json.dumps(block, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return (text + "\n").encode("utf-8")
+
+
+def _segment_name(first_index: int) -> str:
+    return f"{first_index:012d}{SEGMENT_SUFFIX}"
+
+
+def _write_segment_bytes(path: Path, data: bytes) -> None:
+    if not data:
+        return
+    with path.open("ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_segment_blocks(path: Path) -> list[dict[str, Any]]:
+    return [cast(dict[str, Any], json.loads(line)) for line in _complete_lines(path)]
+
+
+def _file_identity(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino]
+
+
+def _complete_lines(path: Path) -> list[bytes]:
+    # 書き込み途中でクラッシュした末尾行（改行なし）は読み飛ばす
+    lines = path.read_bytes().splitlines(keepends=True)
+    if lines and not lines[-1].endswith(b"\n"):
+        lines.pop()
+    return lines
+
+
+class _SegmentListing:
+    # 解析済みの manifest と、その generation のセグメント一覧。
+    # sealed は末尾以外のセグメントの [name, size, mtime_ns, ctime_ns, inode]（一覧作成時に stat）、
+    # sealed_digests[i] は sealed[: i + 1] を順に連鎖させたダイジェスト
+    def __init__(
+        self,
+        manifest_identity: list[int],
+        manifest: dict[str, Any],
+        segments: list[tuple[int, Path]],
+        known: dict[str, list[Any]],
+    ) -> None:
+        self.manifest_identity = manifest_identity
+        self.manifest = manifest
+        self.segments = segments
+        self.sealed: list[list[Any]] = []
+        self.sealed_digests: list[str] = []
+        digest = ""
+        for _, path in segments[:-1]:
+            entry = known.get(path.name) or [path.name, *_file_identity(path)]
+            digest = hashlib.sha256((digest + json.dumps(entry)).encode("utf-8")).hexdigest()
+            self.sealed.append(entry)
+            self.sealed_digests.append(digest)
+
+    def sealed_digest(self, count: int) -> str:
+        return self.sealed_digests[count - 1] if count > 0 else ""
+
+
+# manifest の絶対パス -> 一覧。封印済みセグメント（末尾以外）は追記されないため、
+# manifest が置き換わるか次のセグメントが作られるまで一覧と同一性を使い回す
+_listings: dict[str, _SegmentListing] = {}
+_listings_lock = threading.Lock()
+
+
+class LedgerStore(Protocol):
+    # 台帳の保存先の差し替え口。ブロックは JSON 形式と同じ dict で受け渡し、
+    # ハッシュ・署名は保存先によらず同一になる。書き込み系は台帳ロック保持中に呼ぶ
+    def exists(self) -> bool: ...
+
+    def is_legacy(self) -> bool: ...
+
+    def header(self) -> dict[str, Any]: ...
+
+    def data_files(self) -> list[Path]: ...
+
+    def identity(self) -> list[list[Any]]: ...
+
+    def identity_extends(self, previous: list[list[Any]]) -> bool: ...
+
+    def iter_blocks(self, start: int = 0) -> Iterator[dict[str, Any]]: ...
+
+    def read(self) -> dict[str, Any]: ...
+
+    def tail(self) -> tuple[int, dict[str, Any] | None]: ...
+
+    def state(self, rehash: bool = False) -> dict[str, Any] | None: ...
+
+    def state_extends(self, previous: dict[str, Any]) -> bool: ...
+
+    def append(self, blocks: Iterable[dict[str, Any]]) -> None: ...
+
+    def rewrite(self, header: dict[str, Any], blocks: Iterable[dict[str, Any]]) -> None: ...
+
+
+# data/ledger.json をヘッダ（manifest）とし、ブロックは固定件数のJSONLセグメントへ追記する。
+# セグメント: <stem>.segments/<generation>/<first_index>.jsonl
+# 全体の書き直し（移行・復旧）は新しい generation に書き出してから manifest を置き換える。
+# blocks を直接持つ単一JSON形式（旧形式）は読み取りのみ対応する。
+class SegmentedLedgerStore:
+    def __init__(self, manifest_path: Path, segment_max_blocks: int = SEGMENT_MAX_BLOCKS) -> None:
+        self.manifest_path = manifest_path
+        self.segment_max_blocks = segment_max_blocks
+
+    @property
+    def segments_root(self) -> Path:
+        return self.manifest_path.with_name(self.manifest_path.stem + ".segments")
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def read_manifest(self) -> dict[str, Any]:
+        loaded = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        if not isinstance(loaded, dict):
+            raise ValueError("ledger root must be object")
+        return cast(dict[str, Any], loaded)
+
+    def is_legacy(self, manifest: dict[str, Any] | None = None) -> bool:
+        if manifest is None:
+            return self._listing()[1] is None
+        return "blocks" in manifest
+
+    def _listing(self) -> tuple[dict[str, Any], _SegmentListing | None]:
+        # (manifest, セグメント一覧)。旧形式では一覧は None。
+        # ホットパスで stat するのは manifest と次のセグメント名のみ（ディレクトリは変化時だけ読む）
+        key = str(self.manifest_path.absolute())
+        manifest_identity = _file_identity(self.manifest_path)
+        with _listings_lock:
+            cached = _listings.get(key)
+        known: dict[str, list[Any]] = {}
+        if cached is not None and cached.manifest_identity == manifest_identity:
+            if not self._next_segment_path(cached).exists():
+                return cached.manifest, cached
+            manifest = cached.manifest
+            known = {entry[0]: entry for entry in cached.sealed}
+        else:
+            manifest = self.read_manifest()
+            if self.is_legacy(manifest):
+                return manifest, None
+        listing = _SegmentListing(manifest_identity, manifest, self._segments(manifest), known)
+        with _listings_lock:
+            _listings[key] = listing
+        return manifest, listing
+
+    def _next_segment_path(self, listing: _SegmentListing) -> Path:
+        segment_max_blocks = int(listing.manifest["storage"]["segment_max_blocks"])
+        first_index = listing.segments[-1][0] + segment_max_blocks if listing.segments else 0
+        return self._segment_dir(listing.manifest) / _segment_name(first_index)
+
+    def _segment_dir(self, manifest: dict[str, Any]) -> Path:
+        storage = manifest.get("storage")
+        if not isinstance(storage, dict) or storage.get("format") != STORAGE_FORMAT:
+            raise ValueError("unsupported ledger storage format")
+        return self.segments_root / f"{int(storage['generation']):06d}"
+
+    def segment_files(self) -> list[tuple[int, Path]]:
+        _, listing = self._listing()
+        return [] if listing is None else list(listing.segments)
+
+    def _segments(self, manifest: dict[str, Any]) -> list[tuple[int, Path]]:
+        segment_dir = self._segment_dir(manifest)
+        if not segment_dir.exists():
+            return []
+        out: list[tuple[int, Path]] = []
+        for path in segment_dir.iterdir():
+            if path.suffix == SEGMENT_SUFFIX and path.stem.isdigit():
+                out.append((int(path.stem), path))
+        out.sort()
+        return out
+
+    def header(self) -> dict[str, Any]:
+        manifest = self.read_manifest()
+        return {k: v for k, v in manifest.items() if k not in {"blocks", "storage"}}
+
+    def data_files(self) -> list[Path]:
+        _, listing = self._listing()
+        if listing is None:
+            return [self.manifest_path]
+        return [self.manifest_path, *(path for _, path in listing.segments)]
+
+    def identity(self) -> list[list[Any]]:
+        # キャッシュ無効化用のファイル同一性（name, size, mtime_ns, inode）。
+        # 封印済みセグメントは一覧作成時の値を使い、stat するのは manifest と末尾のみ
+        _, listing = self._listing()
+        paths = [self.manifest_path]
+        sealed: list[list[Any]] = []
+        if listing is not None:
+            sealed = [[name, size, mtime, inode] for name, size, mtime, _, inode in listing.sealed]
+            paths.extend(path for _, path in listing.segments[-1:])
+        out: list[list[Any]] = []
+        for path in paths:
+            st = path.stat()
+            out.append([path.name, st.st_size, st.st_mtime_ns, st.st_ino])
+        return out[:1] + sealed + out[1:]
+
+    def identity_extends(self, previous: list[list[Any]]) -> bool:
+        # previous 以降は末尾セグメントへの追記と新しいセグメントの追加のみか
+        # （名前と inode で判定）。同じサイズのままの変更は書き換えとみなす
+        current = self.identity()
+        if not previous or len(current) < len(previous):
+            return False
+        if current[: len(previous) - 1] != previous[:-1]:
+            return False
+        if len(previous) == 1:
+            return current[0] == previous[0]
+        name, size, _, inode = previous[-1]
+        last = current[len(previous) - 1]
+        if last == previous[-1]:
+            return len(current) > len(previous)
+        return bool(last[0] == name and last[3] == inode and last[1] > size)
+
+    def iter_blocks(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        manifest, listing = self._listing()
+        if listing is None:
+            yield from cast(list[dict[str, Any]], manifest["blocks"])[start:]
+            return
+
+        segments = listing.segments
+        for i, (first_index, path) in enumerate(segments):
+            if i + 1 < len(segments) and segments[i + 1][0] <= start:
+                continue
+            for position, line in enumerate(_complete_lines(path), start=first_index):
+                if position >= start:
+                    yield cast(dict[str, Any], json.loads(line))
+
+    def read(self) -> dict[str, Any]:
+        return {**self.header(), "blocks": list(self.iter_blocks())}
+
+    def tail(self) -> tuple[int, dict[str, Any] | None]:
+        # 末尾セグメントだけを読んで (ブロック数, 最終ブロック) を返す
+        manifest, listing = self._listing()
+        if listing is None:
+            blocks = cast(list[dict[str, Any]], manifest["blocks"])
+            return len(blocks), (blocks[-1] if blocks else None)
+
+        for first_index, path in reversed(listing.segments):
+            lines = _complete_lines(path)
+            if lines:
+                return first_index + len(lines), cast(dict[str, Any], json.loads(lines[-1]))
+        return 0, None
+
+    def state(self, rehash: bool = False) -> dict[str, Any] | None:
+        # 検証済みチェックポイントの照合キー。旧形式では None（rehash はセグメント形式では使わない）
+        manifest, listing = self._listing()
+        if listing is None:
+            return None
+
+        segments = listing.segments
+        tail: dict[str, Any] | None = None
+        block_count = 0
+        if segments:
+            lines = _complete_lines(segments[-1][1])
+            data = b"".join(lines)
+            tail = {
+                "name": segments[-1][1].name,
+                "size": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+            }
+            block_count = segments[-1][0] + len(lines)
+        return {
+            "generation": manifest["storage"]["generation"],
+            "block_count": block_count,
+            "manifest": listing.manifest_identity,
+            # 封印済みセグメントの件数と、その同一性の連鎖ダイジェスト（件数によらず一定の大きさ）
+            "sealed": [len(listing.sealed), listing.sealed_digest(len(listing.sealed))],
+            "tail": tail,
+        }
+
+    def state_extends(self, previous: dict[str, Any]) -> bool:
+        # previous 取得時点の内容が変更されず、末尾への追記のみが行われたかを判定する
+        manifest, listing = self._listing()
+        if listing is None:
+            return False
+        if previous.get("generation") != manifest["storage"]["generation"]:
+            return False
+        if previous.get("manifest") != listing.manifest_identity:
+            return False
+
+        sealed = previous.get("sealed")
+        if not isinstance(sealed, list) or len(sealed) != 2 or not isinstance(sealed[0], int):
+            return False
+        count, digest = sealed
+        if count > len(listing.sealed) or listing.sealed_digest(count) != digest:
+            return False
+
+        tail = previous.get("tail")
+        if tail is None:
+            return True
+        # 以前の末尾は、その後封印されていても previous 取得時点の範囲だけを読む
+        if count >= len(listing.segments):
+            return False
+        path = listing.segments[count][1]
+        if path.name != tail["name"]:
+            return False
+        with path.open("rb") as f:
+            data = f.read(tail["size"])
+        return len(data) == tail["size"] and bool(
+            hashlib.sha256(data).hexdigest() == tail["sha256"]
+        )
+
+    def _recover_tail(self, path: Path) -> int:
+        size = path.stat().st_size
+        lines = _complete_lines(path)
+        complete_size = sum(len(line) for line in lines)
+        if complete_size != size:
+            with path.open("r+b") as f:
+                f.truncate(complete_size)
+                f.flush()
+                os.fsync(f.fileno())
+        return len(lines)
+
+    def append(self, blocks: Iterable[dict[str, Any]]) -> None:
+        # 呼び出し側で台帳ロックを保持していること
+        manifest, listing = self._listing()
+        if listing is None:
+            raise ValueError("legacy ledger must be rewritten before append")
+        segment_max_blocks = int(manifest["storage"]["segment_max_blocks"])
+        segment_dir = self._segment_dir(manifest)
+        segment_dir.mkdir(parents=True, exist_ok=True)
+
+        segments = listing.segments
+        if segments:
+            first_index, path = segments[-1]
+            count = self._recover_tail(path)
+        else:
+            first_index, path, count = 0, segment_dir / _segment_name(0), 0
+
+        expected_index = first_index + count
+        pending = bytearray()
+        for block in blocks:
+            if block.get("index") != expected_index:
+                raise ValueError("block index does not follow ledger tail")
+            if count >= segment_max_blocks:
+                _write_segment_bytes(path, bytes(pending))
+                pending.clear()
+                path, count = segment_dir / _segment_name(expected_index), 0
+            pending += _block_line(block)
+            count += 1
+            expected_index += 1
+        _write_segment_bytes(path, bytes(pending))
+
+    def rewrite(self, header: dict[str, Any], blocks: Iterable[dict[str, Any]]) -> None:
+        generation = 1
+        if self.exists():
+            try:
+                current = self.read_manifest()
+                if not self.is_legacy(current):
+                    generation = int(current["storage"]["generation"]) + 1
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        segment_dir = self.segments_root / f"{generation:06d}"
+        if segment_dir.exists():
+            shutil.rmtree(segment_dir)
+        segment_dir.mkdir(parents=True)
+
+        pending = bytearray()
+        first_index = 0
+        count = 0
+        for block in blocks:
+            if count == self.segment_max_blocks:
+                _write_segment_bytes(segment_dir / _segment_name(first_index), bytes(pending))
+                pending.clear()
+                first_index += count
+                count = 0
+            pending += _block_line(block)
+            count += 1
+        _write_segment_bytes(segment_dir / _segment_name(first_index), bytes(pending))
+
+        manifest = {k: v for k, v in header.items() if k not in {"blocks", "storage"}}
+        manifest["storage"] = {
+            "format": STORAGE_FORMAT,
+            "generation": generation,
+            "segment_max_blocks": self.segment_max_blocks,
+        }
+        _atomic_write_json(self.manifest_path, manifest)
+
+        for stale in self.segments_root.iterdir():
+            if stale.is_dir() and stale != segment_dir:
+                shutil.rmtree(stale, ignore_errors=True)
@@ -1,48 +1,100 @@
-import json
+import asyncio
+import hashlib
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Annotated, Any
-
-from fastapi import FastAPI, File, Form, UploadFile
-from fastapi.responses import FileResponse, JSONResponse
-
-from app.audit import log_event
-from app.crypto_keys import (
-    key_id_from_public_key,
-    load_public_key,
-    validate_private_key_permissions,
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+
+from app.audit import flush_audit_log, log_event, stop_audit_writer
+from app.audit_query import AUDIT_QUERY_DEFAULT_LIMIT, AUDIT_QUERY_MAX_LIMIT, query_audit
+from app.crypto_keys import get_verifier, validate_private_key_permissions
+from app.export import EXPORT_KINDS, chunked, gzip_chunks, iter_export_lines, record_item
+from app.group_commit import (
+    DuplicateRecordError,
+    get_group_commit_writer,
+    stop_group_commit_writer,
 )
-from app.hashing import sha256_upload_file
-from app.ledger import append_record, ensure_ledger_exists, load_ledger, verify_chain
+from app.ledger import (
+    ensure_ledger_exists,
+    find_records,
+    load_checkpoints,
+    load_latest_anchor,
+    load_latest_merkle_anchor,
+    load_ledger,
+    load_merkle_tree,
+    load_name_version_index,
+    parse_record_entry,
+    verify_between_checkpoints,
+    verify_chain,
+)
+from app.merkle import leaf_hash
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.metrics import MetricsMiddleware, render_metrics
+from app.parallel_verify import verify_chain_parallel
+from app.profiling import ProfilingMiddleware
 from app.schemas import (
     AnchorLatestResponse,
+    AuditQueryResponse,
+    BatchRegisterRequest,
+    BatchRegisterResponse,
+    CheckpointsResponse,
     HealthResponse,
     LedgerVerifySuccessResponse,
+    MerkleConsistencyResponse,
+    MerkleInclusionResponse,
+    MerkleRootResponse,
     PublicKeyResponse,
     RecordsResponse,
     RegisterResponse,
     VerifyResponse,
 )
+from app.upload_stream import (
+    MultipartFormError,
+    StreamedForm,
+    UploadTooLargeError,
+    stream_hash_form,
+)
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
-ANCHOR_PATH = Path("anchors/latest.json")
 PUBLIC_KEY_PATH = Path("keys/public_key.pem")
 PRIVATE_KEY_PATH = Path("keys/private_key.pem")
+BATCH_MAX_ITEMS = 1000
+RECORDS_DEFAULT_LIMIT = 100
+RECORDS_MAX_LIMIT = 1000
+RECORD_FIELDS = (
+    "index",
+    "timestamp_utc",
+    "name",
+    "version",
+    "sha256",
+    "file_size_bytes",
+    "original_filename",
+    "signing_key_id",
+    "signature",
+)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
-    load_public_key(str(PUBLIC_KEY_PATH))
+    key_id = get_verifier(str(PUBLIC_KEY_PATH)).key_id
     if PRIVATE_KEY_PATH.exists():
         validate_private_key_permissions(str(PRIVATE_KEY_PATH))
     ensure_ledger_exists()
-    log_event("startup", "success", {"public_key_path": str(PUBLIC_KEY_PATH)})
+    log_event("startup", "success", {"public_key_path": str(PUBLIC_KEY_PATH), "key_id": key_id})
     yield
+    stop_group_commit_writer()
+    # 受付済みの監査ログをすべて書き出してから終了する
+    stop_audit_writer()
 
 
 app = FastAPI(title="Checksum Registry", version="0.2", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 
 @app.get("/")
@@ -60,6 +112,12 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    # Prometheus のスクレイプ用（監査ログには記録しない）
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 def _error_response(status_code: int, code: str, message: str) -> JSONResponse:
     return JSONResponse(
         status_code=status_code,
@@ -72,15 +130,19 @@ def _error_response(status_code: int, code: str, message: str) -> JSONResponse:
     )
 
 
-def _record_blocks(ledger: dict[str, Any]) -> list[dict[str, Any]]:
-    blocks = ledger.get("blocks", [])
-    records: list[dict[str, Any]] = []
-    for block in blocks:
-        entry = block.get("entry", {})
-        if isinstance(entry, dict) and entry.get("type") == "record":
-            records.append(block)
-    records.sort(key=lambda x: x.get("index", 0))
-    return records
+def _registered_record(block: dict[str, Any]) -> dict[str, Any]:
+    entry = block["entry"]
+    return {
+        "index": block["index"],
+        "name": entry["name"],
+        "version": entry["version"],
+        "sha256": entry["file_sha256"],
+        "file_size_bytes": entry["file_size_bytes"],
+        "original_filename": entry["original_filename"],
+        "timestamp_utc": block["timestamp_utc"],
+        "signing_key_id": block["signing_key_id"],
+        "signature": block["signature"],
+    }
 
 
 def _verify_breakdown(valid: bool, reason: str | None) -> dict[str, Any]:
@@ -102,7 +164,19 @@ def _verify_breakdown(valid: bool, reason: str | None) -> dict[str, Any]:
             "signature_valid": False,
         }
 
-    if reason in {"invalid_genesis", "index_mismatch", "prev_hash_mismatch", "block_hash_mismatch"}:
+    if reason == "checkpoint_invalid":
+        return {
+            "chain_integrity_valid": None,
+            "signature_valid": False,
+        }
+
+    if reason in {
+        "invalid_genesis",
+        "index_mismatch",
+        "prev_hash_mismatch",
+        "block_hash_mismatch",
+        "checkpoint_mismatch",
+    }:
         return {
             "chain_integrity_valid": False,
             "signature_valid": None,
@@ -114,18 +188,30 @@ def _verify_breakdown(valid: bool, reason: str | None) -> dict[str, Any]:
     }
 
 
+async def _streamed_form(request: Request, event: str) -> StreamedForm | JSONResponse:
+    # 本文を受信しながらファイル部の SHA-256 を計算する（一時ファイルへは書き出さない）
+    try:
+        return await stream_hash_form(request.headers, request.stream())
+    except UploadTooLargeError:
+        log_event(event, "too_large", {})
+        return _error_response(413, "PAYLOAD_TOO_LARGE", "upload exceeds max size")
+    except MultipartFormError:
+        log_event(event, "invalid_request", {})
+        return _error_response(400, "INVALID_REQUEST", "invalid request")
+
+
 @app.post("/api/v1/records/register", response_model=RegisterResponse, status_code=201)
-async def register_record(
-    name: Annotated[str | None, Form()] = None,
-    version: Annotated[str | None, Form()] = None,
-    file: Annotated[UploadFile | None, File()] = None,
-) -> JSONResponse | dict[str, Any]:
-    if name is None or version is None or file is None:
+async def register_record(request: Request) -> JSONResponse | dict[str, Any]:
+    form = await _streamed_form(request, "records_register")
+    if isinstance(form, JSONResponse):
+        return form
+    file = form.file("file")
+    if not form.getlist("name") or not form.getlist("version") or file is None:
         log_event("records_register", "invalid_request", {})
         return _error_response(400, "INVALID_REQUEST", "invalid request")
 
-    name = name.strip()
-    version = version.strip()
+    name = form.get("name").strip()
+    version = form.get("version").strip()
     if not name or not version or len(name) > 100 or len(version) > 50:
         log_event("records_register", "invalid_request", {"name": name, "version": version})
         return _error_response(400, "INVALID_REQUEST", "invalid request")
@@ -134,13 +220,7 @@ async def register_record(
         return _error_response(400, "INVALID_REQUEST", "invalid request")
 
     try:
-        ledger = load_ledger()
-        records = _record_blocks(ledger)
-        duplicate = any(
-            block["entry"].get("name") == name and block["entry"].get("version") == version
-            for block in records
-        )
-        if duplicate:
+        if load_name_version_index().find_name_version(name, version) is not None:
             log_event("records_register", "duplicate", {"name": name, "version": version})
             return _error_response(
                 409,
@@ -148,75 +228,167 @@ async def register_record(
                 "same name/version already exists",
             )
 
-        sha256_hex, size_bytes = await sha256_upload_file(file)
-        new_block = append_record(
-            name=name,
-            version=version,
-            note="",
-            file_sha256=sha256_hex,
-            file_size_bytes=size_bytes,
-            original_filename=file.filename,
+        # 同時に届いた登録は書き込みスレッドでまとめて1回の追記にする
+        future = get_group_commit_writer().submit(
+            {
+                "name": name,
+                "version": version,
+                "file_sha256": file.sha256,
+                "file_size_bytes": file.size_bytes,
+                "original_filename": file.filename,
+            }
         )
-        entry = new_block["entry"]
+        try:
+            new_block = await asyncio.wrap_future(future)
+        except DuplicateRecordError:
+            log_event("records_register", "duplicate", {"name": name, "version": version})
+            return _error_response(
+                409,
+                "DUPLICATE_NAME_VERSION",
+                "same name/version already exists",
+            )
         log_event(
             "records_register",
             "success",
-            {"index": new_block["index"], "name": name, "version": version},
+            {
+                "index": new_block["index"],
+                "name": name,
+                "version": version,
+                "upload": form.throughput(),
+            },
         )
-        return {
-            "index": new_block["index"],
-            "name": entry["name"],
-            "version": entry["version"],
-            "sha256": entry["file_sha256"],
-            "file_size_bytes": entry["file_size_bytes"],
-            "original_filename": entry["original_filename"],
-            "timestamp_utc": new_block["timestamp_utc"],
-            "signing_key_id": new_block["signing_key_id"],
-            "signature": new_block["signature"],
-        }
+        return _registered_record(new_block)
     except Exception:
         log_event("records_register", "error", {"name": name, "version": version})
         return _error_response(500, "INTERNAL_ERROR", "internal server error")
 
 
+def _batch_items_from_form(form: StreamedForm) -> list[dict[str, Any]]:
+    # multipart: name / version / file を同じ順序で繰り返す
+    names = form.getlist("name")
+    versions = form.getlist("version")
+    files = form.file_list("file")
+    if not (len(names) == len(versions) == len(files)) or len(files) > BATCH_MAX_ITEMS:
+        raise ValueError("name/version/file count mismatch")
+
+    return [
+        {
+            "name": name,
+            "version": version,
+            "sha256": file.sha256,
+            "file_size_bytes": file.size_bytes,
+            "original_filename": file.filename,
+        }
+        for name, version, file in zip(names, versions, files, strict=True)
+    ]
+
+
+@app.post("/api/v1/records/register-batch", response_model=BatchRegisterResponse)
+async def register_records_batch(request: Request) -> JSONResponse | dict[str, Any]:
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await _streamed_form(request, "records_register_batch")
+            if isinstance(form, JSONResponse):
+                return form
+            items = _batch_items_from_form(form)
+        else:
+            payload = BatchRegisterRequest.model_validate(await request.json())
+            items = [item.model_dump() for item in payload.items]
+        if not items or len(items) > BATCH_MAX_ITEMS:
+            raise ValueError("invalid batch size")
+    except Exception:
+        log_event("records_register_batch", "invalid_request", {})
+        return _error_response(400, "INVALID_REQUEST", "invalid request")
+
+    try:
+        ledger_index = load_name_version_index()
+        results: list[dict[str, Any]] = []
+        accepted: list[tuple[int, dict[str, Any]]] = []
+        seen: set[tuple[str, str]] = set()
+        for position, item in enumerate(items):
+            entry = parse_record_entry(item)
+            if entry is None:
+                results.append(
+                    {
+                        "position": position,
+                        "status": "invalid",
+                        "error": {"code": "INVALID_REQUEST", "message": "invalid item"},
+                    }
+                )
+                continue
+            key = (entry["name"], entry["version"])
+            if key in seen or ledger_index.find_name_version(*key) is not None:
+                results.append(
+                    {
+                        "position": position,
+                        "status": "duplicate",
+                        "name": entry["name"],
+                        "version": entry["version"],
+                        "error": {
+                            "code": "DUPLICATE_NAME_VERSION",
+                            "message": "same name/version already exists",
+                        },
+                    }
+                )
+                continue
+            seen.add(key)
+            accepted.append((len(results), entry))
+            results.append({"position": position, "status": "registered"})
+
+        # 単体登録と同じ書き込みスレッドを通し、確定直前の重複確認を台帳ロック内で行う
+        futures = get_group_commit_writer().submit_many([entry for _, entry in accepted])
+        registered = 0
+        for (slot, entry), future in zip(accepted, futures, strict=True):
+            try:
+                block = await asyncio.wrap_future(future)
+            except DuplicateRecordError:
+                results[slot] = {
+                    "position": results[slot]["position"],
+                    "status": "duplicate",
+                    "name": entry["name"],
+                    "version": entry["version"],
+                    "error": {
+                        "code": "DUPLICATE_NAME_VERSION",
+                        "message": "same name/version already exists",
+                    },
+                }
+                continue
+            results[slot].update(_registered_record(block))
+            registered += 1
+
+        log_event(
+            "records_register_batch",
+            "success",
+            {"registered": registered, "rejected": len(items) - registered},
+        )
+        return {"registered": registered, "rejected": len(items) - registered, "results": results}
+    except Exception:
+        log_event("records_register_batch", "error", {"items": len(items)})
+        return _error_response(500, "INTERNAL_ERROR", "internal server error")
+
+
 @app.post("/api/v1/records/verify", response_model=VerifyResponse)
-async def verify_record(
-    name: Annotated[str, Form()] = "",
-    version: Annotated[str, Form()] = "",
-    file: Annotated[UploadFile | None, File()] = None,
-) -> JSONResponse | dict[str, Any]:
+async def verify_record(request: Request) -> JSONResponse | dict[str, Any]:
+    form = await _streamed_form(request, "records_verify")
+    if isinstance(form, JSONResponse):
+        return form
+    file = form.file("file")
     if file is None or not file.filename:
         log_event("records_verify", "invalid_request", {})
         return _error_response(400, "INVALID_REQUEST", "invalid request")
 
+    name = form.get("name").strip()
+    version = form.get("version").strip()
     try:
-        name = name.strip()
-        version = version.strip()
-        sha256_hex, _ = await sha256_upload_file(file)
-
-        ledger = load_ledger()
-        records = _record_blocks(ledger)
-        matched_block: dict[str, Any] | None = None
-        match_mode = ""
+        sha256_hex = file.sha256
 
         if name and version:
             match_mode = "name_version_sha"
-            for block in records:
-                entry = block["entry"]
-                if (
-                    entry.get("name") == name
-                    and entry.get("version") == version
-                    and entry.get("file_sha256") == sha256_hex
-                ):
-                    matched_block = block
-                    break
+            found, _ = find_records(sha256=sha256_hex, name=name, version=version, limit=1)
         else:
             match_mode = "sha_only"
-            for block in records:
-                entry = block["entry"]
-                if entry.get("file_sha256") == sha256_hex:
-                    matched_block = block
-                    break
+            found, _ = find_records(sha256=sha256_hex, limit=1)
+        matched_block = found[0] if found else None
 
         if matched_block is None:
             log_event("records_verify", "not_found", {"name": name, "version": version})
@@ -235,7 +407,11 @@ async def verify_record(
         log_event(
             "records_verify",
             "success",
-            {"index": matched_block["index"], "match_mode": match_mode},
+            {
+                "index": matched_block["index"],
+                "match_mode": match_mode,
+                "upload": form.throughput(),
+            },
         )
         return {
             "matched": True,
@@ -253,41 +429,195 @@ async def verify_record(
         return _error_response(500, "INTERNAL_ERROR", "internal server error")
 
 
-@app.get("/api/v1/records", response_model=RecordsResponse)
-def list_records() -> JSONResponse | dict[str, Any]:
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match は弱い比較（W/ の有無を区別しない）
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def _records_etag(request: Request) -> str | None:
+    # 台帳末尾の block_hash と問い合わせ条件から作る。アンカーが無い場合は付与しない
+    anchor = load_latest_anchor()
+    if anchor is None:
+        return None
+    query = hashlib.sha256(str(sorted(request.query_params.multi_items())).encode("utf-8"))
+    return f'"{anchor["block_hash"]}.{query.hexdigest()[:16]}"'
+
+
+def _utc_param(value: str | None) -> str | None:
+    # 台帳の timestamp_utc と同じ "YYYY-MM-DDTHH:MM:SSZ" 形式へ正規化する（比較は文字列順）
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value.strip())
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _record_item(block: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+    item = record_item(block)
+    if fields == RECORD_FIELDS:
+        return item
+    return {key: item[key] for key in fields}
+
+
+# fields で射影した項目は指定外の項目を含めない（未設定の項目は応答から除く）
+@app.get("/api/v1/records", response_model=RecordsResponse, response_model_exclude_unset=True)
+def list_records(
+    request: Request,
+    response: Response,
+    cursor: int | None = None,
+    limit: int = RECORDS_DEFAULT_LIMIT,
+    name: str | None = None,
+    name_prefix: str | None = None,
+    version: str | None = None,
+    sha256: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    fields: str | None = None,
+) -> Response | dict[str, Any]:
     try:
-        ledger = load_ledger()
-        records = _record_blocks(ledger)
-        items = [
-            {
-                "index": block["index"],
-                "timestamp_utc": block["timestamp_utc"],
-                "name": block["entry"]["name"],
-                "version": block["entry"]["version"],
-                "sha256": block["entry"]["file_sha256"],
-                "file_size_bytes": block["entry"]["file_size_bytes"],
-                "original_filename": block["entry"]["original_filename"],
-                "signing_key_id": block.get("signing_key_id"),
-                "signature": block.get("signature"),
-            }
-            for block in records
-        ]
-        log_event("records_list", "success", {"count": len(items)})
-        return {"count": len(items), "items": items}
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        selected: tuple[str, ...] = RECORD_FIELDS
+        if fields is not None:
+            requested = {f.strip() for f in fields.split(",") if f.strip()}
+            if not requested.issubset(RECORD_FIELDS):
+                raise ValueError("unknown field")
+            # index はカーソルとして常に返す
+            selected = tuple(f for f in RECORD_FIELDS if f == "index" or f in requested)
+        since_utc = _utc_param(since)
+        until_utc = _utc_param(until)
+    except ValueError:
+        log_event("records_list", "invalid_request", {})
+        return _error_response(400, "INVALID_REQUEST", "invalid request")
+
+    try:
+        etag = _records_etag(request)
+        if etag is not None and _etag_matches(request, etag):
+            return _not_modified(etag)
+        blocks, next_cursor = find_records(
+            name=name,
+            name_prefix=name_prefix,
+            version=version,
+            sha256=sha256.lower() if sha256 is not None else None,
+            since=since_utc,
+            until=until_utc,
+            after=cursor,
+            limit=min(limit, RECORDS_MAX_LIMIT),
+        )
+        items = [_record_item(block, selected) for block in blocks]
+        if etag is not None:
+            response.headers["ETag"] = etag
+        log_event("records_list", "success", {"count": len(items), "cursor": cursor})
+        return {"count": len(items), "items": items, "next_cursor": next_cursor}
     except Exception:
         log_event("records_list", "error", {})
         return _error_response(500, "INTERNAL_ERROR", "internal server error")
 
 
+@app.get("/api/v1/export")
+def export_ledger(
+    kind: str = "records",
+    start: int = 0,
+    gzip: bool = False,
+) -> Response:
+    # NDJSON を生成しながら送信する（台帳全体・応答全体をメモリに載せない）
+    if kind not in EXPORT_KINDS or start < 0:
+        log_event("ledger_export", "invalid_request", {"kind": kind, "start": start})
+        return _error_response(400, "INVALID_REQUEST", "invalid request")
+
+    log_event("ledger_export", "success", {"kind": kind, "start": start, "gzip": gzip})
+    lines = iter_export_lines(kind, start)
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(lines),
+            media_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip"},
+        )
+    return StreamingResponse(chunked(lines), media_type="application/x-ndjson")
+
+
+@app.get("/api/v1/audit", response_model=AuditQueryResponse)
+def query_audit_log(
+    action: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = AUDIT_QUERY_DEFAULT_LIMIT,
+) -> JSONResponse | dict[str, Any]:
+    try:
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        since_utc = _utc_param(since)
+        until_utc = _utc_param(until)
+    except ValueError:
+        return _error_response(400, "INVALID_REQUEST", "invalid request")
+
+    try:
+        # 書き込み待ちの行も検索対象にする
+        flush_audit_log(timeout=1.0)
+        items, stats = query_audit(
+            action, status, since_utc, until_utc, min(limit, AUDIT_QUERY_MAX_LIMIT)
+        )
+        return {"count": len(items), "items": items, **stats}
+    except Exception:
+        log_event("audit_query", "error", {})
+        return _error_response(500, "INTERNAL_ERROR", "internal server error")
+
+
 @app.post("/api/v1/ledger/verify", response_model=LedgerVerifySuccessResponse)
-def verify_ledger() -> JSONResponse | dict[str, Any]:
+def verify_ledger(
+    full: bool = False,
+    parallel: bool = False,
+    from_checkpoint: int | None = None,
+    to_checkpoint: int | None = None,
+) -> JSONResponse | dict[str, Any]:
     try:
-        ok, index, reason = verify_chain()
+        if from_checkpoint is not None or to_checkpoint is not None:
+            # to 指定時はチェックポイント間の再検証（from 省略時は genesis から）。
+            # from のみの場合はそのチェックポイント（-1 は最新の有効なもの）以降のみを検証する
+            try:
+                if to_checkpoint is not None:
+                    ok, index, reason = verify_between_checkpoints(from_checkpoint, to_checkpoint)
+                else:
+                    ok, index, reason = verify_chain(from_checkpoint=from_checkpoint)
+            except ValueError:
+                log_event(
+                    "ledger_verify",
+                    "invalid_request",
+                    {"from_checkpoint": from_checkpoint, "to_checkpoint": to_checkpoint},
+                )
+                return _error_response(400, "INVALID_REQUEST", "checkpoint not found")
+        elif parallel:
+            ok, index, reason = verify_chain_parallel()
+        else:
+            ok, index, reason = verify_chain(full=full)
         checks = _verify_breakdown(ok, reason)
         if ok:
-            ledger = load_ledger()
-            checked = len(ledger.get("blocks", []))
-            log_event("ledger_verify", "success", {"checked_blocks": checked})
+            if to_checkpoint is not None:
+                checked = to_checkpoint - (from_checkpoint if from_checkpoint is not None else -1)
+            else:
+                checked = len(load_ledger().get("blocks", []))
+            log_event(
+                "ledger_verify",
+                "success",
+                {
+                    "checked_blocks": checked,
+                    "full": full or parallel,
+                    "from_checkpoint": from_checkpoint,
+                    "to_checkpoint": to_checkpoint,
+                },
+            )
             return {
                 "valid": True,
                 "checked_blocks": checked,
@@ -313,12 +643,28 @@ def verify_ledger() -> JSONResponse | dict[str, Any]:
         return _error_response(500, "INTERNAL_ERROR", "internal server error")
 
 
+@app.get("/api/v1/ledger/checkpoints", response_model=CheckpointsResponse)
+def list_checkpoints() -> JSONResponse | dict[str, Any]:
+    try:
+        checkpoints = load_checkpoints()
+        log_event("ledger_checkpoints", "success", {"count": len(checkpoints)})
+        return {"count": len(checkpoints), "items": checkpoints}
+    except Exception:
+        log_event("ledger_checkpoints", "error", {})
+        return _error_response(500, "INTERNAL_ERROR", "internal server error")
+
+
 @app.get("/api/v1/keys/public", response_model=PublicKeyResponse)
-def get_public_key() -> JSONResponse | dict[str, Any]:
+def get_public_key(request: Request, response: Response) -> Response | dict[str, Any]:
     try:
-        pubkey = load_public_key(str(PUBLIC_KEY_PATH))
-        pem = PUBLIC_KEY_PATH.read_text(encoding="utf-8")
-        key_id = key_id_from_public_key(pubkey)
+        verifier = get_verifier(str(PUBLIC_KEY_PATH))
+        pem = verifier.public_key_pem
+        key_id = verifier.key_id
+        # 鍵IDは公開鍵から導出されるため、そのまま検証子にする
+        etag = f'"{key_id}"'
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        response.headers["ETag"] = etag
         log_event("keys_public", "success", {"key_id": key_id})
         return {
             "key_id": key_id,
@@ -333,17 +679,105 @@ def get_public_key() -> JSONResponse | dict[str, Any]:
 
 
 @app.get("/api/v1/anchors/latest", response_model=AnchorLatestResponse)
-def get_latest_anchor() -> JSONResponse | dict[str, Any]:
+def get_latest_anchor(request: Request, response: Response) -> Response | dict[str, Any]:
     try:
-        if not ANCHOR_PATH.exists():
+        anchor = load_latest_anchor()
+        if anchor is None:
             log_event("anchors_latest", "not_found", {})
             return _error_response(404, "ANCHOR_NOT_FOUND", "anchor not found")
-        anchor_raw = json.loads(ANCHOR_PATH.read_text(encoding="utf-8"))
-        if not isinstance(anchor_raw, dict):
-            raise ValueError("anchor root must be object")
-        anchor: dict[str, Any] = anchor_raw
+        etag = f'"{anchor["block_hash"]}"'
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        response.headers["ETag"] = etag
         log_event("anchors_latest", "success", {"latest_index": anchor.get("latest_index")})
         return anchor
     except Exception:
         log_event("anchors_latest", "error", {})
         return _error_response(500, "INTERNAL_ERROR", "internal server error")
+
+
+@app.get("/api/v1/merkle/root", response_model=MerkleRootResponse)
+def get_merkle_root(request: Request, response: Response) -> Response | dict[str, Any]:
+    try:
+        anchor = load_latest_merkle_anchor()
+        if anchor is None:
+            log_event("merkle_root", "not_found", {})
+            return _error_response(404, "ANCHOR_NOT_FOUND", "merkle anchor not found")
+        etag = f'"{anchor["root_hash"]}.{anchor["tree_size"]}"'
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        response.headers["ETag"] = etag
+        log_event("merkle_root", "success", {"tree_size": anchor["tree_size"]})
+        # frontier は追記用の内部状態のため返さない（応答モデルで除外される）
+        return anchor
+    except Exception:
+        log_event("merkle_root", "error", {})
+        return _error_response(500, "INTERNAL_ERROR", "internal server error")
+
+
+def _merkle_tree_size(tree_size: int | None) -> int:
+    # 省略時は署名済みの根の大きさ
+    if tree_size is not None:
+        return tree_size
+    anchor = load_latest_merkle_anchor()
+    if anchor is None:
+        raise LookupError("merkle anchor not found")
+    return int(anchor["tree_size"])
+
+
+@app.get("/api/v1/merkle/inclusion", response_model=MerkleInclusionResponse)
+def get_merkle_inclusion(
+    index: int, tree_size: int | None = None
+) -> JSONResponse | dict[str, Any]:
+    try:
+        size = _merkle_tree_size(tree_size)
+        ledger, tree = load_merkle_tree()
+        proof = tree.inclusion_proof(index, size)
+    except LookupError:
+        log_event("merkle_inclusion", "not_found", {"index": index})
+        return _error_response(404, "ANCHOR_NOT_FOUND", "merkle anchor not found")
+    except ValueError:
+        log_event("merkle_inclusion", "invalid_request", {"index": index, "tree_size": tree_size})
+        return _error_response(400, "INVALID_REQUEST", "index or tree_size out of range")
+    except Exception:
+        log_event("merkle_inclusion", "error", {"index": index})
+        return _error_response(500, "INTERNAL_ERROR", "internal server error")
+
+    block_hash = ledger["blocks"][index]["block_hash"]
+    log_event("merkle_inclusion", "success", {"index": index, "tree_size": size})
+    return {
+        "index": index,
+        "tree_size": size,
+        "block_hash": block_hash,
+        "leaf_hash": leaf_hash(block_hash).hex(),
+        "root_hash": tree.root(size).hex(),
+        "audit_path": [node.hex() for node in proof],
+    }
+
+
+@app.get("/api/v1/merkle/consistency", response_model=MerkleConsistencyResponse)
+def get_merkle_consistency(
+    first: int, second: int | None = None
+) -> JSONResponse | dict[str, Any]:
+    try:
+        size = _merkle_tree_size(second)
+        _, tree = load_merkle_tree()
+        proof = tree.consistency_proof(first, size)
+    except LookupError:
+        log_event("merkle_consistency", "not_found", {"first": first})
+        return _error_response(404, "ANCHOR_NOT_FOUND", "merkle anchor not found")
+    except ValueError:
+        log_event("merkle_consistency", "invalid_request", {"first": first, "second": second})
+        return _error_response(400, "INVALID_REQUEST", "first or second out of range")
+    except Exception:
+        log_event("merkle_consistency", "error", {"first": first})
+        return _error_response(500, "INTERNAL_ERROR", "internal server error")
+
+    log_event("merkle_consistency", "success", {"first": first, "second": size})
+    return {
+        "first": first,
+        "second": size,
+        "first_root_hash": tree.root(first).hex(),
+        "second_root_hash": tree.root(size).hex(),
+        "proof": [node.hex() for node in proof],
+    }
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable
+from typing import Any
+
+# RFC 6962 / RFC 9162 の Merkle Tree Hash。葉は block_hash（32バイト）
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+HASH_BYTES = 32
+
+
+def leaf_hash(block_hash_hex: str) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(block_hash_hex)).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _largest_power_of_two_below(n: int) -> int:
+    # n > 1 に対し k < n <= 2k となる 2 のべき k
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def signed_root_digest(tree_size: int, root_hash_hex: str) -> str:
+    # 署名対象: {"root_hash","tree_size"} の canonical JSON の SHA-256
+    body = json.dumps(
+        {"root_hash": root_hash_hex, "tree_size": tree_size},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+# frontier: 木の大きさの2進展開に対応する完全部分木の根（左=大きい順）。
+# 追記のたびに O(log n) で根を更新でき、木全体を保持せずに署名付きの根を作れる
+def frontier_append(frontier: list[bytes], tree_size: int, leaves: Iterable[bytes]) -> int:
+    for leaf in leaves:
+        frontier.append(leaf)
+        size = tree_size
+        # 下位ビットから連続する 1 の数だけ、同じ大きさの部分木を併合する
+        while size & 1:
+            right = frontier.pop()
+            left = frontier.pop()
+            frontier.append(node_hash(left, right))
+            size >>= 1
+        tree_size += 1
+    return tree_size
+
+
+def frontier_root(frontier: list[bytes]) -> bytes:
+    if not frontier:
+        return hashlib.sha256(b"").digest()
+    root = frontier[-1]
+    for node in reversed(frontier[:-1]):
+        root = node_hash(node, root)
+    return root
+
+
+class MerkleTree:
+    # 全ノードを段ごとに連結した bytearray で保持する。
+    # 段 k の i 番目 = 葉 i*2^k からの完全部分木の根
+    def __init__(self) -> None:
+        self.levels: list[bytearray] = [bytearray()]
+        self.size = 0
+
+    def _node(self, level: int, position: int) -> bytes:
+        offset = position * HASH_BYTES
+        return bytes(self.levels[level][offset : offset + HASH_BYTES])
+
+    def append(self, leaf: bytes) -> None:
+        self.levels[0] += leaf
+        self.size += 1
+        level, position = 0, self.size - 1
+        # 右側の子が埋まった完全部分木の根を上の段へ追加する
+        while position & 1:
+            node = node_hash(self._node(level, position - 1), self._node(level, position))
+            level += 1
+            position >>= 1
+            if len(self.levels) == level:
+                self.levels.append(bytearray())
+            self.levels[level] += node
+
+    def sync(self, blocks: list[dict[str, Any]]) -> None:
+        for block in blocks[self.size :]:
+            self.append(leaf_hash(block["block_hash"]))
+
+    def subtree_hash(self, start: int, end: int) -> bytes:
+        # 葉 [start, end) の Merkle Tree Hash（end <= size）
+        n = end - start
+        if n == 0:
+            return hashlib.sha256(b"").digest()
+        if n & (n - 1) == 0 and start % n == 0:
+            return self._node(n.bit_length() - 1, start // n)
+        k = _largest_power_of_two_below(n)
+        return node_hash(self.subtree_hash(start, start + k), self.subtree_hash(start + k, end))
+
+    def root(self, tree_size: int | None = None) -> bytes:
+        return self.subtree_hash(0, self.size if tree_size is None else tree_size)
+
+    def inclusion_proof(self, index: int, tree_size: int) -> list[bytes]:
+        # RFC 9162 2.1.3.1 PATH(m, D[n])
+        if not 0 <= index < tree_size <= self.size:
+            raise ValueError("index out of range")
+        proof: list[bytes] = []
+        start, end = 0, tree_size
+        while end - start > 1:
+            k = _largest_power_of_two_below(end - start)
+            if index < start + k:
+                proof.append(self.subtree_hash(start + k, end))
+                end = start + k
+            else:
+                proof.append(self.subtree_hash(start, start + k))
+                start += k
+        proof.reverse()
+        return proof
+
+    def consistency_proof(self, first: int, second: int) -> list[bytes]:
+        # RFC 9162 2.1.4.1 PROOF(m, D[n])
+        if not 0 < first <= second <= self.size:
+            raise ValueError("tree size out of range")
+        proof: list[bytes] = []
+        start, end, complete = 0, second, True
+        while first != end:
+            k = _largest_power_of_two_below(end - start)
+            if first - start <= k:
+                proof.append(self.subtree_hash(start + k, end))
+                end = start + k
+            else:
+                proof.append(self.subtree_hash(start, start + k))
+                start += k
+                complete = False
+        if not complete:
+            proof.append(self.subtree_hash(start, end))
+        proof.reverse()
+        return proof
+
+
+def verify_inclusion(
+    leaf: bytes, index: int, tree_size: int, proof: list[bytes], root: bytes
+) -> bool:
+    # RFC 9162 2.1.3.2
+    if not 0 <= index < tree_size:
+        return False
+    fn, sn = index, tree_size - 1
+    r = leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(
+    first: int, second: int, proof: list[bytes], first_root: bytes, second_root: bytes
+) -> bool:
+    # RFC 9162 2.1.4.2
+    if not 0 < first <= second:
+        return False
+    if first == second:
+        return not proof and first_root == second_root
+    path = list(proof)
+    if first & (first - 1) == 0:
+        path.insert(0, first_root)
+    if not path:
+        return False
+    fn, sn = first - 1, second - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = path[0]
+    for c in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == first_root and sr == second_root
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from typing import Any
+
+from app.profiling import record_phase
+
+# Prometheus テキスト形式（0.0.4）のプロセス内メトリクス。外部依存なし。
+# 記録は辞書の更新と bisect のみで、本番で常時有効にしておける。
+# 値はプロセスごと（uvicorn --workers N では各ワーカーが自分の値を返す）
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+UNMATCHED_ROUTE = "unmatched"
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value)
+
+
+def _label_text(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in items:
+            lines.append(
+                f"{self.name}{_label_text(self.labelnames, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        phase: str | None = None,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # 指定時は処理中の要求の内訳にも "<phase>:<ラベル値>" として加える
+        self.phase = phase
+        self._lock = threading.Lock()
+        # ラベルごとに [各バケットの件数..., +Inf の件数], 合計
+        self._counts: dict[Labels, list[int]] = {}
+        self._sums: dict[Labels, float] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            counts[position] += 1
+            self._sums[labels] = self._sums.get(labels, 0.0) + value
+        if self.phase is not None:
+            record_phase(f"{self.phase}:{'/'.join(labels)}" if labels else self.phase, value)
+
+    def snapshot(self, labels: Labels = ()) -> tuple[int, float]:
+        # (件数, 合計)
+        with self._lock:
+            return sum(self._counts.get(labels, ())), self._sums.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v), self._sums[k]) for k, v in self._counts.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_text = _label_text(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Gauge:
+    # 値は収集時に callback から取る（記録側の負荷はない）。None は出力しない
+    def __init__(self, name: str, help_text: str, callback: Callable[[], float | None]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        try:
+            value = self.callback()
+        except Exception:
+            value = None
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        if value is not None:
+            lines.append(f"{self.name} {_format_value(float(value))}")
+        return lines
+
+
+_registry_lock = threading.Lock()
+_registry: dict[str, Counter | Histogram | Gauge] = {}
+
+
+def counter(name: str, help_text: str, labelnames: Labels = ()) -> Counter:
+    # 同名があればそれを返す（モジュール再読込でも値を引き継ぐ）
+    with _registry_lock:
+        metric = _registry.get(name)
+        if not isinstance(metric, Counter):
+            metric = _registry[name] = Counter(name, help_text, labelnames)
+        return metric
+
+
+def histogram(
+    name: str,
+    help_text: str,
+    labelnames: Labels = (),
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    phase: str | None = None,
+) -> Histogram:
+    with _registry_lock:
+        metric = _registry.get(name)
+        if not isinstance(metric, Histogram):
+            metric = _registry[name] = Histogram(name, help_text, labelnames, buckets, phase)
+        return metric
+
+
+def gauge(name: str, help_text: str, callback: Callable[[], float | None]) -> Gauge:
+    # callback は後から登録したもので置き換える
+    with _registry_lock:
+        metric = _registry[name] = Gauge(name, help_text, callback)
+        return metric
+
+
+def render_metrics() -> str:
+    with _registry_lock:
+        metrics = [_registry[name] for name in sorted(_registry)]
+    lines: list[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_SECONDS = histogram(
+    "checksum_registry_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS = counter(
+    "checksum_registry_http_requests_total",
+    "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    # 純粋な ASGI ミドルウェア（本文のストリーミングには手を入れない）。
+    # route はルーティング後の scope["route"] のパステンプレートで、未一致は "unmatched"
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message: Any) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope.get("method", "")
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, (method, route))
+            HTTP_REQUESTS.inc(1.0, (method, route, str(status[0])))
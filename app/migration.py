@@ -4,7 +4,7 @@ import json
 from pathlib import Path
 from typing import Any
 
-from app.crypto_keys import load_private_key, sign_block_hash
+from app.crypto_keys import SigningKey, get_signer
 from app.ledger import (
     CANONICAL_JSON_LABEL,
     GENESIS_PREV_HASH,
@@ -13,6 +13,7 @@ from app.ledger import (
     _atomic_write_json,
     _build_block_hash_from_body,
 )
+from app.ledger_store import SegmentedLedgerStore
 
 
 def _extract_v01_records(v01_ledger: dict[str, Any]) -> list[dict[str, Any]]:
@@ -37,10 +38,9 @@ def _extract_v01_records(v01_ledger: dict[str, Any]) -> list[dict[str, Any]]:
     return out
 
 
-def _sign_block_body(body: dict[str, Any]) -> dict[str, Any]:
-    private_key = load_private_key()
+def _sign_block_body(signer: SigningKey, body: dict[str, Any]) -> dict[str, Any]:
     block_hash = _build_block_hash_from_body(body)
-    signature, key_id = sign_block_hash(private_key, block_hash)
+    signature, key_id = signer.sign(block_hash)
     return {
         **body,
         "block_hash": block_hash,
@@ -72,6 +72,7 @@ def migrate_v01_to_v02(
         raise ValueError("source ledger is not schema_version 0.1")
 
     records = _extract_v01_records(src)
+    signer = get_signer().load()
 
     blocks: list[dict[str, Any]] = []
 
@@ -82,7 +83,7 @@ def migrate_v01_to_v02(
         "prev_hash": GENESIS_PREV_HASH,
         "entry": {"type": "genesis"},
     }
-    genesis = _sign_block_body(genesis_body)
+    genesis = _sign_block_body(signer, genesis_body)
     blocks.append(genesis)
 
     for i, rec in enumerate(records, start=1):
@@ -92,7 +93,7 @@ def migrate_v01_to_v02(
             "prev_hash": blocks[i - 1]["block_hash"],
             "entry": rec["entry"],
         }
-        blocks.append(_sign_block_body(body))
+        blocks.append(_sign_block_body(signer, body))
 
     dst_ledger = {
         "schema_version": "0.2",
@@ -102,6 +103,6 @@ def migrate_v01_to_v02(
         "blocks": blocks,
     }
 
-    _atomic_write_json(dst_ledger_path, dst_ledger)
+    SegmentedLedgerStore(dst_ledger_path).rewrite(dst_ledger, blocks)
     _atomic_write_json(dst_anchor_path, _build_anchor(dst_ledger_path, dst_ledger))
     return dst_ledger_path, dst_anchor_path
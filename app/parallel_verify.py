@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, cast
+
+from app import ledger
+from app.crypto_keys import get_verifier
+from app.ledger_store import SegmentedLedgerStore, read_segment_blocks
+
+PUBLIC_KEY_PATH = Path("keys/public_key.pem")
+MIN_PARALLEL_BLOCKS = 4096
+DEFAULT_CHUNK_BLOCKS = 8192
+
+VerifyResult = tuple[bool, int | None, str | None]
+# (範囲の検証結果, ブロック数, 先頭ブロックの prev_hash, 末尾ブロックの block_hash)
+RangeResult = tuple[VerifyResult, int, str | None, str | None]
+
+
+def _verify_range(
+    blocks: list[dict[str, Any]],
+    start: int,
+    public_key_path: str,
+    expected_key_id: str,
+) -> RangeResult:
+    # 範囲先頭の prev_hash 連結は呼び出し元で境界ごとに確認する
+    # 鍵ファイルの確認は範囲ごとに1回
+    result = ledger._verify_block_sequence(
+        blocks, start, None, get_verifier(public_key_path).load(), expected_key_id
+    )
+    if not blocks:
+        return result, 0, None, None
+    return result, len(blocks), blocks[0].get("prev_hash"), blocks[-1].get("block_hash")
+
+
+def _verify_block_range(task: tuple[list[dict[str, Any]], int, str, str]) -> RangeResult:
+    return _verify_range(*task)
+
+
+def _verify_segment_range(task: tuple[list[str], int, str, str]) -> RangeResult:
+    paths, start, public_key_path, expected_key_id = task
+    blocks = [block for path in paths for block in read_segment_blocks(Path(path))]
+    return _verify_range(blocks, start, public_key_path, expected_key_id)
+
+
+def _merge_range_results(starts: list[int], results: list[RangeResult]) -> VerifyResult | None:
+    # 逐次検証と同じ「最小 index の失敗とその reason」を返す。範囲の位置が連続しない場合は None
+    prev_last_hash: str | None = None
+    expected_start = 0
+    for r, (start, range_result) in enumerate(zip(starts, results, strict=True)):
+        result, count, first_prev, last_hash = range_result
+        if start != expected_start:
+            return None
+        expected_start += count
+        if r > 0 and count > 0 and first_prev != prev_last_hash:
+            # 逐次検証では index / block_hash の確認が prev_hash より先に行われる
+            if not result[0] and result[1] == start and result[2] in {
+                "index_mismatch",
+                "block_hash_mismatch",
+            }:
+                return result
+            return (False, start, "prev_hash_mismatch")
+        if not result[0]:
+            return result
+        if count > 0:
+            prev_last_hash = last_hash
+    return (True, None, None)
+
+
+def verify_chain_parallel(
+    target: dict[str, Any] | None = None,
+    workers: int | None = None,
+    chunk_blocks: int = DEFAULT_CHUNK_BLOCKS,
+) -> tuple[bool, int | None, str | None]:
+    # verify_chain(full=True) と同じ結果を、ブロック範囲ごとのプロセス並列で求める。
+    # target 省略時はディスク上のセグメントを各ワーカーが直接読み込む。
+    workers = workers or os.cpu_count() or 1
+    store = ledger._store()
+    # セグメント単位でワーカーへ渡せるのはセグメント形式のみ（他の保存先はメモリ上の範囲で分割）
+    on_disk = (
+        target is None
+        and isinstance(store, SegmentedLedgerStore)
+        and store.exists()
+        and not store.is_legacy()
+    )
+    blocks: list[dict[str, Any]] = []
+    state: dict[str, Any] | None = None
+    if on_disk:
+        # 各ワーカーが読み込む前の台帳状態をチェックポイントの照合キーにする
+        with ledger.ledger_lock():
+            state = store.state()
+            segment_files = cast(SegmentedLedgerStore, store).segment_files()
+        block_count = state["block_count"] if state is not None else 0
+        first_block = next(store.iter_blocks(), None)
+    else:
+        loaded = ledger.load_ledger() if target is None else target
+        raw_blocks = loaded.get("blocks")
+        if not isinstance(raw_blocks, list):
+            return (False, 0, "invalid_genesis")
+        blocks = raw_blocks
+        block_count = len(blocks)
+        first_block = blocks[0] if blocks else None
+
+    if workers <= 1 or block_count < MIN_PARALLEL_BLOCKS:
+        return ledger.verify_chain(target, full=True)
+    if first_block is None:
+        return (False, 0, "invalid_genesis")
+    try:
+        public_key_path = str(PUBLIC_KEY_PATH.resolve())
+        expected_key_id = get_verifier(public_key_path).key_id
+    except Exception:
+        return (False, 0, "unknown_key")
+    genesis_result = ledger._verify_genesis(first_block)
+    if genesis_result is not None:
+        return genesis_result
+
+    starts: list[int] = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        if on_disk:
+            segment_tasks: list[tuple[list[str], int, str, str]] = []
+            for first_index, path in segment_files:
+                if not segment_tasks or first_index - starts[-1] >= chunk_blocks:
+                    starts.append(first_index)
+                    segment_tasks.append(([], first_index, public_key_path, expected_key_id))
+                segment_tasks[-1][0].append(str(path.resolve()))
+            results = list(pool.map(_verify_segment_range, segment_tasks))
+        else:
+            block_tasks: list[tuple[list[dict[str, Any]], int, str, str]] = []
+            for start in range(0, len(blocks), chunk_blocks):
+                starts.append(start)
+                block_tasks.append(
+                    (blocks[start : start + chunk_blocks], start, public_key_path, expected_key_id)
+                )
+            results = list(pool.map(_verify_block_range, block_tasks))
+
+    merged = _merge_range_results(starts, results)
+    if merged is None:
+        # セグメントの件数が想定と異なる（欠落・改ざん）場合は逐次検証で位置を確定する
+        return ledger.verify_chain(target, full=True)
+    if merged[0] and on_disk and results:
+        last_index = starts[-1] + results[-1][1] - 1
+        ledger._save_verified_checkpoint(
+            {"index": last_index, "block_hash": results[-1][3]}, state
+        )
+    return merged
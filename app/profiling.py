@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as StackCounts
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+# 要求ごとの処理内訳（phase）と、任意で有効にするサンプリングプロファイラ。
+#   CHECKSUM_REGISTRY_PROFILING: "header"（X-Profile: 1 の要求）/ "sample"（一定割合）/ 両方を
+#     カンマ区切りで指定。既定は無効
+#   CHECKSUM_REGISTRY_SLOW_REQUEST_SECONDS: これを超えた要求の内訳を slow log に残す（0 以下で無効）
+PROFILING_TRIGGERS = frozenset(
+    t.strip() for t in os.environ.get("CHECKSUM_REGISTRY_PROFILING", "").split(",") if t.strip()
+)
+PROFILE_SAMPLE_RATE = float(os.environ.get("CHECKSUM_REGISTRY_PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_DIR = Path("logs/profiles")
+PROFILE_MAX_FILES = 200
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+SLOW_REQUEST_SECONDS = float(os.environ.get("CHECKSUM_REGISTRY_SLOW_REQUEST_SECONDS", "2.0"))
+SLOW_REQUEST_LOG_PATH = Path("logs/slow_requests.jsonl")
+
+
+def _utc_now_iso8601_seconds() -> str:
+    return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class RequestTrace:
+    # phase 名 -> [合計秒, 回数]。phase は入れ子・重複しうる（合計は所要時間と一致しない）
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.phases: dict[str, list[float]] = {}
+
+    def add(self, name: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                self.phases[name] = [seconds, count]
+            else:
+                phase[0] += seconds
+                phase[1] += count
+
+    def merge(self, other: RequestTrace) -> None:
+        for name, (seconds, count) in other.snapshot().items():
+            self.add(name, seconds, int(count))
+
+    def snapshot(self) -> dict[str, list[float]]:
+        with self._lock:
+            return {name: list(values) for name, values in self.phases.items()}
+
+    def breakdown(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {"ms": round(seconds * 1000, 3), "count": int(count)}
+            for name, (seconds, count) in sorted(self.snapshot().items())
+        }
+
+
+# threadpool で実行される同期エンドポイントにも contextvars として引き継がれる
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("request_trace", default=None)
+
+
+def current_trace() -> RequestTrace | None:
+    return _current_trace.get()
+
+
+def record_phase(name: str, seconds: float) -> None:
+    # 要求の処理中でなければ何もしない
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def active_trace(trace: RequestTrace) -> Iterator[RequestTrace]:
+    token: Token[RequestTrace | None] = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+class StackSampler:
+    # 全スレッドのスタックを一定間隔で採取し、folded 形式（"thread;frame;...": 件数）で集計する。
+    # イベントループ・threadpool・書き込みスレッドにまたがる処理をまとめて見られる。
+    # 同時に処理中の他の要求のスタックも含まれる
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS) -> None:
+        self.interval = interval
+        self.samples = 0
+        self._counts: StackCounts[str] = StackCounts()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> dict[str, int]:
+        self._stop.set()
+        self._thread.join()
+        return dict(self._counts.most_common())
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack: list[str] = []
+                current: Any = frame
+                while current is not None:
+                    code = current.f_code
+                    filename = os.path.basename(code.co_filename)
+                    stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                    current = current.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+# プロファイラは同時に1要求だけ（他の要求は内訳のみ記録する）
+_profile_lock = threading.Lock()
+_slow_log_lock = threading.Lock()
+
+
+def _should_profile(headers: list[tuple[bytes, bytes]]) -> bool:
+    if "header" in PROFILING_TRIGGERS and any(
+        name.lower() == PROFILE_HEADER and value.strip() == b"1" for name, value in headers
+    ):
+        return True
+    return "sample" in PROFILING_TRIGGERS and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _prune_profiles() -> None:
+    profiles = sorted(PROFILE_DIR.glob("*.json"))
+    for old in profiles[: max(len(profiles) - PROFILE_MAX_FILES, 0)]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def save_profile(profile_id: str, summary: dict[str, Any], stacks: dict[str, int]) -> Path:
+    # <id>.json: 要求の概要と内訳 / <id>.folded: flamegraph・speedscope で読める folded 形式
+    path = PROFILE_DIR / f"{profile_id}.json"
+    _write_json(path, {**summary, "stacks": len(stacks)})
+    folded = "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+    path.with_suffix(".folded").write_text(folded, encoding="utf-8")
+    _prune_profiles()
+    return path
+
+
+def log_slow_request(summary: dict[str, Any]) -> None:
+    line = json.dumps(summary, ensure_ascii=False, sort_keys=True) + "\n"
+    with _slow_log_lock:
+        SLOW_REQUEST_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with SLOW_REQUEST_LOG_PATH.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class ProfilingMiddleware:
+    # すべての HTTP 要求に RequestTrace を割り当て、閾値を超えたものを slow log に記録する。
+    # プロファイル対象の要求は StackSampler で採取し、PROFILE_DIR に保存する
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace()
+        profile_id: str | None = None
+        sampler: StackSampler | None = None
+        if (
+            PROFILING_TRIGGERS
+            and _should_profile(scope.get("headers", []))
+            and _profile_lock.acquire(blocking=False)
+        ):
+            profile_id = f"{datetime.now(UTC):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+            sampler = StackSampler()
+            sampler.start()
+        status = [500]
+
+        async def send_wrapper(message: Any) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if profile_id is not None:
+                    header = (PROFILE_ID_HEADER, profile_id.encode("ascii"))
+                    message = {**message, "headers": [*message.get("headers", []), header]}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            with active_trace(trace):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            stacks = None
+            if sampler is not None:
+                stacks = sampler.stop()
+                _profile_lock.release()
+            is_slow = 0 < SLOW_REQUEST_SECONDS <= elapsed
+            if stacks is not None or is_slow:
+                self._report(scope, status[0], elapsed, trace, profile_id, sampler, stacks, is_slow)
+
+    def _report(
+        self,
+        scope: Any,
+        status: int,
+        elapsed: float,
+        trace: RequestTrace,
+        profile_id: str | None,
+        sampler: StackSampler | None,
+        stacks: dict[str, int] | None,
+        is_slow: bool,
+    ) -> None:
+        summary: dict[str, Any] = {
+            "timestamp_utc": _utc_now_iso8601_seconds(),
+            "method": scope.get("method", ""),
+            "path": scope.get("path", ""),
+            "route": getattr(scope.get("route"), "path", None),
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 3),
+            "phases": trace.breakdown(),
+        }
+        try:
+            if profile_id is not None and stacks is not None and sampler is not None:
+                summary["profile_id"] = profile_id
+                save_profile(
+                    profile_id,
+                    {**summary, "samples": sampler.samples, "interval_ms": sampler.interval * 1000},
+                    stacks,
+                )
+            if is_slow:
+                log_slow_request(summary)
+        except OSError:
+            # 記録の失敗で応答済みの要求をエラーにしない
+            pass
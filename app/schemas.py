@@ -9,6 +9,11 @@ class HealthResponse(BaseModel):
     status: str
 
 
+class ErrorDetail(BaseModel):
+    code: str
+    message: str
+
+
 class RegisterResponse(BaseModel):
     index: int
     name: str
@@ -21,6 +26,39 @@ class RegisterResponse(BaseModel):
     signature: str
 
 
+class BatchRegisterItem(BaseModel):
+    name: str
+    version: str
+    sha256: str
+    file_size_bytes: int
+    original_filename: str
+
+
+class BatchRegisterRequest(BaseModel):
+    items: list[BatchRegisterItem]
+
+
+class BatchRegisterResult(BaseModel):
+    position: int
+    status: str
+    name: str | None = None
+    version: str | None = None
+    index: int | None = None
+    sha256: str | None = None
+    file_size_bytes: int | None = None
+    original_filename: str | None = None
+    timestamp_utc: str | None = None
+    signing_key_id: str | None = None
+    signature: str | None = None
+    error: ErrorDetail | None = None
+
+
+class BatchRegisterResponse(BaseModel):
+    registered: int
+    rejected: int
+    results: list[BatchRegisterResult]
+
+
 class VerifyResponse(BaseModel):
     matched: bool
     match_mode: str
@@ -33,21 +71,22 @@ class VerifyResponse(BaseModel):
     signature: str | None = None
 
 
-class RecordItem(BaseModel):
+class ProjectedRecordItem(BaseModel):
     index: int
-    timestamp_utc: str
-    name: str
-    version: str
-    sha256: str
-    file_size_bytes: int
-    original_filename: str
+    timestamp_utc: str | None = None
+    name: str | None = None
+    version: str | None = None
+    sha256: str | None = None
+    file_size_bytes: int | None = None
+    original_filename: str | None = None
     signing_key_id: str | None = None
     signature: str | None = None
 
 
 class RecordsResponse(BaseModel):
     count: int
-    items: list[RecordItem]
+    items: list[ProjectedRecordItem]
+    next_cursor: int | None = None
 
 
 class VerifyChecks(BaseModel):
@@ -61,6 +100,21 @@ class LedgerVerifySuccessResponse(BaseModel):
     checks: VerifyChecks
 
 
+class CheckpointItem(BaseModel):
+    index: int
+    block_hash: str
+    block_count: int
+    record_count: int
+    timestamp_utc: str
+    signing_key_id: str
+    signature: str
+
+
+class CheckpointsResponse(BaseModel):
+    count: int
+    items: list[CheckpointItem]
+
+
 class PublicKeyResponse(BaseModel):
     key_id: str
     public_key_pem: str
@@ -76,9 +130,45 @@ class AnchorLatestResponse(BaseModel):
     signature: str
 
 
-class ErrorDetail(BaseModel):
-    code: str
-    message: str
+class MerkleRootResponse(BaseModel):
+    schema_version: str
+    tree_algorithm: str
+    tree_size: int
+    root_hash: str
+    timestamp_utc: str
+    signing_key_id: str
+    signature: str
+
+
+class MerkleInclusionResponse(BaseModel):
+    index: int
+    tree_size: int
+    block_hash: str
+    leaf_hash: str
+    root_hash: str
+    audit_path: list[str]
+
+
+class MerkleConsistencyResponse(BaseModel):
+    first: int
+    second: int
+    first_root_hash: str
+    second_root_hash: str
+    proof: list[str]
+
+
+class AuditEvent(BaseModel):
+    timestamp_utc: str
+    action: str
+    status: str
+    details: dict[str, Any]
+
+
+class AuditQueryResponse(BaseModel):
+    count: int
+    items: list[AuditEvent]
+    segments_scanned: int
+    segments_skipped: int
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, cast
+
+from app.ledger_store import _block_line
+
+STORAGE_FORMAT = "sqlite"
+BUSY_TIMEOUT_SECONDS = 5.0
+# 内容ダイジェストの初期値（0件）
+EMPTY_CONTENT_DIGEST = "0" * 64
+
+# block 列はセグメント形式の1行と同じ canonical JSON。検索用の列はそこから取り出した写し
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    idx INTEGER PRIMARY KEY,
+    block_hash TEXT,
+    timestamp_utc TEXT,
+    entry_type TEXT,
+    name TEXT,
+    version TEXT,
+    sha256 TEXT,
+    block TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blocks_sha256 ON blocks (sha256);
+CREATE INDEX IF NOT EXISTS blocks_name_version ON blocks (name, version);
+CREATE INDEX IF NOT EXISTS blocks_timestamp ON blocks (timestamp_utc);
+CREATE TRIGGER IF NOT EXISTS blocks_no_update BEFORE UPDATE ON blocks
+BEGIN
+    SELECT RAISE(ABORT, 'ledger blocks are append-only');
+END;
+"""
+# 全体の書き直しのときだけ、同じトランザクション内で外して付け直す
+_NO_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS blocks_no_delete BEFORE DELETE ON blocks
+BEGIN
+    SELECT RAISE(ABORT, 'ledger blocks are append-only');
+END;
+"""
+
+
+def _row(position: int, block: dict[str, Any]) -> tuple[Any, ...]:
+    entry = block.get("entry")
+    fields = entry if isinstance(entry, dict) else {}
+    return (
+        position,
+        block.get("block_hash"),
+        block.get("timestamp_utc"),
+        fields.get("type"),
+        fields.get("name"),
+        fields.get("version"),
+        fields.get("file_sha256"),
+        _block_line(block)[:-1].decode("utf-8"),
+    )
+
+
+def _decode(text: str) -> dict[str, Any]:
+    return cast(dict[str, Any], json.loads(text))
+
+
+def _advance_digest(digest: str, texts: Iterable[str]) -> str:
+    # 内容ダイジェストを1行ずつ進める: d' = SHA-256(d || block || "\n")
+    for text in texts:
+        digest = hashlib.sha256(bytes.fromhex(digest) + text.encode("utf-8") + b"\n").hexdigest()
+    return digest
+
+
+# data/ledger.sqlite3 にヘッダ（meta）とブロック（1行1ブロック）を保存する。
+# WAL モードのため、複数プロセスからの読み出しは書き込みと並行できる。
+# ブロックの UPDATE / DELETE はトリガーで拒否し、追記のみとする
+class SqliteLedgerStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA + _NO_DELETE_TRIGGER)
+
+    def _meta(self, conn: sqlite3.Connection, key: str) -> str | None:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else str(row[0])
+
+    def _tail(self, conn: sqlite3.Connection) -> tuple[int, str | None]:
+        row = conn.execute(
+            "SELECT idx, block_hash FROM blocks ORDER BY idx DESC LIMIT 1"
+        ).fetchone()
+        return (0, None) if row is None else (int(row[0]) + 1, row[1])
+
+    def exists(self) -> bool:
+        if not self.path.exists():
+            return False
+        conn = self._connect()
+        try:
+            return self._meta(conn, "header") is not None
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            conn.close()
+
+    def is_legacy(self) -> bool:
+        return False
+
+    def header(self) -> dict[str, Any]:
+        conn = self._connect()
+        try:
+            value = self._meta(conn, "header")
+        finally:
+            conn.close()
+        if value is None:
+            raise FileNotFoundError(f"ledger not found: {self.path}")
+        return _decode(value)
+
+    def data_files(self) -> list[Path]:
+        return [self.path]
+
+    def identity(self) -> list[list[Any]]:
+        # キャッシュ無効化用（generation, ブロック数, 末尾 block_hash）
+        conn = self._connect()
+        try:
+            generation = self._meta(conn, "generation")
+            count, tail_hash = self._tail(conn)
+        finally:
+            conn.close()
+        return [[generation, count, tail_hash]]
+
+    def identity_extends(self, previous: list[list[Any]]) -> bool:
+        if len(previous) != 1:
+            return False
+        generation, count, tail_hash = previous[0]
+        return self._extends(generation, count, tail_hash)
+
+    def _extends(self, generation: Any, count: Any, tail_hash: Any) -> bool:
+        # 同じ generation で、以前の末尾ブロックがそのまま残っている（以降は追記のみ）
+        conn = self._connect()
+        try:
+            if self._meta(conn, "generation") != generation:
+                return False
+            if count == 0:
+                return True
+            row = conn.execute(
+                "SELECT block_hash FROM blocks WHERE idx = ?", (count - 1,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row is not None and row[0] == tail_hash
+
+    def _rows_digest(self, conn: sqlite3.Connection, digest: str, start: int, end: int) -> str:
+        rows = conn.execute(
+            "SELECT block FROM blocks WHERE idx >= ? AND idx < ? ORDER BY idx", (start, end)
+        )
+        return _advance_digest(digest, (text for (text,) in rows))
+
+    def _stored_digest(self, conn: sqlite3.Connection) -> tuple[int, str] | None:
+        # meta の (ブロック数, 内容ダイジェスト)。追記・書き直しと同じトランザクションで更新する
+        value = self._meta(conn, "content_digest")
+        if value is None:
+            return None
+        count, digest = json.loads(value)
+        return int(count), str(digest)
+
+    def _store_digest(self, conn: sqlite3.Connection, count: int, digest: str) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('content_digest', ?)",
+            (json.dumps([count, digest]),),
+        )
+
+    def _schema_version(self, conn: sqlite3.Connection) -> int:
+        # トリガーの削除・再作成で増える（行を書き換えるにはトリガーを外す必要がある）
+        return int(conn.execute("PRAGMA schema_version").fetchone()[0])
+
+    def iter_blocks(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        # 1回の読み取りトランザクション内で返すため、途中の追記は含まれない
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            rows = conn.execute(
+                "SELECT block FROM blocks WHERE idx >= ? ORDER BY idx", (max(start, 0),)
+            )
+            for (text,) in rows:
+                yield _decode(text)
+        finally:
+            conn.close()
+
+    def read(self) -> dict[str, Any]:
+        return {**self.header(), "blocks": list(self.iter_blocks())}
+
+    def tail(self) -> tuple[int, dict[str, Any] | None]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT idx, block FROM blocks ORDER BY idx DESC LIMIT 1").fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return 0, None
+        return int(row[0]) + 1, _decode(row[1])
+
+    def find_blocks(
+        self,
+        *,
+        sha256: str | None = None,
+        name: str | None = None,
+        version: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        # 索引を使った record の検索（index 昇順、after より後ろ）
+        clauses = ["entry_type = 'record'"]
+        params: list[Any] = []
+        if after is not None:
+            clauses.append("idx > ?")
+            params.append(after)
+        for column, value in (("sha256", sha256), ("name", name), ("version", version)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp_utc >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp_utc <= ?")
+            params.append(until)
+        sql = f"SELECT block FROM blocks WHERE {' AND '.join(clauses)} ORDER BY idx"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        conn = self._connect()
+        try:
+            return [_decode(text) for (text,) in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def find_name_version(self, name: str, version: str) -> int | None:
+        # LedgerIndex.find_name_version と同じく、最初に登録されたブロックの index
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT idx FROM blocks WHERE entry_type = 'record' AND name = ? AND version = ?"
+                " ORDER BY idx LIMIT 1",
+                (name, version),
+            ).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else int(row[0])
+
+    def state(self, rehash: bool = False) -> dict[str, Any] | None:
+        # 検証済みチェックポイントの照合キー。meta の内容ダイジェストとスキーマ版数を含める。
+        # rehash=True（全件検証時）、または meta のダイジェストが無い・件数が合わない場合のみ
+        # 全行を読み直して meta を作り直す
+        conn = self._connect()
+        try:
+            state = self._read_state(conn, rehash)
+            if state is None:
+                state = self._read_state(conn, True)
+        finally:
+            conn.close()
+        return state
+
+    def _read_state(self, conn: sqlite3.Connection, rehash: bool) -> dict[str, Any] | None:
+        # rehash=False で meta のダイジェストが使えない場合は None
+        conn.execute("BEGIN IMMEDIATE" if rehash else "BEGIN")
+        try:
+            generation = self._meta(conn, "generation")
+            count, tail_hash = self._tail(conn)
+            stored = self._stored_digest(conn)
+            if rehash:
+                digest = self._rows_digest(conn, EMPTY_CONTENT_DIGEST, 0, count)
+                if stored != (count, digest):
+                    self._store_digest(conn, count, digest)
+            elif stored is None or stored[0] != count:
+                conn.execute("ROLLBACK")
+                return None
+            else:
+                digest = stored[1]
+            schema_version = self._schema_version(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return {
+            "generation": generation,
+            "block_count": count,
+            "tail_hash": tail_hash,
+            "content_sha256": digest,
+            "schema_version": schema_version,
+        }
+
+    def state_extends(self, previous: dict[str, Any]) -> bool:
+        # previous 以降の追記分だけを読み、previous のダイジェストから進めた値が meta と一致するか。
+        # 一致しない場合は呼び出し側が全件検証する
+        try:
+            generation = previous["generation"]
+            count = int(previous["block_count"])
+            digest = str(previous["content_sha256"])
+            tail_hash = previous["tail_hash"]
+            schema_version = previous["schema_version"]
+        except (KeyError, TypeError, ValueError):
+            return False
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            if self._meta(conn, "generation") != generation:
+                return False
+            if self._schema_version(conn) != schema_version:
+                return False
+            if count > 0:
+                row = conn.execute(
+                    "SELECT block_hash FROM blocks WHERE idx = ?", (count - 1,)
+                ).fetchone()
+                if row is None or row[0] != tail_hash:
+                    return False
+            stored = self._stored_digest(conn)
+            if stored is None or stored[0] < count:
+                return False
+            return bool(self._rows_digest(conn, digest, count, stored[0]) == stored[1])
+        except ValueError:
+            return False
+        finally:
+            conn.close()
+
+    def append(self, blocks: Iterable[dict[str, Any]]) -> None:
+        # 呼び出し側で台帳ロックを保持していること。全ブロックを1トランザクションで確定する
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                expected, _ = self._tail(conn)
+                start = expected
+                rows = []
+                for block in blocks:
+                    if block.get("index") != expected:
+                        raise ValueError("block index does not follow ledger tail")
+                    rows.append(_row(expected, block))
+                    expected += 1
+                conn.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                # 内容ダイジェストを追記分だけ進める（meta と合わない場合は state() が作り直す）
+                stored = self._stored_digest(conn)
+                if stored is not None and stored[0] == start:
+                    digest = _advance_digest(stored[1], (row[-1] for row in rows))
+                    self._store_digest(conn, expected, digest)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def rewrite(self, header: dict[str, Any], blocks: Iterable[dict[str, Any]]) -> None:
+        conn = self._connect()
+        try:
+            self._initialize(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                generation = int(self._meta(conn, "generation") or 0) + 1
+                conn.execute("DROP TRIGGER IF EXISTS blocks_no_delete")
+                conn.execute("DELETE FROM blocks")
+                conn.execute(_NO_DELETE_TRIGGER)
+                digest = EMPTY_CONTENT_DIGEST
+                count = 0
+
+                def rows() -> Iterator[tuple[Any, ...]]:
+                    nonlocal digest, count
+                    for position, block in enumerate(blocks):
+                        row = _row(position, block)
+                        digest = _advance_digest(digest, [row[-1]])
+                        count = position + 1
+                        yield row
+
+                conn.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows())
+                self._store_digest(conn, count, digest)
+                stored = {k: v for k, v in header.items() if k not in {"blocks", "storage"}}
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [
+                        ("header", json.dumps(stored, ensure_ascii=False, sort_keys=True)),
+                        ("generation", str(generation)),
+                        ("storage_format", STORAGE_FORMAT),
+                    ],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def backup_to(self, dst: Path) -> None:
+        # WAL の内容も含めた一貫したコピーを作る（ファイル単位の複製は使わない）
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        dst.unlink(missing_ok=True)
+        src_conn = self._connect()
+        dst_conn = sqlite3.connect(dst)
+        try:
+            src_conn.backup(dst_conn)
+        finally:
+            dst_conn.close()
+            src_conn.close()
@@ -5,6 +5,7 @@ const verifyForm = document.getElementById("verify-form");
 const verifyResult = document.getElementById("verify-result");
 
 const reloadRecordsButton = document.getElementById("reload-records");
+const moreRecordsButton = document.getElementById("more-records");
 const recordsResult = document.getElementById("records-result");
 const recordsTbody = document.getElementById("records-tbody");
 
@@ -23,6 +24,20 @@ const anchorDot = document.getElementById("anchor-dot");
 const anchorText = document.getElementById("anchor-text");
 
 let latestAnchor = null;
+let recordsCursor = null;
+let recordsShown = 0;
+
+const RECORDS_PAGE_LIMIT = 100;
+const RECORDS_FIELDS = [
+  "index",
+  "timestamp_utc",
+  "name",
+  "version",
+  "sha256",
+  "file_size_bytes",
+  "original_filename",
+  "signing_key_id",
+].join(",");
 
 function setResult(el, text, tone = "") {
   el.textContent = text;
@@ -92,10 +107,14 @@ async function checkHealth() {
   }
 }
 
-async function loadRecords() {
+async function loadRecords(append = false) {
   setResult(recordsResult, "一覧を取得しています...", "warn");
   try {
-    const response = await fetch("/api/v1/records");
+    const params = new URLSearchParams({ limit: RECORDS_PAGE_LIMIT, fields: RECORDS_FIELDS });
+    if (append && recordsCursor !== null) {
+      params.set("cursor", recordsCursor);
+    }
+    const response = await fetch(`/api/v1/records?${params}`);
     const data = await response.json();
 
     if (response.status !== 200) {
@@ -103,7 +122,12 @@ async function loadRecords() {
       return;
     }
 
-    recordsTbody.innerHTML = "";
+    if (!append) {
+      recordsTbody.innerHTML = "";
+      recordsShown = 0;
+    }
+    recordsCursor = data.next_cursor;
+    moreRecordsButton.disabled = recordsCursor === null;
     for (const item of data.items) {
       const tr = document.createElement("tr");
       tr.innerHTML = `
@@ -118,7 +142,9 @@ async function loadRecords() {
       `;
       recordsTbody.appendChild(tr);
     }
-    setResult(recordsResult, `件数: ${data.count}`, "ok");
+    recordsShown += data.count;
+    const suffix = recordsCursor === null ? "" : "（続きあり）";
+    setResult(recordsResult, `表示件数: ${recordsShown}${suffix}`, "ok");
   } catch (_error) {
     setResult(recordsResult, "一覧取得に失敗しました", "ng");
   }
@@ -244,6 +270,16 @@ reloadRecordsButton.addEventListener("click", async () => {
   }
 });
 
+moreRecordsButton.addEventListener("click", async () => {
+  setBusy(moreRecordsButton, "取得中...");
+  try {
+    await loadRecords(true);
+  } finally {
+    clearBusy(moreRecordsButton);
+    moreRecordsButton.disabled = recordsCursor === null;
+  }
+});
+
 verifyLedgerButton.addEventListener("click", async () => {
   setBusy(verifyLedgerButton, "検証中...");
   setResult(ledgerResult, "台帳を検証しています...", "warn");
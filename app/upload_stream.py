@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import ClientDisconnect
+
+from app.hashing import CHUNK_SIZE, UPLOAD_HASH_BYTES, UPLOAD_HASH_SECONDS
+from app.profiling import record_phase
+
+DEFAULT_MAX_UPLOAD_BYTES = 10 * 1024**3
+MAX_UPLOAD_BYTES = int(
+    os.environ.get("CHECKSUM_REGISTRY_MAX_UPLOAD_BYTES", DEFAULT_MAX_UPLOAD_BYTES)
+)
+MAX_FIELD_BYTES = 64 * 1024
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+MAX_FORM_FILES = 1000
+MAX_FORM_FIELDS = 2000
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+class MultipartFormError(ValueError):
+    pass
+
+
+class StreamedFile:
+    def __init__(self, field_name: str, filename: str) -> None:
+        self.field_name = field_name
+        self.filename = filename
+        self.sha256 = ""
+        self.size_bytes = 0
+
+
+class StreamedForm:
+    # ファイル本体は保持せず、SHA-256 とサイズのみを持つ
+    def __init__(self) -> None:
+        self.fields: list[tuple[str, str]] = []
+        self.files: list[StreamedFile] = []
+        self.total_bytes = 0
+        self.elapsed_seconds = 0.0
+
+    def get(self, name: str, default: str = "") -> str:
+        for key, value in self.fields:
+            if key == name:
+                return value
+        return default
+
+    def getlist(self, name: str) -> list[str]:
+        return [value for key, value in self.fields if key == name]
+
+    def file(self, name: str) -> StreamedFile | None:
+        return next((f for f in self.files if f.field_name == name), None)
+
+    def file_list(self, name: str) -> list[StreamedFile]:
+        return [f for f in self.files if f.field_name == name]
+
+    def throughput(self) -> dict[str, Any]:
+        mib_per_second = 0.0
+        if self.elapsed_seconds > 0:
+            mib_per_second = self.total_bytes / 1024**2 / self.elapsed_seconds
+        return {
+            "bytes": self.total_bytes,
+            "elapsed_ms": round(self.elapsed_seconds * 1000, 3),
+            "mib_per_s": round(mib_per_second, 3),
+        }
+
+
+class _StreamingHasher:
+    # 受信済みデータを CHUNK_SIZE 単位でまとめ、ハッシュ計算をスレッドへ逃がす。
+    # 直前のチャンクの計算中も次のチャンクの受信を続ける。
+    def __init__(self) -> None:
+        self._hasher = hashlib.sha256()
+        self._chunks: list[bytes] = []
+        self._buffered = 0
+        self._pending: asyncio.Future[None] | None = None
+        self.size_bytes = 0
+
+    def feed(self, data: bytes) -> None:
+        self._chunks.append(data)
+        self._buffered += len(data)
+        self.size_bytes += len(data)
+
+    async def flush(self, final: bool = False) -> None:
+        if self._buffered < CHUNK_SIZE and not final:
+            return
+        await self.wait()
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            self._buffered = 0
+            self._pending = asyncio.ensure_future(asyncio.to_thread(self._hasher.update, data))
+        if final:
+            await self.wait()
+
+    async def wait(self) -> None:
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await pending
+
+    async def hexdigest(self) -> str:
+        await self.flush(final=True)
+        return self._hasher.hexdigest()
+
+
+class _FormStreamParser:
+    def __init__(self, charset: str, max_bytes: int) -> None:
+        self.form = StreamedForm()
+        self.charset = charset
+        self.max_bytes = max_bytes
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._field_name = ""
+        self._field_data = bytearray()
+        self._file: StreamedFile | None = None
+        self._hasher: _StreamingHasher | None = None
+        # ファイル終端は await が必要なため、write() の後でまとめて確定する
+        self.finished: list[tuple[StreamedFile, _StreamingHasher]] = []
+        self.active: list[_StreamingHasher] = []
+
+    def _decode(self, value: bytes) -> str:
+        try:
+            return value.decode(self.charset)
+        except UnicodeDecodeError:
+            return value.decode("latin-1")
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+        self._field_data = bytearray()
+        self._file = None
+        self._hasher = None
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise MultipartFormError("content-disposition name is required")
+        self._field_name = self._decode(options[b"name"])
+        if b"filename" in options:
+            if len(self.form.files) >= MAX_FORM_FILES:
+                raise MultipartFormError("too many files")
+            self._file = StreamedFile(self._field_name, self._decode(options[b"filename"]))
+            self._hasher = _StreamingHasher()
+            self.active.append(self._hasher)
+        elif len(self.form.fields) >= MAX_FORM_FIELDS:
+            raise MultipartFormError("too many fields")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._hasher is None:
+            if len(self._field_data) + end - start > MAX_FIELD_BYTES:
+                raise MultipartFormError("form field too large")
+            self._field_data += data[start:end]
+            return
+        self.form.total_bytes += end - start
+        if self.form.total_bytes > self.max_bytes:
+            raise UploadTooLargeError("upload exceeds max size")
+        self._hasher.feed(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._file is None or self._hasher is None:
+            self.form.fields.append((self._field_name, self._decode(bytes(self._field_data))))
+            return
+        self.form.files.append(self._file)
+        self.finished.append((self._file, self._hasher))
+
+
+async def stream_hash_form(
+    headers: Any,
+    stream: AsyncIterator[bytes],
+    max_bytes: int | None = None,
+) -> StreamedForm:
+    # multipart/form-data を受信しながら解析し、
+    # ファイル部は一時ファイルへ書かずに SHA-256 を計算する
+    limit = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    content_type = headers.get("content-type", "")
+    media_type, params = parse_options_header(content_type)
+    if media_type != b"multipart/form-data" or b"boundary" not in params:
+        raise MultipartFormError("multipart/form-data with boundary is required")
+    content_length = headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit + MULTIPART_OVERHEAD_BYTES:
+        # 本文を受信する前に、明らかな上限超過を拒否する
+        raise UploadTooLargeError("upload exceeds max size")
+    charset = params.get(b"charset", b"utf-8").decode("latin-1")
+
+    started = time.perf_counter()
+    state = _FormStreamParser(charset, limit)
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": state.on_part_begin,
+            "on_part_data": state.on_part_data,
+            "on_part_end": state.on_part_end,
+            "on_header_field": state.on_header_field,
+            "on_header_value": state.on_header_value,
+            "on_header_end": state.on_header_end,
+            "on_headers_finished": state.on_headers_finished,
+        },
+    )
+    try:
+        async for chunk in stream:
+            parser.write(chunk)
+            for hasher in state.active:
+                await hasher.flush()
+            for streamed, hasher in state.finished:
+                streamed.sha256 = await hasher.hexdigest()
+                streamed.size_bytes = hasher.size_bytes
+                state.active.remove(hasher)
+            state.finished.clear()
+        parser.finalize()
+    except (MultipartParseError, ClientDisconnect) as err:
+        # 不正な本文・受信途中の切断は入力エラーとして扱う
+        raise MultipartFormError("malformed or incomplete multipart body") from err
+    finally:
+        # 中断時もスレッドで実行中のハッシュ計算の完了を待ってから返す
+        for hasher in state.active:
+            await hasher.wait()
+    if state.active:
+        raise MultipartFormError("incomplete multipart body")
+    state.form.elapsed_seconds = time.perf_counter() - started
+    UPLOAD_HASH_SECONDS.inc(state.form.elapsed_seconds, ("multipart_stream",))
+    record_phase("upload_hash:multipart_stream", state.form.elapsed_seconds)
+    UPLOAD_HASH_BYTES.inc(state.form.total_bytes, ("multipart_stream",))
+    return state.form
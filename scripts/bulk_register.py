@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from app import ledger
+from app.audit import flush_audit_log, log_event
+from app.hashing import sha256_file_path
+from app.sqlite_store import SqliteLedgerStore
+
+# ディレクトリ（またはマニフェスト）の成果物をまとめて台帳へ登録する。
+# name/version は相対パス（"/" 区切り）に対する正規表現の名前付きグループ name / version で決める。
+# 既定は <name>/<version>/<file> の配置
+DEFAULT_PATTERN = r"(?:^|/)(?P<name>[^/]+)/(?P<version>[^/]+)/[^/]+$"
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+# 未完了のハッシュ計算をワーカー数のこの倍までに抑える（巨大なディレクトリでもメモリを一定に保つ）
+IN_FLIGHT_PER_WORKER = 4
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+
+def _derive(pattern: re.Pattern[str], relative: str) -> tuple[str, str] | None:
+    match = pattern.search(relative)
+    if match is None:
+        return None
+    return match.group("name"), match.group("version")
+
+
+def iter_directory(root: Path, pattern: re.Pattern[str], glob: str) -> Iterator[dict[str, Any]]:
+    # 相対パス順に列挙する（実行ごとに登録順を揃える）
+    for path in sorted(p for p in root.rglob(glob) if p.is_file()):
+        relative = path.relative_to(root).as_posix()
+        item: dict[str, Any] = {"path": str(path), "relative_path": relative}
+        derived = _derive(pattern, relative)
+        if derived is None:
+            item["status"] = "unmatched"
+        else:
+            item["name"], item["version"] = derived
+        yield item
+
+
+def iter_manifest(manifest: Path, pattern: re.Pattern[str]) -> Iterator[dict[str, Any]]:
+    # .csv（ヘッダ path,name,version）または JSON Lines。
+    # 相対 path はマニフェストの場所から解決し、name/version を省略した行はパスから導出する
+    with manifest.open(encoding="utf-8-sig", newline="") as f:
+        if manifest.suffix.lower() == ".csv":
+            rows: list[dict[str, Any]] = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    for row in rows:
+        relative = str(row.get("path") or "")
+        item: dict[str, Any] = {
+            "path": str(manifest.parent / relative),
+            "relative_path": relative,
+            "name": row.get("name") or "",
+            "version": row.get("version") or "",
+        }
+        if not item["name"] or not item["version"]:
+            derived = _derive(pattern, relative.replace("\\", "/"))
+            if derived is None:
+                item["status"] = "unmatched"
+            else:
+                item["name"] = item["name"] or derived[0]
+                item["version"] = item["version"] or derived[1]
+        yield item
+
+
+class Progress:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def update(self, hashed: int, total_bytes: int, *, final: bool = False) -> None:
+        now = time.perf_counter()
+        if not final and now - self._last < self.interval:
+            return
+        self._last = now
+        elapsed = now - self.started
+        mib_per_s = total_bytes / 1024**2 / elapsed if elapsed > 0 else 0.0
+        print(
+            f"hashed={hashed} bytes={total_bytes} mib_per_s={mib_per_s:.1f}"
+            f" elapsed_sec={elapsed:.1f}",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+def hash_items(
+    items: Iterator[dict[str, Any]], workers: int, progress: Progress
+) -> list[dict[str, Any]]:
+    # hashlib は大きなバッファの計算中に GIL を解放するため、スレッドで並列に読める
+    results: list[dict[str, Any]] = []
+    pending: deque[tuple[dict[str, Any], Future[tuple[str, int]]]] = deque()
+    hashed = 0
+    total_bytes = 0
+
+    def collect() -> None:
+        nonlocal hashed, total_bytes
+        item, future = pending.popleft()
+        try:
+            item["sha256"], item["file_size_bytes"] = future.result()
+        except OSError as err:
+            item["status"] = "error"
+            item["error"] = f"{type(err).__name__}: {err}"
+        else:
+            hashed += 1
+            total_bytes += item["file_size_bytes"]
+        progress.update(hashed, total_bytes)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-hash") as executor:
+        for item in items:
+            results.append(item)
+            if "status" in item:
+                continue
+            pending.append((item, executor.submit(sha256_file_path, item["path"])))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                collect()
+        while pending:
+            collect()
+    progress.update(hashed, total_bytes, final=True)
+    return results
+
+
+def plan(
+    results: list[dict[str, Any]], index: ledger.LedgerIndex | SqliteLedgerStore
+) -> list[dict[str, Any]]:
+    # 登録する entry を返し、各結果に invalid / duplicate を付ける（登録 API と同じ入力制約）
+    entries: list[dict[str, Any]] = []
+    seen: set[tuple[str, str]] = set()
+    for item in results:
+        if "status" in item:
+            continue
+        entry = ledger.parse_record_entry({**item, "original_filename": Path(item["path"]).name})
+        if entry is None:
+            item["status"] = "invalid"
+            continue
+        key = (entry["name"], entry["version"])
+        if key in seen or index.find_name_version(*key) is not None:
+            item["status"] = "duplicate"
+            continue
+        seen.add(key)
+        item["status"] = "pending"
+        entries.append(entry)
+    return entries
+
+
+def _ledger_index() -> ledger.LedgerIndex | SqliteLedgerStore:
+    # dry-run では台帳を作成しない
+    if not ledger._store().exists():
+        return ledger.LedgerIndex()
+    return ledger.load_name_version_index()
+
+
+def commit(results: list[dict[str, Any]]) -> int:
+    # 重複確認から追記までを1回の台帳ロック内で行う（稼働中のサーバーと同時に実行してもよい）
+    ledger.ensure_ledger_exists()
+    with ledger.ledger_lock():
+        entries = plan(results, ledger.load_name_version_index())
+        blocks = ledger.append_records(entries)
+    pending = (item for item in results if item["status"] == "pending")
+    for item, block in zip(pending, blocks, strict=True):
+        item["status"] = "registered"
+        item["index"] = block["index"]
+    return len(blocks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="登録するファイルを再帰的に探すディレクトリ")
+    source.add_argument("--manifest", help="path,name,version の CSV または JSON Lines")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN)
+    parser.add_argument("--glob", default="*", help="--dir で対象にするファイル名")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--progress-interval", type=float, default=PROGRESS_INTERVAL_SECONDS)
+    parser.add_argument("--dry-run", action="store_true", help="台帳へ書き込まずに結果だけ表示する")
+    parser.add_argument("--report", default=None, help="ファイルごとの結果を書き出す JSON")
+    args = parser.parse_args()
+
+    try:
+        pattern = re.compile(args.pattern)
+    except re.error as err:
+        parser.error(f"invalid --pattern: {err}")
+    if not {"name", "version"} <= set(pattern.groupindex):
+        parser.error("--pattern must define named groups 'name' and 'version'")
+
+    if args.dir is not None:
+        items = iter_directory(Path(args.dir), pattern, args.glob)
+    else:
+        items = iter_manifest(Path(args.manifest), pattern)
+    results = hash_items(items, max(args.workers, 1), Progress(args.progress_interval))
+
+    if args.dry_run:
+        plan(results, _ledger_index())
+        registered = 0
+    else:
+        registered = commit(results)
+
+    counts: dict[str, int] = {}
+    for item in results:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+    if not args.dry_run:
+        log_event("records_register_bulk", "success", {"registered": registered, **counts})
+        flush_audit_log()
+
+    if args.report is not None:
+        report = Path(args.report)
+        report.parent.mkdir(parents=True, exist_ok=True)
+        report.write_text(
+            json.dumps({"dry_run": args.dry_run, "results": results}, ensure_ascii=False, indent=2)
+            + "\n",
+            encoding="utf-8",
+        )
+
+    print(f"dry_run={args.dry_run}")
+    print(f"files={len(results)}")
+    for status in ("pending", "registered", "duplicate", "invalid", "unmatched", "error"):
+        if status in counts:
+            print(f"{status}={counts[status]}")
+    if counts.get("invalid") or counts.get("error"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
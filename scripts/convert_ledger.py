@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from app.binary_store import BinaryLedgerReader, write_binary_ledger
+from app.ledger import ledger_lock
+from app.ledger_store import LedgerStore, SegmentedLedgerStore
+from app.sqlite_store import SqliteLedgerStore
+
+FORMATS = ("json", "sqlite", "binary")
+
+
+def _source_format(path: Path) -> str:
+    if path.suffix == ".bin":
+        return "binary"
+    if path.suffix in {".sqlite3", ".sqlite", ".db"}:
+        return "sqlite"
+    return "json"
+
+
+def _open(fmt: str, path: Path) -> LedgerStore:
+    return SqliteLedgerStore(path) if fmt == "sqlite" else SegmentedLedgerStore(path)
+
+
+def _write(fmt: str, dst: Path, header: dict[str, Any], blocks: Iterable[dict[str, Any]]) -> int:
+    if fmt == "binary":
+        return write_binary_ledger(dst, header, blocks)
+    target = _open(fmt, dst)
+    target.rewrite(header, blocks)
+    return target.tail()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--to", choices=FORMATS, required=True)
+    parser.add_argument("--src", required=True)
+    parser.add_argument("--dst", required=True)
+    parser.add_argument(
+        "--from", dest="source", choices=FORMATS, default=None, help="既定: --src の拡張子から判定"
+    )
+    args = parser.parse_args()
+
+    src = Path(args.src)
+    dst = Path(args.dst)
+    source = args.source or _source_format(src)
+    # 書き出し中の追記と混ざらないよう台帳ロック内で読み書きする（ブロックは逐次変換する）
+    with ledger_lock():
+        if source == "binary":
+            with BinaryLedgerReader(src) as reader:
+                count = _write(args.to, dst, reader.header(), reader.iter_blocks())
+        else:
+            store = _open(source, src)
+            count = _write(args.to, dst, store.header(), store.iter_blocks())
+    print(f"converted_blocks={count}")
+    print(f"output={dst}")
+
+
+if __name__ == "__main__":
+    main()
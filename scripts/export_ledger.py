@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.export import EXPORT_KINDS, chunked, gzip_chunks, iter_export_lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kind", choices=EXPORT_KINDS, default="records")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", default="-", help="出力先（既定: 標準出力）")
+    args = parser.parse_args()
+
+    lines = iter_export_lines(args.kind, max(args.start, 0))
+    chunks = gzip_chunks(lines) if args.gzip else chunked(lines)
+    if args.output == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return
+
+    output = Path(args.output)
+    tmp_path = output.with_name(output.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    tmp_path.replace(output)
+    print(f"exported={output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import platform
+import random
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from app.hashing import CHUNK_SIZE, sha256_file_path, sha256_upload_file
+from app.upload_stream import stream_hash_form
+
+SCHEMA_VERSION = "1"
+MIB = 1024 * 1024
+DEFAULT_CHUNK_SIZES = [64 * 1024, 256 * 1024, MIB, 4 * MIB, 16 * MIB]
+DEFAULT_THREADS = [1, 2, 4, 8]
+DEFAULT_OUTPUT = Path("artifacts/perf/hash_benchmark.json")
+# uvicorn が ASGI の receive で渡す本文の大きさに合わせる
+UPLOAD_RECEIVE_BYTES = 64 * 1024
+BOUNDARY = "hash-benchmark-boundary"
+SEED = 20260222
+
+
+def _utc_now_iso8601_seconds() -> str:
+    return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _write_synthetic(path: Path, size_bytes: int, seed: int) -> None:
+    # 同じ seed なら同じ内容（環境によらず再現できる）
+    if path.exists() and path.stat().st_size == size_bytes:
+        return
+    block = random.Random(seed).randbytes(MIB)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        remaining = size_bytes
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+
+
+def hash_read(path: Path, chunk_size: int) -> tuple[str, int]:
+    hasher = hashlib.sha256()
+    size_bytes = 0
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+            size_bytes += len(chunk)
+    return hasher.hexdigest(), size_bytes
+
+
+def hash_readinto(path: Path, chunk_size: int) -> tuple[str, int]:
+    # 1つのバッファを使い回し、チャンクごとの bytes 確保をなくす
+    hasher = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    size_bytes = 0
+    with path.open("rb", buffering=0) as f:
+        while n := f.readinto(buffer):
+            hasher.update(view[:n])
+            size_bytes += n
+    return hasher.hexdigest(), size_bytes
+
+
+def hash_mmap(path: Path, chunk_size: int) -> tuple[str, int]:
+    hasher = hashlib.sha256()
+    with path.open("rb") as f:
+        size_bytes = os.fstat(f.fileno()).st_size
+        if size_bytes == 0:
+            return hasher.hexdigest(), 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size_bytes, chunk_size):
+                    hasher.update(view[offset : offset + chunk_size])
+            finally:
+                view.release()
+    return hasher.hexdigest(), size_bytes
+
+
+def hash_app(path: Path, chunk_size: int) -> tuple[str, int]:
+    # 本番の sha256_file_path（チャンクは CHUNK_SIZE 固定）
+    return sha256_file_path(str(path))
+
+
+FILE_METHODS: dict[str, Callable[[Path, int], tuple[str, int]]] = {
+    "read": hash_read,
+    "readinto": hash_readinto,
+    "mmap": hash_mmap,
+}
+
+
+class _SimulatedUpload:
+    # UploadFile と同じ async read(size) を持つ。スプール済みの一時ファイルを読む形を模す
+    def __init__(self, f: BinaryIO) -> None:
+        self._file = f
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+
+async def _upload_hash(path: Path) -> tuple[str, int]:
+    with path.open("rb") as f:
+        return await sha256_upload_file(_SimulatedUpload(f))
+
+
+async def _stream_hash(path: Path) -> tuple[str, int]:
+    # multipart 本文を UPLOAD_RECEIVE_BYTES ずつ受信しながら stream_hash_form で計算する
+    head = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="bench.bin"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode("latin-1")
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode("latin-1")
+    size_bytes = path.stat().st_size
+    headers = {
+        "content-type": f"multipart/form-data; boundary={BOUNDARY}",
+        "content-length": str(len(head) + size_bytes + len(tail)),
+    }
+
+    async def body() -> AsyncIterator[bytes]:
+        yield head
+        with path.open("rb") as f:
+            while chunk := f.read(UPLOAD_RECEIVE_BYTES):
+                yield chunk
+        yield tail
+
+    form = await stream_hash_form(headers, body(), max_bytes=size_bytes)
+    streamed = form.files[0]
+    return streamed.sha256, streamed.size_bytes
+
+
+def _measure(
+    name: str,
+    params: dict[str, Any],
+    size_bytes: int,
+    repeat: int,
+    run: Callable[[], Any],
+    expected: Any = None,
+) -> dict[str, Any]:
+    # 1回目はページキャッシュを温めるために捨てる。結果が期待値と違えば中断する
+    run()
+    runs: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        runs.append(time.perf_counter() - start)
+        if expected is not None and result != expected:
+            raise RuntimeError(f"{name}: unexpected result {result!r}")
+    median = statistics.median(runs)
+    return {
+        "name": name,
+        "params": params,
+        "bytes": size_bytes,
+        "runs_sec": [round(r, 6) for r in runs],
+        "best_sec": round(min(runs), 6),
+        "median_sec": round(median, 6),
+        "mib_per_s": round(size_bytes / MIB / median, 3) if median > 0 else 0.0,
+    }
+
+
+def result_key(result: dict[str, Any]) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def run_suite(args: argparse.Namespace, workdir: Path) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    large = workdir / "large.bin"
+    large_bytes = int(args.file_mib * MIB)
+    _write_synthetic(large, large_bytes, SEED)
+    expected = hash_read(large, CHUNK_SIZE)
+
+    # 1. チャンクサイズ × 読み出し方式（read / readinto / mmap）
+    for chunk_size in args.chunk_sizes:
+        for method, fn in FILE_METHODS.items():
+            results.append(
+                _measure(
+                    method,
+                    {"chunk_bytes": chunk_size},
+                    large_bytes,
+                    args.repeat,
+                    partial(fn, large, chunk_size),
+                    expected,
+                )
+            )
+    results.append(
+        _measure(
+            "sha256_file_path",
+            {"chunk_bytes": CHUNK_SIZE},
+            large_bytes,
+            args.repeat,
+            partial(hash_app, large, CHUNK_SIZE),
+            expected,
+        )
+    )
+
+    # 2. 多数ファイル: 逐次 vs スレッドプール
+    many = [workdir / "many" / f"{i:05d}.bin" for i in range(args.many_files)]
+    many_bytes = int(args.many_file_mib * MIB)
+    for i, path in enumerate(many):
+        _write_synthetic(path, many_bytes, SEED + 1 + i)
+    many_expected = [sha256_file_path(str(p)) for p in many]
+    total = many_bytes * len(many)
+    params: dict[str, Any] = {"files": len(many), "file_bytes": many_bytes}
+    results.append(
+        _measure(
+            "many_files_sequential",
+            params,
+            total,
+            args.repeat,
+            lambda: [sha256_file_path(str(p)) for p in many],
+            many_expected,
+        )
+    )
+    for workers in args.threads:
+
+        def pooled(workers: int = workers) -> list[tuple[str, int]]:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(sha256_file_path, map(str, many)))
+
+        results.append(
+            _measure(
+                "many_files_threadpool",
+                {**params, "workers": workers},
+                total,
+                args.repeat,
+                pooled,
+                many_expected,
+            )
+        )
+
+    # 3. アップロード経路
+    results.append(
+        _measure(
+            "sha256_upload_file",
+            {"chunk_bytes": CHUNK_SIZE},
+            large_bytes,
+            args.repeat,
+            lambda: asyncio.run(_upload_hash(large)),
+            expected,
+        )
+    )
+    results.append(
+        _measure(
+            "stream_hash_form",
+            {"receive_bytes": UPLOAD_RECEIVE_BYTES},
+            large_bytes,
+            args.repeat,
+            lambda: asyncio.run(_stream_hash(large)),
+            expected,
+        )
+    )
+    return results
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: dict[str, Any], threshold: float
+) -> list[dict[str, Any]]:
+    # 同じキーの mib_per_s を比べる。ratio < threshold を退行とする
+    previous = {result_key(r): r for r in baseline.get("results", [])}
+    rows = []
+    for result in results:
+        key = result_key(result)
+        before = previous.get(key)
+        if before is None or not before.get("mib_per_s"):
+            continue
+        ratio = result["mib_per_s"] / before["mib_per_s"]
+        rows.append(
+            {
+                "key": key,
+                "baseline_mib_per_s": before["mib_per_s"],
+                "mib_per_s": result["mib_per_s"],
+                "ratio": round(ratio, 3),
+                "regressed": ratio < threshold,
+            }
+        )
+    return rows
+
+
+def _parse_sizes(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workdir", help="合成ファイルの置き場所（省略時は一時ディレクトリ）")
+    parser.add_argument("--file-mib", type=float, default=256)
+    parser.add_argument("--chunk-sizes", type=_parse_sizes, default=DEFAULT_CHUNK_SIZES)
+    parser.add_argument("--many-files", type=int, default=64)
+    parser.add_argument("--many-file-mib", type=float, default=4)
+    parser.add_argument("--threads", type=_parse_sizes, default=DEFAULT_THREADS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--baseline", help="比較する過去の結果 JSON")
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = run_suite(args, workdir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="hash-bench-") as tmp:
+            results = run_suite(args, Path(tmp))
+
+    report: dict[str, Any] = {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at_utc": _utc_now_iso8601_seconds(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "openssl": ssl.OPENSSL_VERSION,
+        },
+        "config": {
+            "file_bytes": int(args.file_mib * MIB),
+            "chunk_sizes": args.chunk_sizes,
+            "many_files": args.many_files,
+            "many_file_bytes": int(args.many_file_mib * MIB),
+            "threads": args.threads,
+            "repeat": args.repeat,
+            "seed": SEED,
+        },
+        "results": results,
+    }
+    for result in results:
+        print(f"{result_key(result)} mib_per_s={result['mib_per_s']:.2f}")
+
+    regressed = False
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        rows = compare(results, baseline, args.threshold)
+        report["comparison"] = {
+            "baseline": args.baseline,
+            "threshold": args.threshold,
+            "rows": rows,
+        }
+        for row in rows:
+            mark = " REGRESSED" if row["regressed"] else ""
+            print(f"compare {row['key']} ratio={row['ratio']:.3f}{mark}")
+        regressed = any(row["regressed"] for row in rows)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"output={output}")
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SCHEMA_VERSION = "1"
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+MODES = ("inprocess", "uvicorn")
+ENDPOINTS = ("register", "verify", "list", "ledger_verify", "anchors_latest")
+DEFAULT_WORKDIR = Path("artifacts/perf/load")
+DEFAULT_OUTPUT = Path("artifacts/perf/load_benchmark.json")
+SYNTH_BATCH_BLOCKS = 10_000
+SYNTH_MARKER = "synth.json"
+SERVER_START_TIMEOUT_SECONDS = 120.0
+LIST_LIMIT = 100
+SEED = 20260222
+LOCK_WAIT_METRIC = "checksum_registry_ledger_lock_wait_seconds"
+
+
+def _utc_now_iso8601_seconds() -> str:
+    # 台帳の timestamp_utc と同じ "YYYY-MM-DDTHH:MM:SSZ" 形式
+    return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _synthetic_content(index: int) -> bytes:
+    # 合成 record の元ファイル内容。verify はこの内容をアップロードして一致させる
+    return f"synthetic artifact {index}\n".encode("ascii")
+
+
+def _child_env(backend: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env["CHECKSUM_REGISTRY_LEDGER_BACKEND"] = backend
+    return env
+
+
+def _peak_rss_bytes(pid: int | None = None) -> int | None:
+    # Linux の VmHWM（プロセス開始からの最大常駐メモリ）。取得できない環境では None
+    status = Path(f"/proc/{pid if pid is not None else 'self'}/status")
+    try:
+        for line in status.read_text(encoding="ascii").splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+# --- 台帳の合成（cwd 配下の data/, anchors/, keys/ に作る） ---
+
+
+def synthesize(size: int) -> dict[str, Any]:
+    # genesis を含めて size ブロックの署名済み台帳を、本番と同じ追記経路で作る
+    from app import ledger
+    from app.crypto_keys import get_signer
+
+    if not Path("keys/private_key.pem").exists():
+        subprocess.run(
+            [sys.executable, str(ROOT / "scripts" / "generate_keys.py")],
+            check=True,
+            capture_output=True,
+        )
+    started = time.perf_counter()
+    ledger.ensure_ledger_exists()
+    signer = get_signer().load()
+    store = ledger._store()
+    next_index, last = store.tail()
+    if last is None:
+        raise RuntimeError("ledger has no genesis block")
+    while next_index < size:
+        timestamp_utc = _utc_now_iso8601_seconds()
+        blocks: list[dict[str, Any]] = []
+        for index in range(next_index, min(next_index + SYNTH_BATCH_BLOCKS, size)):
+            content = _synthetic_content(index)
+            body = ledger._build_block_body(
+                index=index,
+                timestamp_utc=timestamp_utc,
+                prev_hash=last["block_hash"],
+                entry=ledger._build_record_entry(
+                    f"synthetic-{index:07d}",
+                    "1.0.0",
+                    hashlib.sha256(content).hexdigest(),
+                    len(content),
+                    f"synthetic-{index:07d}.bin",
+                ),
+            )
+            last = ledger._build_signed_block(body, signer)
+            blocks.append(last)
+        ledger._append_blocks(blocks)
+        next_index += len(blocks)
+    with ledger.ledger_lock():
+        ledger._save_verified_checkpoint(last, store.state())
+    return {
+        "size": size,
+        "backend": ledger.LEDGER_BACKEND,
+        "synth_sec": round(time.perf_counter() - started, 3),
+    }
+
+
+def _ensure_base(workdir: Path, size: int, backend: str) -> tuple[Path, dict[str, Any]]:
+    # 合成済みの台帳は使い回す（計測は毎回その複製に対して行う）
+    base = workdir / f"base-{backend}-{size}"
+    marker = base / SYNTH_MARKER
+    if marker.exists():
+        return base, dict(json.loads(marker.read_text(encoding="utf-8")), cached=True)
+    shutil.rmtree(base, ignore_errors=True)
+    base.mkdir(parents=True)
+    completed = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "synth", "--size", str(size)],
+        cwd=base,
+        env=_child_env(backend),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    info = json.loads(completed.stdout)
+    marker.write_text(json.dumps(info), encoding="utf-8")
+    return base, dict(info, cached=False)
+
+
+def _fresh_copy(base: Path, run_dir: Path) -> None:
+    shutil.rmtree(run_dir, ignore_errors=True)
+    shutil.copytree(base, run_dir, ignore=shutil.ignore_patterns(SYNTH_MARKER, "logs"))
+
+
+def _ledger_bytes(run_dir: Path, backend: str) -> int:
+    data = run_dir / "data"
+    names = ("ledger.sqlite3",) if backend == "sqlite" else ("ledger.json", "ledger.segments")
+    total = 0
+    for name in names:
+        path = data / name
+        if path.is_file():
+            total += path.stat().st_size
+        elif path.is_dir():
+            total += sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return total
+
+
+# --- 負荷の生成 ---
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    # nearest-rank
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _request_factory(
+    endpoint: str, size: int, mode: str
+) -> Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]:
+    rng = random.Random(SEED)
+    record_indexes = [rng.randrange(1, size) if size > 1 else 0 for _ in range(10_000)]
+
+    async def register(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        content = f"load benchmark {mode} {size} {i}\n".encode("ascii")
+        return await client.post(
+            "/api/v1/records/register",
+            data={"name": f"bench-{mode}", "version": f"{i}"},
+            files={"file": (f"bench-{i}.bin", content, "application/octet-stream")},
+        )
+
+    async def verify(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        index = record_indexes[i % len(record_indexes)]
+        content = _synthetic_content(index)
+        return await client.post(
+            "/api/v1/records/verify",
+            files={"file": (f"synthetic-{index:07d}.bin", content, "application/octet-stream")},
+        )
+
+    async def list_records(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        cursor = record_indexes[i % len(record_indexes)]
+        return await client.get("/api/v1/records", params={"cursor": cursor, "limit": LIST_LIMIT})
+
+    async def ledger_verify(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/api/v1/ledger/verify")
+
+    async def anchors_latest(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.get("/api/v1/anchors/latest")
+
+    factories = {
+        "register": register,
+        "verify": verify,
+        "list": list_records,
+        "ledger_verify": ledger_verify,
+        "anchors_latest": anchors_latest,
+    }
+    return factories[endpoint]
+
+
+async def _run_endpoint(
+    client: httpx.AsyncClient,
+    send: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    # concurrency 本の worker が共有カウンタから要求を取り、合計 requests 件を送る
+    latencies: list[float] = []
+    status_counts: dict[str, int] = {}
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal issued
+        while issued < requests:
+            i = issued
+            issued += 1
+            started = time.perf_counter()
+            try:
+                response = await send(client, i)
+                status = str(response.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.append(time.perf_counter() - started)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    errors = sum(n for s, n in status_counts.items() if not s.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_counts": status_counts,
+        "elapsed_sec": round(elapsed, 6),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    mode: str,
+    rss_probe: Callable[[], int | None],
+    lock_probe: Callable[[], Awaitable[dict[str, float] | None]],
+) -> dict[str, Any]:
+    # 最初の1件は台帳の読込（キャッシュ構築）を含むため、別に記録する
+    started = time.perf_counter()
+    warmup = await client.get("/api/v1/records", params={"limit": 1})
+    result: dict[str, Any] = {
+        "warmup_ms": round((time.perf_counter() - started) * 1000, 3),
+        "warmup_status": warmup.status_code,
+        "endpoints": {},
+    }
+    for endpoint in args.endpoints:
+        before = await lock_probe()
+        stats = await _run_endpoint(
+            client, _request_factory(endpoint, args.size, mode), args.requests, args.concurrency
+        )
+        after = await lock_probe()
+        if before is not None and after is not None:
+            acquisitions = after["acquisitions"] - before["acquisitions"]
+            wait = after["wait_seconds_total"] - before["wait_seconds_total"]
+            stats["lock_wait"] = {
+                "acquisitions": int(acquisitions),
+                "total_ms": round(wait * 1000, 3),
+                "mean_ms": round(wait / acquisitions * 1000, 3) if acquisitions else 0.0,
+            }
+        else:
+            stats["lock_wait"] = None
+        # プロセス開始からの最大値（この endpoint までの累積ピーク）
+        stats["peak_rss_bytes"] = rss_probe()
+        result["endpoints"][endpoint] = stats
+    return result
+
+
+async def _drive_inprocess(args: argparse.Namespace) -> dict[str, Any]:
+    from app import ledger
+    from app.main import app
+
+    async def lock_probe() -> dict[str, float] | None:
+        return ledger.lock_wait_stats()
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await drive(client, args, "inprocess", _peak_rss_bytes, lock_probe)
+
+
+async def _scrape_lock_wait(client: httpx.AsyncClient) -> dict[str, float] | None:
+    # 別プロセスのサーバーでは /metrics のロック待ちヒストグラムから取る
+    response = await client.get("/metrics")
+    if response.status_code != 200:
+        return None
+    values: dict[str, float] = {}
+    for line in response.text.splitlines():
+        name, _, value = line.partition(" ")
+        if name == f"{LOCK_WAIT_METRIC}_count":
+            values["acquisitions"] = float(value)
+        elif name == f"{LOCK_WAIT_METRIC}_sum":
+            values["wait_seconds_total"] = float(value)
+    return values if len(values) == 2 else {"acquisitions": 0.0, "wait_seconds_total": 0.0}
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+async def _wait_for_server(base_url: str, server: subprocess.Popen[bytes]) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                if (await client.get("/api/v1/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise TimeoutError("uvicorn did not start")
+
+
+async def _drive_uvicorn(args: argparse.Namespace, run_dir: Path) -> dict[str, Any]:
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=run_dir,
+        env=_child_env(args.backend),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await _wait_for_server(base_url, server)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+            return await drive(
+                client,
+                args,
+                "uvicorn",
+                lambda: _peak_rss_bytes(server.pid),
+                lambda: _scrape_lock_wait(client),
+            )
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def _run_inprocess_child(args: argparse.Namespace, run_dir: Path) -> dict[str, Any]:
+    # in-process は新しいプロセスで計測し、ピーク RSS に合成や前回の計測を含めない
+    command = [
+        sys.executable, str(Path(__file__).resolve()), "inprocess", "--size", str(args.size),
+        "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--endpoints", ",".join(args.endpoints),
+    ]
+    completed = subprocess.run(
+        command, cwd=run_dir, env=_child_env(args.backend),
+        check=True, capture_output=True, text=True,
+    )
+    return dict(json.loads(completed.stdout.splitlines()[-1]))
+
+
+# --- CLI ---
+
+
+def _parse_list(value: str) -> list[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _parse_sizes(value: str) -> list[int]:
+    return [int(v.replace("_", "")) for v in _parse_list(value)]
+
+
+def _parse_endpoints(value: str) -> list[str]:
+    endpoints = _parse_list(value)
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown endpoint: {', '.join(sorted(unknown))}")
+    return endpoints
+
+
+def _add_load_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--endpoints", type=_parse_endpoints, default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=200, help="endpoint ごとの要求数")
+    parser.add_argument("--concurrency", type=int, default=8)
+
+
+def run(args: argparse.Namespace) -> int:
+    workdir = Path(args.workdir).resolve()
+    results: list[dict[str, Any]] = []
+    for size in args.sizes:
+        base, synth = _ensure_base(workdir, size, args.backend)
+        print(f"size={size} synth_sec={synth['synth_sec']} cached={synth['cached']}", flush=True)
+        for mode in args.modes:
+            run_dir = workdir / "run"
+            _fresh_copy(base, run_dir)
+            args.size = size
+            if mode == "inprocess":
+                measured = _run_inprocess_child(args, run_dir)
+            else:
+                measured = asyncio.run(_drive_uvicorn(args, run_dir))
+            results.append(
+                {
+                    "size": size,
+                    "mode": mode,
+                    "backend": args.backend,
+                    "ledger_bytes": _ledger_bytes(base, args.backend),
+                    "synth": synth,
+                    **measured,
+                }
+            )
+            for endpoint, stats in measured["endpoints"].items():
+                print(
+                    f"size={size} mode={mode} endpoint={endpoint} "
+                    f"p50_ms={stats['p50_ms']} p95_ms={stats['p95_ms']} "
+                    f"p99_ms={stats['p99_ms']} rps={stats['throughput_rps']} "
+                    f"errors={stats['errors']}",
+                    flush=True,
+                )
+
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at_utc": _utc_now_iso8601_seconds(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "sizes": args.sizes,
+            "modes": args.modes,
+            "backend": args.backend,
+            "endpoints": args.endpoints,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"output={output}")
+    return 0 if all(
+        stats["errors"] == 0 for r in results for stats in r["endpoints"].values()
+    ) else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="合成台帳の規模ごとに API を計測する")
+    run_parser.add_argument("--sizes", type=_parse_sizes, default=DEFAULT_SIZES)
+    run_parser.add_argument("--modes", type=_parse_list, default=list(MODES))
+    run_parser.add_argument("--backend", choices=("segmented", "sqlite"), default="segmented")
+    run_parser.add_argument("--workdir", default=str(DEFAULT_WORKDIR))
+    run_parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    run_parser.add_argument("--port", type=int, default=0, help="0 なら空きポート")
+    _add_load_options(run_parser)
+
+    synth_parser = sub.add_parser("synth", help="カレントディレクトリに合成台帳を作る")
+    synth_parser.add_argument("--size", type=int, required=True)
+
+    inprocess_parser = sub.add_parser("inprocess", help="カレントディレクトリの台帳で1回計測する")
+    inprocess_parser.add_argument("--size", type=int, required=True)
+    _add_load_options(inprocess_parser)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        unknown = set(args.modes) - set(MODES)
+        if unknown:
+            parser.error(f"unknown mode: {', '.join(sorted(unknown))}")
+        sys.exit(run(args))
+    if args.command == "synth":
+        print(json.dumps(synthesize(args.size)))
+    else:
+        print(json.dumps(asyncio.run(_drive_inprocess(args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import UTC, datetime
+
+from app.audit_query import iter_audit_records
+
+
+def _utc(value: str | None) -> str | None:
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--action")
+    parser.add_argument("--status")
+    parser.add_argument("--since", help="ISO 8601（タイムゾーン省略時は UTC）")
+    parser.add_argument("--until", help="ISO 8601（タイムゾーン省略時は UTC）")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    stats: dict[str, int] = {}
+    count = 0
+    for record in iter_audit_records(
+        args.action, args.status, _utc(args.since), _utc(args.until), stats
+    ):
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+        if args.limit is not None and count >= args.limit:
+            break
+    print(
+        f"matched={count} segments_scanned={stats['segments_scanned']} "
+        f"segments_skipped={stats['segments_skipped']}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app.ledger import verify_between_checkpoints, verify_chain
+from app.parallel_verify import verify_chain_parallel
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    # チェックポイント間の再検証（--from-checkpoint 省略時は genesis から）。
+    # --from-checkpoint のみの場合はそのチェックポイント（-1 は最新の有効なもの）以降のみを検証する
+    parser.add_argument("--from-checkpoint", type=int, default=None)
+    parser.add_argument("--to-checkpoint", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.to_checkpoint is not None:
+        ok, index, reason = verify_between_checkpoints(args.from_checkpoint, args.to_checkpoint)
+    elif args.from_checkpoint is not None:
+        ok, index, reason = verify_chain(from_checkpoint=args.from_checkpoint)
+    elif args.parallel:
+        ok, index, reason = verify_chain_parallel(workers=args.workers)
+    else:
+        ok, index, reason = verify_chain(full=args.full)
+    elapsed = time.perf_counter() - start
+
+    print(f"valid={ok}")
+    if not ok:
+        print(f"index={index}")
+        print(f"reason={reason}")
+    print(f"elapsed_sec={elapsed:.4f}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
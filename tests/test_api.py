@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import importlib
+import json
 from pathlib import Path
 
 from fastapi.testclient import TestClient
 
+from app.audit import flush_audit_log
 from tests.test_utils import write_test_keys
 
 
@@ -33,6 +35,7 @@ def test_health_and_keys_public(tmp_path, monkeypatch):
     assert "key_id" in r.json()
     assert "BEGIN PUBLIC KEY" in r.json()["public_key_pem"]
 
+    flush_audit_log()
     audit_text = Path("logs/audit.log.jsonl").read_text(encoding="utf-8")
     assert "keys_public" in audit_text
 
@@ -62,3 +65,175 @@ def test_ledger_verify_returns_checks(tmp_path, monkeypatch):
     assert body["valid"] is True
     assert body["checks"]["chain_integrity_valid"] is True
     assert body["checks"]["signature_valid"] is True
+
+
+def test_register_duplicate_and_verify_match_modes(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+
+    files = {"file": ("a.bin", b"abc", "application/octet-stream")}
+    r = client.post("/api/v1/records/register", data={"name": "s", "version": "1"}, files=files)
+    assert r.status_code == 201
+    r = client.post("/api/v1/records/register", data={"name": "s", "version": "1"}, files=files)
+    assert r.status_code == 409
+
+    r = client.post("/api/v1/records/verify", files=files)
+    assert r.status_code == 200
+    assert r.json()["match_mode"] == "sha_only"
+    assert r.json()["index"] == 1
+
+    r = client.post("/api/v1/records/verify", data={"name": "s", "version": "2"}, files=files)
+    assert r.status_code == 404
+
+
+def test_register_batch_reports_per_item_results(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+
+    files = {"file": ("a.bin", b"abc", "application/octet-stream")}
+    r = client.post("/api/v1/records/register", data={"name": "s", "version": "1"}, files=files)
+    assert r.status_code == 201
+
+    item = {"sha256": "ab" * 32, "file_size_bytes": 3, "original_filename": "b.bin"}
+    payload = {
+        "items": [
+            {**item, "name": "s", "version": "2"},
+            {**item, "name": "s", "version": "2"},
+            {**item, "name": "s", "version": "1"},
+            {**item, "name": "s", "version": "3", "sha256": "XYZ"},
+            {**item, "name": "t", "version": "1"},
+        ]
+    }
+    r = client.post("/api/v1/records/register-batch", json=payload)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["registered"] == 2
+    assert body["rejected"] == 3
+    statuses = [x["status"] for x in body["results"]]
+    assert statuses == ["registered", "duplicate", "duplicate", "invalid", "registered"]
+    assert [x["index"] for x in body["results"] if x["status"] == "registered"] == [2, 3]
+
+    multipart = [
+        ("name", (None, "u")),
+        ("version", (None, "1")),
+        ("file", ("u1.bin", b"u1", "application/octet-stream")),
+        ("name", (None, "u")),
+        ("version", (None, "2")),
+        ("file", ("u2.bin", b"u2", "application/octet-stream")),
+    ]
+    r = client.post("/api/v1/records/register-batch", files=multipart)
+    assert r.status_code == 200
+    assert [x["index"] for x in r.json()["results"]] == [4, 5]
+    assert r.json()["results"][1]["original_filename"] == "u2.bin"
+
+    r = client.get("/api/v1/anchors/latest")
+    assert r.json()["latest_index"] == 5
+
+    r = client.post("/api/v1/ledger/verify", params={"full": "true"})
+    assert r.json()["valid"] is True
+
+
+def test_list_records_paginates_filters_and_projects(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+    for name, version in [("alpha", "1"), ("alpha", "2"), ("beta", "1"), ("alphabet", "1")]:
+        files = {"file": (f"{name}.bin", f"{name}-{version}".encode(), "application/octet-stream")}
+        r = client.post(
+            "/api/v1/records/register", data={"name": name, "version": version}, files=files
+        )
+        assert r.status_code == 201
+
+    r = client.get("/api/v1/records", params={"limit": 3})
+    body = r.json()
+    assert [x["index"] for x in body["items"]] == [1, 2, 3]
+    assert body["next_cursor"] == 3
+    r = client.get("/api/v1/records", params={"limit": 3, "cursor": body["next_cursor"]})
+    assert [x["index"] for x in r.json()["items"]] == [4]
+    assert r.json()["next_cursor"] is None
+
+    r = client.get("/api/v1/records", params={"name_prefix": "alpha", "fields": "name,version"})
+    assert r.json()["items"] == [
+        {"index": 1, "name": "alpha", "version": "1"},
+        {"index": 2, "name": "alpha", "version": "2"},
+        {"index": 4, "name": "alphabet", "version": "1"},
+    ]
+    r = client.get("/api/v1/records", params={"version": "1", "name": "beta"})
+    assert [x["index"] for x in r.json()["items"]] == [3]
+    sha = r.json()["items"][0]["sha256"]
+    r = client.get("/api/v1/records", params={"sha256": sha, "until": "2000-01-01T00:00:00Z"})
+    assert r.json()["items"] == []
+    r = client.get("/api/v1/records", params={"since": "2000-01-01T09:00:00+09:00"})
+    assert r.json()["count"] == 4
+
+    assert client.get("/api/v1/records", params={"fields": "secret"}).status_code == 400
+    assert client.get("/api/v1/records", params={"since": "yesterday"}).status_code == 400
+
+    # 射影した項目も応答モデルどおり（index 以外は省略可能）
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    assert schemas["ProjectedRecordItem"]["required"] == ["index"]
+    r = client.get("/api/v1/records", params={"limit": 1})
+    assert set(r.json()["items"][0]) == {
+        "index", "timestamp_utc", "name", "version", "sha256", "file_size_bytes",
+        "original_filename", "signing_key_id", "signature",
+    }
+
+
+def test_export_streams_ndjson_records_and_blocks(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+    for version in ["1", "2", "3"]:
+        files = {"file": ("a.bin", version.encode(), "application/octet-stream")}
+        data = {"name": "s", "version": version}
+        r = client.post("/api/v1/records/register", data=data, files=files)
+        assert r.status_code == 201
+
+    r = client.get("/api/v1/export")
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in r.text.splitlines()]
+    assert [x["version"] for x in records] == ["1", "2", "3"]
+    assert records == client.get("/api/v1/records").json()["items"]
+
+    r = client.get("/api/v1/export", params={"kind": "blocks", "start": 2, "gzip": "true"})
+    assert r.headers["content-encoding"] == "gzip"
+    blocks = [json.loads(line) for line in r.text.splitlines()]
+    assert [b["index"] for b in blocks] == [2, 3]
+    assert blocks[0]["signature"]
+
+    assert client.get("/api/v1/export", params={"kind": "anchors"}).status_code == 400
+
+
+def test_conditional_get_returns_304_until_ledger_tip_changes(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+    import app.main as main_module
+
+    def register(version: str) -> None:
+        files = {"file": ("a.bin", version.encode(), "application/octet-stream")}
+        data = {"name": "s", "version": version}
+        assert client.post("/api/v1/records/register", data=data, files=files).status_code == 201
+
+    def get(path: str, etag: str, **kwargs):
+        return client.get(path, headers={"If-None-Match": etag}, **kwargs)
+
+    register("1")
+    r = client.get("/api/v1/anchors/latest")
+    anchor_etag = r.headers["etag"]
+    assert anchor_etag == f'"{r.json()["block_hash"]}"'
+    records_etag = client.get("/api/v1/records", params={"limit": 10}).headers["etag"]
+    key_etag = client.get("/api/v1/keys/public").headers["etag"]
+
+    def fail(**kwargs):
+        raise AssertionError("ledger must not be loaded for 304")
+
+    with monkeypatch.context() as m:
+        m.setattr(main_module, "find_records", fail)
+        assert get("/api/v1/records", records_etag, params={"limit": 10}).status_code == 304
+        r = get("/api/v1/anchors/latest", anchor_etag)
+        assert r.status_code == 304
+        assert r.headers["etag"] == anchor_etag
+    assert get("/api/v1/keys/public", f"W/{key_etag}").status_code == 304
+    # 問い合わせ条件が異なれば別の ETag
+    assert get("/api/v1/records", records_etag, params={"limit": 5}).status_code == 200
+
+    register("2")
+    r = get("/api/v1/anchors/latest", anchor_etag)
+    assert r.status_code == 200
+    assert r.json()["latest_index"] == 2
+    r = get("/api/v1/records", records_etag, params={"limit": 10})
+    assert r.status_code == 200
+    assert r.json()["count"] == 2
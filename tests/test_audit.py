@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from app.audit import AuditWriter
+
+
+def _lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_writer_batches_lines_and_reports_drops(tmp_path, monkeypatch):
+    path = str(tmp_path / "logs" / "audit.log.jsonl")
+    writer = AuditWriter(flush_interval=0.01, queue_max=2)
+    # 書き込みスレッドを止めた状態でキューを溢れさせる
+    start = writer._ensure_started
+    monkeypatch.setattr(writer, "_ensure_started", lambda: None)
+    for n in range(3):
+        writer.submit(path, json.dumps({"action": f"a{n}"}) + "\n")
+    assert writer.stats()["dropped"] == 1
+    assert writer.stats()["queued"] == 2
+
+    monkeypatch.setattr(writer, "_ensure_started", start)
+    start()
+    assert writer.flush(timeout=5)
+
+    records = _lines(tmp_path / "logs" / "audit.log.jsonl")
+    assert [r["action"] for r in records] == ["a0", "a1", "audit_dropped"]
+    assert records[-1]["details"] == {"dropped": 1}
+    assert writer.stats()["written"] == 3
+
+    writer.submit(path, json.dumps({"action": "a4"}) + "\n")
+    writer.stop()
+    assert _lines(tmp_path / "logs" / "audit.log.jsonl")[-1]["action"] == "a4"
+
+
+def test_rotation_compresses_segments_and_query_skips_by_index(tmp_path):
+    from app.audit import segments_dir
+    from app.audit_query import iter_audit_records
+
+    path = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(flush_interval=0.5)
+    writer.rotate_bytes = 1
+
+    def event(day: int, action: str) -> str:
+        record = {
+            "timestamp_utc": f"2026-01-{day:02d}T00:00:00Z",
+            "action": action,
+            "status": "success",
+            "details": {"day": day},
+        }
+        return json.dumps(record) + "\n"
+
+    # 1バッチ = 1日分。次のバッチの書き込み前に前日分が切り出される
+    for day, action in [(1, "records_register"), (2, "records_list"), (3, "records_register")]:
+        writer.submit(str(path), event(day, action))
+        writer.submit(str(path), event(day, "health"))
+        assert writer.flush(timeout=5)
+    writer.stop()
+
+    indexes = sorted(segments_dir(path).glob("*.index.json"))
+    assert len(indexes) == 2
+    first = json.loads(indexes[0].read_text(encoding="utf-8"))
+    assert first["actions"] == {"records_register": 1, "health": 1}
+    assert first["first_timestamp_utc"] == "2026-01-01T00:00:00Z"
+
+    stats: dict[str, int] = {}
+    found = list(iter_audit_records(action="records_register", stats=stats, path=path))
+    assert [r["details"]["day"] for r in found] == [1, 3]
+    assert stats == {"segments_scanned": 1, "segments_skipped": 1}
+
+    stats = {}
+    found = list(
+        iter_audit_records(
+            since="2026-01-02T00:00:00Z", until="2026-01-02T23:59:59Z", stats=stats, path=path
+        )
+    )
+    assert [r["action"] for r in found] == ["records_list", "health"]
+    assert stats == {"segments_scanned": 1, "segments_skipped": 1}
+
+
+def test_rotation_does_not_wait_for_compression(tmp_path, monkeypatch):
+    from app import audit
+    from app.audit import segments_dir
+
+    path = tmp_path / "audit.log.jsonl"
+    release = threading.Event()
+    compress = audit.compress_segment
+
+    def slow_compress(raw_path):
+        assert release.wait(timeout=5)
+        return compress(raw_path)
+
+    monkeypatch.setattr(audit, "compress_segment", slow_compress)
+    writer = AuditWriter(flush_interval=0.01)
+    writer.rotate_bytes = 1
+    for n in range(3):
+        writer.submit(str(path), json.dumps({"action": f"a{n}"}) + "\n")
+        assert writer.flush(timeout=5)
+
+    # 圧縮が終わらなくても書き込みは進む
+    assert [r["action"] for r in _lines(path)] == ["a2"]
+    assert len(list(segments_dir(path).glob("*.jsonl"))) == 2
+    release.set()
+    writer.stop()
+    assert len(list(segments_dir(path).glob("*.jsonl.gz"))) == 2
+    assert not list(segments_dir(path).glob("*.jsonl"))
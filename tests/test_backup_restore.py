@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
+import pytest
+
+from app import ledger
 from app.backup_restore import perform_backup, restore_backup
 from app.ledger import append_record, ensure_ledger_exists, verify_chain
 from tests.test_utils import write_test_keys
@@ -30,3 +34,25 @@ def test_backup_and_restore(tmp_path, monkeypatch):
     assert ok is True
     assert index is None
     assert reason is None
+
+
+def test_restore_rejects_tampered_backup_with_valid_checkpoints(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(ledger, "CHECKPOINT_INTERVAL", 2)
+
+    ensure_ledger_exists()
+    for i in range(3):
+        append_record("sample", f"1.0.{i}", "", f"{i:02x}" * 32, 10, "a.bin")
+    backup_dir = perform_backup(Path("backups"))
+
+    # 定期チェックポイント（index 1, 3）より前のブロックを書き換える
+    segment = next((backup_dir / "data").rglob("*.jsonl"))
+    lines = segment.read_text(encoding="utf-8").splitlines()
+    block = json.loads(lines[1])
+    block["entry"]["name"] = "sampla"
+    lines[1] = json.dumps(block, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    segment.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="index=1, reason=block_hash_mismatch"):
+        restore_backup(backup_dir)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app import ledger
+from app.binary_store import (
+    BinaryLedgerReader,
+    append_binary_blocks,
+    decode_block,
+    encode_block,
+    offsets_path,
+    write_binary_ledger,
+)
+from app.ledger_store import SegmentedLedgerStore
+from tests.test_utils import write_test_keys
+
+
+def test_binary_ledger_round_trips_and_reads_by_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+
+    ledger.ensure_ledger_exists()
+    for i in range(4):
+        ledger.append_record("sample", f"1.0.{i}", "", f"{i:02x}" * 32, 10 + i, "a.bin")
+    store = SegmentedLedgerStore(ledger.LEDGER_PATH)
+    blocks = list(store.iter_blocks())
+
+    path = Path("data/ledger.bin")
+    assert write_binary_ledger(path, store.header(), blocks[:3]) == 3
+    assert append_binary_blocks(path, blocks[3:]) == 2
+    json_size = sum(p.stat().st_size for p in store.data_files()[1:])
+    assert path.stat().st_size + offsets_path(path).stat().st_size < json_size
+
+    with BinaryLedgerReader(path) as reader:
+        assert len(reader) == 5
+        assert reader.header() == store.header()
+        assert reader.block(3) == blocks[3]
+        assert list(reader.iter_blocks()) == blocks
+
+        converted = SegmentedLedgerStore(Path("converted/ledger.json"))
+        converted.rewrite(reader.header(), reader.iter_blocks())
+    assert list(converted.iter_blocks()) == blocks
+    assert ledger.verify_chain(converted.read(), full=True) == (True, None, None)
+
+
+def test_blocks_outside_compact_layout_are_kept_verbatim():
+    block = {
+        "index": 7,
+        "timestamp_utc": "2026-02-21T12:34:56+09:00",
+        "prev_hash": "AB" * 32,
+        "entry": {"type": "record", "name": "x"},
+        "block_hash": "cd" * 32,
+        "signature": "not-base64",
+        "note": "legacy",
+    }
+    assert decode_block(encode_block(block)) == block
+
+
+def test_reader_closes_opened_files_when_open_fails(tmp_path, monkeypatch):
+    opened = []
+    path_open = Path.open
+
+    def recording_open(self, *args, **kwargs):
+        f = path_open(self, *args, **kwargs)
+        opened.append(f)
+        return f
+
+    monkeypatch.setattr(Path, "open", recording_open)
+    path = tmp_path / "ledger.bin"
+    path.write_bytes(b"not a ledger")
+    # offsets が無い場合・先頭が MAGIC でない場合とも、開いたファイルを残さない
+    with pytest.raises(FileNotFoundError):
+        BinaryLedgerReader(path)
+    offsets_path(path).write_bytes(b"")
+    with pytest.raises(ValueError):
+        BinaryLedgerReader(path)
+    assert len([f for f in opened if f.mode == "rb"]) == 3
+    assert all(f.closed for f in opened)
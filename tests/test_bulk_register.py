@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from tests.test_utils import write_test_keys
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = str(ROOT / "scripts" / "bulk_register.py")
+
+
+def _run(tmp_path: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.run(
+        [sys.executable, SCRIPT, *args, "--workers", "3", "--report", "report.json"],
+        cwd=tmp_path, capture_output=True, text=True, env=env,
+    )
+
+
+def _statuses(tmp_path: Path) -> dict[str, str]:
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    return {item["relative_path"]: item["status"] for item in report["results"]}
+
+
+def _record_blocks(tmp_path: Path) -> list[dict]:
+    segments = (tmp_path / "data/ledger.segments").rglob("*.jsonl")
+    blocks = [json.loads(line) for p in segments for line in p.read_text().splitlines()]
+    return [b for b in blocks if b["entry"]["type"] == "record"]
+
+
+def test_bulk_register_directory_dry_run_then_commit(tmp_path):
+    write_test_keys(tmp_path)
+    releases = tmp_path / "releases"
+    for name, version in [("app", "1.0.0"), ("app", "1.1.0"), ("tool", "2.0")]:
+        (releases / name / version).mkdir(parents=True)
+        (releases / name / version / f"{name}.bin").write_bytes(f"{name}{version}".encode())
+    (releases / "README").write_text("not an artifact")
+
+    dry = _run(tmp_path, "--dir", "releases", "--dry-run")
+    assert dry.returncode == 0, dry.stderr
+    assert "pending=3" in dry.stdout and "unmatched=1" in dry.stdout
+    assert "hashed=3" in dry.stderr
+    assert not (tmp_path / "data").exists()
+
+    done = _run(tmp_path, "--dir", "releases")
+    assert done.returncode == 0, done.stderr
+    assert "registered=3" in done.stdout
+    blocks = _record_blocks(tmp_path)
+    assert [(b["entry"]["name"], b["entry"]["version"]) for b in blocks] == [
+        ("app", "1.0.0"), ("app", "1.1.0"), ("tool", "2.0")
+    ]
+    # 1回のコミットで追記される
+    assert len({b["timestamp_utc"] for b in blocks}) == 1
+
+    # 再実行しても重複は登録しない
+    again = _run(tmp_path, "--dir", "releases")
+    assert again.returncode == 0, again.stderr
+    assert "duplicate=3" in again.stdout and "registered" not in again.stdout
+    assert len(_record_blocks(tmp_path)) == 3
+
+
+def test_bulk_register_manifest_with_filename_rule(tmp_path):
+    write_test_keys(tmp_path)
+    (tmp_path / "dist").mkdir()
+    for filename in ("lib-1.2.3.tar.gz", "lib-1.2.4.tar.gz", "other.bin"):
+        (tmp_path / "dist" / filename).write_bytes(filename.encode())
+    (tmp_path / "manifest.csv").write_text(
+        "path,name,version\n"
+        "dist/lib-1.2.3.tar.gz,,\n"
+        "dist/lib-1.2.4.tar.gz,,\n"
+        "dist/lib-1.2.4.tar.gz,lib,1.2.4\n"
+        "dist/other.bin,other,1.0\n"
+        "dist/missing.bin,missing,1.0\n",
+        encoding="utf-8",
+    )
+
+    completed = _run(
+        tmp_path, "--manifest", "manifest.csv",
+        "--pattern", r"(?P<name>[^/]+)-(?P<version>\d[^-/]*)\.tar\.gz$",
+    )
+    # 読めないファイルがあれば終了コード 1（他は登録する）
+    assert completed.returncode == 1
+    assert "registered=3" in completed.stdout and "duplicate=1" in completed.stdout
+    assert "error=1" in completed.stdout
+    blocks = _record_blocks(tmp_path)
+    assert [(b["entry"]["name"], b["entry"]["version"]) for b in blocks] == [
+        ("lib", "1.2.3"), ("lib", "1.2.4"), ("other", "1.0")
+    ]
+    assert blocks[0]["entry"]["original_filename"] == "lib-1.2.3.tar.gz"
+    assert _statuses(tmp_path)["dist/missing.bin"] == "error"
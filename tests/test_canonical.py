@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+
+from app import ledger
+from tests.test_utils import write_test_keys
+
+# 引用符・バックスラッシュ・制御文字・非 BMP 文字・サロゲート近傍を含める
+_ALPHABET = 'aZ09-_. "\\/\x00\x1f\x7f éパ\U0001f600�'
+
+
+def _reference(obj):
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _text(rng: random.Random) -> str:
+    return "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 12)))
+
+
+def test_block_body_encoder_matches_generic_encoder_on_generated_bodies():
+    rng = random.Random(20260222)
+    for _ in range(2000):
+        if rng.random() < 0.2:
+            entry = {"type": _text(rng)}
+        else:
+            entry = ledger._build_record_entry(
+                _text(rng), _text(rng), _text(rng), rng.randint(-(2**70), 2**70), _text(rng)
+            )
+            entry["type"] = _text(rng)
+        body = ledger._build_block_body(rng.randint(0, 2**64), _text(rng), _text(rng), entry)
+        assert ledger._canonical_block_body_bytes(body) == _reference(body)
+
+
+def test_block_body_encoder_falls_back_for_unknown_shapes():
+    record = ledger._build_record_entry("n", "v", "ab" * 32, 1, "f")
+    cases = [
+        ledger._build_block_body(1, "t", "p", {**record, "note": "extra"}),
+        ledger._build_block_body(1, "t", "p", {**record, "file_size_bytes": True}),
+        ledger._build_block_body(1, "t", "p", {**record, "file_size_bytes": 1.5}),
+        ledger._build_block_body(True, "t", "p", record),
+        ledger._build_block_body(1, None, "p", record),
+        ledger._build_block_body(1, "t", "p", {"kind": "genesis"}),
+        ledger._build_block_body(1, "t", "p", {"type": ["x"]}),
+        {"index": 1, "timestamp_utc": "t", "prev_hash": "p", "extra": {}},
+    ]
+    for body in cases:
+        assert ledger._canonical_block_body_bytes(body) == _reference(body)
+
+
+def test_block_body_encoder_matches_real_ledger_blocks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+
+    ledger.ensure_ledger_exists()
+    ledger.append_record("パッケージ", "1.0.0", "", "aa" * 32, 10, 'a "quoted".bin')
+    for block in ledger.load_ledger()["blocks"]:
+        body = ledger._extract_block_body(block)
+        assert ledger._canonical_block_body_bytes(body) == _reference(body)
+        assert ledger._build_block_hash_from_body(body) == block["block_hash"]
+
+
+def test_checkpoint_hashes_do_not_use_block_encoder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(ledger, "CHECKPOINT_INTERVAL", 2)
+    ledger.ensure_ledger_exists()
+
+    encode = ledger._canonical_block_body_bytes
+
+    def block_only(body):
+        assert set(body) == {"index", "timestamp_utc", "prev_hash", "entry"}
+        return encode(body)
+
+    monkeypatch.setattr(ledger, "_canonical_block_body_bytes", block_only)
+    for i in range(3):
+        ledger.append_record("sample", f"1.0.{i}", "", "aa" * 32, 10, "a.bin")
+    checkpoint = ledger.load_checkpoints()[0]
+    # 署名対象は従来どおり汎用の canonical JSON の SHA-256
+    body = {k: checkpoint[k] for k in ("index", "block_hash", "block_count", "record_count")}
+    assert ledger._checkpoint_hash(checkpoint) == hashlib.sha256(_reference(body)).hexdigest()
+    assert ledger.verify_chain() == (True, None, None)
+    assert ledger.verify_between_checkpoints(None, 3) == (True, None, None)
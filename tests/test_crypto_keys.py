@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import crypto_keys
+from tests.test_utils import write_test_keys
+
+
+def test_signer_and_verifier_load_key_once(tmp_path, monkeypatch):
+    write_test_keys(tmp_path)
+    signer = crypto_keys.Signer(str(tmp_path / "keys/private_key.pem"))
+    verifier = crypto_keys.Verifier(str(tmp_path / "keys/public_key.pem"))
+
+    loads: list[str] = []
+    original = crypto_keys.load_private_key
+
+    def counting(path: str = "keys/private_key.pem"):
+        loads.append(path)
+        return original(path)
+
+    monkeypatch.setattr(crypto_keys, "load_private_key", counting)
+    for i in range(3):
+        signature, key_id = signer.sign(f"{i:02x}" * 32)
+        assert key_id == verifier.key_id
+        assert verifier.verify(f"{i:02x}" * 32, signature)
+    assert len(loads) == 1
+
+
+def test_signer_reloads_when_key_file_changes(tmp_path):
+    write_test_keys(tmp_path)
+    signer = crypto_keys.get_signer(str(tmp_path / "keys/private_key.pem"))
+    verifier = crypto_keys.get_verifier(str(tmp_path / "keys/public_key.pem"))
+    old_key_id = signer.key_id
+    assert verifier.key_id == old_key_id
+
+    write_test_keys(tmp_path)
+    assert signer.key_id != old_key_id
+    assert verifier.key_id == signer.key_id
+
+    if not sys.platform.startswith("win"):
+        os.chmod(tmp_path / "keys/private_key.pem", 0o644)
+        with pytest.raises(PermissionError):
+            signer.sign("00" * 32)
+
+
+def test_key_files_checked_once_per_operation_not_per_block(tmp_path, monkeypatch):
+    from app import ledger
+
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    ledger.ensure_ledger_exists()
+
+    calls: list[str] = []
+    original = crypto_keys._key_file_identity
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(crypto_keys, "_key_file_identity", counting)
+
+    def count(action) -> int:
+        calls.clear()
+        action()
+        return len(calls)
+
+    def append(n: int, tag: str) -> None:
+        entry = ledger._build_record_entry
+        ledger.append_records([entry("s", f"{tag}.{i}", "aa" * 32, 1, "a.bin") for i in range(n)])
+
+    # 署名・検証するブロック数によらず、鍵ファイルの確認回数は一定
+    append(1, "warmup")
+    assert count(lambda: append(1, "a")) == count(lambda: append(20, "b"))
+    small = count(lambda: ledger.verify_chain(full=True))
+    append(20, "c")
+    assert count(lambda: ledger.verify_chain(full=True)) == small
+
+
+def test_verifier_reads_public_key_file_once_per_reload(tmp_path, monkeypatch):
+    write_test_keys(tmp_path)
+    path = tmp_path / "keys/public_key.pem"
+    verifier = crypto_keys.Verifier(str(path))
+
+    reads: list[str] = []
+    read_bytes, read_text = Path.read_bytes, Path.read_text
+
+    def counting_bytes(self):
+        reads.append(self.name)
+        return read_bytes(self)
+
+    def counting_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_bytes)
+    monkeypatch.setattr(Path, "read_text", counting_text)
+    assert verifier.public_key_pem == path.read_text(encoding="utf-8")
+    reads.clear()
+    # 鍵の差し替え後は1回の読込から PEM と鍵ID を作る
+    write_test_keys(tmp_path)
+    pem = verifier.public_key_pem
+    assert reads == ["public_key.pem"]
+    public_key = crypto_keys._public_key_from_pem(pem.encode("utf-8"))
+    assert crypto_keys.key_id_from_public_key(public_key) == verifier.key_id
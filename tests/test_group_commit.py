@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from app import ledger
+from app.group_commit import DuplicateRecordError, GroupCommitWriter
+from tests.test_utils import write_test_keys
+
+
+def _entry(version: str) -> dict:
+    return {
+        "name": "sample",
+        "version": version,
+        "file_sha256": "aa" * 32,
+        "file_size_bytes": 10,
+        "original_filename": "a.bin",
+    }
+
+
+def test_concurrent_submits_are_committed_together(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    ledger.ensure_ledger_exists()
+
+    batch_sizes: list[int] = []
+    original = ledger.append_records
+
+    def counting(entries):
+        batch_sizes.append(len(entries))
+        return original(entries)
+
+    monkeypatch.setattr(ledger, "append_records", counting)
+    writer = GroupCommitWriter(window_seconds=0.2)
+    futures = [writer.submit(_entry(v)) for v in ("1", "2", "1", "3")]
+    writer.stop()
+
+    assert batch_sizes == [3]
+    assert [futures[i].result()["index"] for i in (0, 1, 3)] == [1, 2, 3]
+    with pytest.raises(DuplicateRecordError):
+        futures[2].result()
+    assert ledger.verify_chain(full=True) == (True, None, None)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = str(ROOT / "scripts" / "hash_benchmark_suite.py")
+SMALL_ARGS = [
+    "--file-mib", "0.5", "--chunk-sizes", "65536,262144", "--many-files", "3",
+    "--many-file-mib", "0.25", "--threads", "1,2", "--repeat", "1",
+]
+
+
+def _run(tmp_path: Path, *extra: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, SCRIPT, *SMALL_ARGS, "--workdir", str(tmp_path / "work"), *extra],
+        env={"PYTHONPATH": str(ROOT)}, capture_output=True, text=True, cwd=tmp_path,
+    )
+
+
+def test_suite_writes_results_and_compares_with_baseline(tmp_path):
+    first = _run(tmp_path, "--output", "first.json")
+    assert first.returncode == 0, first.stderr
+    report = json.loads((tmp_path / "first.json").read_text(encoding="utf-8"))
+    names = {r["name"] for r in report["results"]}
+    assert {"read", "readinto", "mmap", "sha256_file_path", "many_files_sequential",
+            "many_files_threadpool", "sha256_upload_file", "stream_hash_form"} <= names
+    assert len([r for r in report["results"] if r["name"] == "mmap"]) == 2
+    assert all(r["mib_per_s"] > 0 for r in report["results"])
+
+    # 基準より大幅に速い値を置いた baseline との比較は退行として失敗する
+    for result in report["results"]:
+        result["mib_per_s"] *= 1000
+    (tmp_path / "fast.json").write_text(json.dumps(report), encoding="utf-8")
+    second = _run(
+        tmp_path, "--output", "second.json", "--baseline", "fast.json", "--fail-on-regression"
+    )
+    assert second.returncode == 1
+    comparison = json.loads((tmp_path / "second.json").read_text(encoding="utf-8"))["comparison"]
+    assert len(comparison["rows"]) == len(report["results"])
+    assert all(row["regressed"] for row in comparison["rows"])
@@ -1,9 +1,13 @@
 ﻿from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
 
+import pytest
+
 from app import ledger
+from app.ledger_store import SegmentedLedgerStore
 from tests.test_utils import write_test_keys
 
 
@@ -29,11 +33,13 @@ def test_verify_detects_signature_invalid(tmp_path, monkeypatch):
     ledger.ensure_ledger_exists()
     ledger.append_record("sample", "1.0.0", "", "aa" * 32, 10, "a.bin")
 
-    p = Path("data/ledger.json")
-    data = json.loads(p.read_text(encoding="utf-8"))
-    sig = data["blocks"][-1]["signature"]
-    data["blocks"][-1]["signature"] = ("A" if sig[0] != "A" else "B") + sig[1:]
-    p.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    p = SegmentedLedgerStore(Path("data/ledger.json")).data_files()[-1]
+    lines = p.read_text(encoding="utf-8").splitlines()
+    block = json.loads(lines[-1])
+    sig = block["signature"]
+    block["signature"] = ("A" if sig[0] != "A" else "B") + sig[1:]
+    lines[-1] = json.dumps(block, ensure_ascii=False)
+    p.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
     ok, index, reason = ledger.verify_chain()
     assert ok is False
@@ -51,3 +57,184 @@ def test_anchor_regenerated_on_startup(tmp_path, monkeypatch):
 
     ledger.ensure_ledger_exists()
     assert anchor_path.exists()
+
+
+def test_verify_uses_checkpoint_and_falls_back_on_tamper(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+
+    ledger.ensure_ledger_exists()
+    ledger.append_record("sample", "1.0.0", "", "aa" * 32, 10, "a.bin")
+    ledger.append_record("sample", "1.0.1", "", "bb" * 32, 10, "b.bin")
+
+    checkpoint = json.loads(ledger.VERIFIED_CHECKPOINT_PATH.read_text(encoding="utf-8"))
+    assert checkpoint["verified_index"] == 2
+
+    calls: list[int] = []
+    original = ledger._verify_block_sequence
+
+    def counting(blocks, start, *args):
+        calls.append(len(blocks))
+        return original(blocks, start, *args)
+
+    monkeypatch.setattr(ledger, "_verify_block_sequence", counting)
+    assert ledger.verify_chain() == (True, None, None)
+    assert calls == [0]
+    assert ledger.verify_chain(full=True) == (True, None, None)
+    assert calls == [0, 3]
+
+    # 検証済み範囲内の改ざん（同一サイズ）はチェックポイントを無効化し全件検証で検知する
+    p = SegmentedLedgerStore(Path("data/ledger.json")).data_files()[-1]
+    lines = p.read_text(encoding="utf-8").splitlines()
+    block = json.loads(lines[1])
+    block["entry"]["name"] = "sampla"
+    lines[1] = json.dumps(block, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    p.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    assert ledger.verify_chain() == (False, 1, "block_hash_mismatch")
+    assert calls[-1] == 3
+
+
+def test_periodic_checkpoints_bound_verification(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(ledger, "CHECKPOINT_INTERVAL", 2)
+
+    ledger.ensure_ledger_exists()
+    for i in range(5):
+        ledger.append_record("sample", f"1.0.{i}", "", f"{i:02x}" * 32, 10, "a.bin")
+
+    checkpoints = ledger.load_checkpoints()
+    assert [(cp["index"], cp["block_count"], cp["record_count"]) for cp in checkpoints] == [
+        (1, 2, 1),
+        (3, 4, 3),
+        (5, 6, 5),
+    ]
+    assert ledger.verify_between_checkpoints(None, 5) == (True, None, None)
+    assert ledger.verify_between_checkpoints(1, 3) == (True, None, None)
+
+    calls: list[int] = []
+    original = ledger._verify_block_sequence
+
+    def counting(blocks, start, *args):
+        blocks = list(blocks)
+        calls.append(len(blocks))
+        return original(blocks, start, *args)
+
+    monkeypatch.setattr(ledger, "_verify_block_sequence", counting)
+
+    # 定期チェックポイント以降だけの検証は明示した場合のみ。既定では全件検証へ戻る
+    ledger.VERIFIED_CHECKPOINT_PATH.unlink()
+    assert ledger.verify_chain(from_checkpoint=ledger.LATEST_CHECKPOINT) == (True, None, None)
+    assert calls == [0]
+    assert not ledger.VERIFIED_CHECKPOINT_PATH.exists()
+    assert ledger.verify_chain(from_checkpoint=3) == (True, None, None)
+    assert calls == [0, 2]
+    assert ledger.verify_chain() == (True, None, None)
+    assert calls == [0, 2, 6]
+
+    p = SegmentedLedgerStore(Path("data/ledger.json")).data_files()[-1]
+    lines = p.read_text(encoding="utf-8").splitlines()
+    block = json.loads(lines[2])
+    block["entry"]["name"] = "sampla"
+    lines[2] = json.dumps(block, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    p.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    # 既定の検証は改ざんを検知する（チェックポイント以前も含む）
+    assert ledger.verify_chain() == (False, 2, "block_hash_mismatch")
+    assert ledger.verify_chain(full=True) == (False, 2, "block_hash_mismatch")
+    assert ledger.verify_between_checkpoints(1, 3) == (False, 2, "block_hash_mismatch")
+    assert ledger.verify_between_checkpoints(3, 5) == (True, None, None)
+    assert ledger.verify_chain(from_checkpoint=1) == (False, 2, "block_hash_mismatch")
+    # 明示的に信頼したチェックポイントより前は検証しない
+    assert ledger.verify_chain(from_checkpoint=ledger.LATEST_CHECKPOINT) == (True, None, None)
+    with pytest.raises(ValueError):
+        ledger.verify_chain(from_checkpoint=2)
+
+
+def test_load_ledger_cache_tracks_appends_and_external_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+
+    ledger.ensure_ledger_exists()
+    cached = ledger.load_ledger()
+    assert ledger.load_ledger() is cached
+
+    ledger.append_record("sample", "1.0.0", "", "aa" * 32, 10, "a.bin")
+    assert ledger.load_ledger() is cached
+    assert [b["index"] for b in cached["blocks"]] == [0, 1]
+
+    store = SegmentedLedgerStore(Path("data/ledger.json"))
+    store.rewrite(store.header(), cached["blocks"][:1])
+    reloaded = ledger.load_ledger()
+    assert reloaded is not cached
+    assert len(reloaded["blocks"]) == 1
+
+
+def test_ledger_index_follows_appends(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+
+    ledger.ensure_ledger_exists()
+    ledger.append_record("sample", "1.0.0", "", "aa" * 32, 10, "a.bin")
+    _, index = ledger.load_indexed_ledger()
+    assert index.find_name_version("sample", "1.0.0") == 1
+
+    ledger.append_record("sample", "1.0.1", "", "aa" * 32, 10, "a.bin")
+    ledger.append_record("other", "2.0.0", "", "bb" * 32, 10, "b.bin")
+    _, same_index = ledger.load_indexed_ledger()
+    assert same_index is index
+    assert index.find_sha256("aa" * 32) == [1, 2]
+    assert index.find_name_version("other", "2.0.0") == 3
+    assert index.find_name_version("other", "9.9.9") is None
+    assert index.versions("sample") == ["1.0.0", "1.0.1"]
+
+
+def test_ledger_lock_is_reentrant_and_serializes_appends(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    ledger.ensure_ledger_exists()
+    before = ledger.lock_wait_stats()["acquisitions"]
+
+    with ledger.ledger_lock():
+        # 同一スレッドからの再入（append_records 内の取得）で待たない
+        ledger.append_record("nested", "1.0.0", "", "aa" * 32, 10, "a.bin")
+    assert ledger.lock_wait_stats()["acquisitions"] > before
+
+    def register(n: int) -> None:
+        ledger.append_record(f"pkg-{n}", "1.0.0", "", "bb" * 32, 10, "b.bin")
+
+    threads = [threading.Thread(target=register, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    blocks = ledger.load_ledger()["blocks"]
+    assert [b["index"] for b in blocks] == list(range(10))
+    assert ledger.verify_chain(full=True) == (True, None, None)
+
+
+def test_checkpoints_file_read_only_when_crossing_boundary(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(ledger, "CHECKPOINT_INTERVAL", 3)
+    ledger.ensure_ledger_exists()
+
+    reads: list[int] = []
+    original = ledger.load_checkpoints
+
+    def counting():
+        reads.append(1)
+        return original()
+
+    monkeypatch.setattr(ledger, "load_checkpoints", counting)
+    ledger.append_record("sample", "1.0.0", "", "aa" * 32, 10, "a.bin")
+    assert reads == []
+    ledger.append_record("sample", "1.0.1", "", "bb" * 32, 10, "a.bin")
+    assert len(reads) == 1
+    ledger.append_records(
+        [ledger._build_record_entry("sample", f"2.0.{i}", "cc" * 32, 10, "a.bin") for i in range(4)]
+    )
+    assert len(reads) == 2
+    assert [cp["index"] for cp in original()] == [2, 5]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from app import ledger
+from app.ledger_store import SegmentedLedgerStore
+from tests.test_utils import write_test_keys
+
+
+def _blocks(count: int) -> list[dict]:
+    return [{"index": i, "entry": {"type": "record", "n": i}} for i in range(count)]
+
+
+def test_append_rolls_segments_and_reads_back(tmp_path):
+    store = SegmentedLedgerStore(tmp_path / "ledger.json", segment_max_blocks=3)
+    blocks = _blocks(8)
+    store.rewrite({"schema_version": "0.2"}, blocks[:2])
+    store.append(blocks[2:5])
+    store.append(blocks[5:])
+
+    assert len(store.data_files()) == 1 + 3
+    assert store.read()["blocks"] == blocks
+    assert list(store.iter_blocks(start=6)) == blocks[6:]
+    assert store.tail() == (8, blocks[-1])
+
+
+def test_append_truncates_partial_tail_line(tmp_path):
+    store = SegmentedLedgerStore(tmp_path / "ledger.json")
+    blocks = _blocks(3)
+    store.rewrite({"schema_version": "0.2"}, blocks[:2])
+    segment = store.data_files()[-1]
+    with segment.open("ab") as f:
+        f.write(b'{"index":2,"ent')
+
+    assert store.tail() == (2, blocks[1])
+    store.append(blocks[2:])
+    assert store.read()["blocks"] == blocks
+
+
+def test_legacy_ledger_is_converted_on_startup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+
+    ledger.ensure_ledger_exists()
+    legacy = ledger.load_ledger()
+    Path("data/ledger.json").write_text(json.dumps(legacy, indent=2) + "\n", encoding="utf-8")
+    assert SegmentedLedgerStore(Path("data/ledger.json")).is_legacy()
+
+    ledger.ensure_ledger_exists()
+    ledger.append_record("sample", "1.0.0", "", "aa" * 32, 10, "a.bin")
+
+    assert not SegmentedLedgerStore(Path("data/ledger.json")).is_legacy()
+    assert ledger.verify_chain() == (True, None, None)
+    assert len(ledger.load_ledger()["blocks"]) == 2
+
+
+def test_hot_path_file_system_calls_do_not_grow_with_segments(tmp_path, monkeypatch):
+    store = SegmentedLedgerStore(tmp_path / "ledger.json", segment_max_blocks=2)
+    blocks = _blocks(81)
+    store.rewrite({"schema_version": "0.2"}, blocks[:1])
+    calls = {"listdir": 0, "stat": 0}
+    listdir, stat = os.listdir, os.stat
+
+    def counting_listdir(*args, **kwargs):
+        calls["listdir"] += 1
+        return listdir(*args, **kwargs)
+
+    def counting_stat(*args, **kwargs):
+        calls["stat"] += 1
+        return stat(*args, **kwargs)
+
+    def append_one(index: int) -> dict[str, int]:
+        # 追記時と同じ呼び出し（照合・末尾・追記・キャッシュ同一性・照合キー）
+        state = store.state()
+        calls.update(listdir=0, stat=0)
+        assert store.state_extends(state)
+        store.tail()
+        store.identity()
+        store.append(blocks[index : index + 1])
+        store.identity()
+        store.state()
+        return dict(calls)
+
+    monkeypatch.setattr(os, "listdir", counting_listdir)
+    monkeypatch.setattr(os, "stat", counting_stat)
+    for index in range(1, 11):
+        store.append(blocks[index : index + 1])
+    few = append_one(11)
+    for index in range(12, 79):
+        store.append(blocks[index : index + 1])
+    # 次のセグメントを作らない追記で比べる（40 セグメントでも 5 セグメントと同じ）
+    many = append_one(79)
+    assert many == few
+    assert many["listdir"] == 0
+    assert store.read()["blocks"] == blocks[:80]
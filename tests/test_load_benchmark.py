@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = str(ROOT / "scripts" / "load_benchmark.py")
+
+
+def test_load_benchmark_reports_every_endpoint_per_mode(tmp_path):
+    completed = subprocess.run(
+        [sys.executable, SCRIPT, "run", "--sizes", "30", "--requests", "4",
+         "--concurrency", "2", "--workdir", "work", "--output", "out.json"],
+        cwd=tmp_path, capture_output=True, text=True,
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    report = json.loads((tmp_path / "out.json").read_text(encoding="utf-8"))
+    assert [(r["size"], r["mode"]) for r in report["results"]] == [
+        (30, "inprocess"), (30, "uvicorn")
+    ]
+    for result in report["results"]:
+        assert set(result["endpoints"]) == {
+            "register", "verify", "list", "ledger_verify", "anchors_latest"
+        }
+        for stats in result["endpoints"].values():
+            assert stats["requests"] == 4 and stats["errors"] == 0
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert result["endpoints"]["register"]["lock_wait"]["acquisitions"] > 0
+
+    # 合成済みの台帳は再利用し、計測は毎回複製に対して行う
+    marker = json.loads((tmp_path / "work/base-segmented-30/synth.json").read_text())
+    assert marker["size"] == 30
+    blocks = list((tmp_path / "work/base-segmented-30/data/ledger.segments").rglob("*.jsonl"))
+    assert sum(len(p.read_text().splitlines()) for p in blocks) == 30
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+from app.crypto_keys import get_verifier
+from app.merkle import (
+    MerkleTree,
+    frontier_append,
+    frontier_root,
+    leaf_hash,
+    signed_root_digest,
+    verify_consistency,
+    verify_inclusion,
+)
+from tests.test_api import _create_client
+
+
+def _leaves(n: int) -> list[bytes]:
+    return [leaf_hash(hashlib.sha256(str(i).encode()).hexdigest()) for i in range(n)]
+
+
+def test_frontier_matches_tree_and_proofs_verify():
+    leaves = _leaves(33)
+    tree = MerkleTree()
+    frontier: list[bytes] = []
+    size = 0
+    for leaf in leaves:
+        tree.append(leaf)
+        size = frontier_append(frontier, size, [leaf])
+        assert frontier_root(frontier) == tree.root()
+
+    for n in (1, 2, 7, 8, 33):
+        root = tree.root(n)
+        for i in range(n):
+            proof = tree.inclusion_proof(i, n)
+            assert verify_inclusion(leaves[i], i, n, proof, root)
+            assert not verify_inclusion(leaves[(i + 1) % 33], i, n, proof, root)
+        for m in range(1, n + 1):
+            proof = tree.consistency_proof(m, n)
+            assert verify_consistency(m, n, proof, tree.root(m), root)
+            if m < n:
+                assert not verify_consistency(m, n, proof, tree.root(m), tree.root(n - 1))
+
+
+def test_merkle_api_serves_signed_root_and_proofs(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+    for i in range(5):
+        files = {"file": (f"{i}.bin", f"data-{i}".encode(), "application/octet-stream")}
+        r = client.post(
+            "/api/v1/records/register", data={"name": "m", "version": str(i)}, files=files
+        )
+        assert r.status_code == 201
+
+    r = client.get("/api/v1/merkle/root")
+    assert r.status_code == 200
+    anchor = r.json()
+    assert anchor["tree_size"] == 6
+    assert "frontier" not in anchor
+    verifier = get_verifier("keys/public_key.pem")
+    assert verifier.verify(
+        signed_root_digest(anchor["tree_size"], anchor["root_hash"]), anchor["signature"]
+    )
+
+    r = client.get("/api/v1/merkle/inclusion", params={"index": 3})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["root_hash"] == anchor["root_hash"]
+    proof = [bytes.fromhex(node) for node in body["audit_path"]]
+    assert verify_inclusion(
+        leaf_hash(body["block_hash"]), 3, 6, proof, bytes.fromhex(anchor["root_hash"])
+    )
+
+    r = client.get("/api/v1/merkle/consistency", params={"first": 2})
+    assert r.status_code == 200
+    body = r.json()
+    assert verify_consistency(
+        2,
+        6,
+        [bytes.fromhex(node) for node in body["proof"]],
+        bytes.fromhex(body["first_root_hash"]),
+        bytes.fromhex(anchor["root_hash"]),
+    )
+
+    assert client.get("/api/v1/merkle/inclusion", params={"index": 6}).status_code == 400
+
+
+def test_tampered_frontier_is_rebuilt_on_append(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+
+    def register(i: int) -> None:
+        files = {"file": (f"{i}.bin", f"data-{i}".encode(), "application/octet-stream")}
+        r = client.post(
+            "/api/v1/records/register", data={"name": "t", "version": str(i)}, files=files
+        )
+        assert r.status_code == 201
+
+    for i in range(3):
+        register(i)
+    anchor_path = tmp_path / "anchors/merkle.json"
+    anchor = json.loads(anchor_path.read_text(encoding="utf-8"))
+    # 署名対象外の frontier だけを書き換える
+    anchor["frontier"][0] = "00" * 32
+    anchor_path.write_text(json.dumps(anchor), encoding="utf-8")
+
+    register(3)
+    tree = MerkleTree()
+    segments = sorted((tmp_path / "data/ledger.segments").rglob("*.jsonl"))
+    for line in (line for p in segments for line in p.read_text().splitlines()):
+        tree.append(leaf_hash(json.loads(line)["block_hash"]))
+    root = client.get("/api/v1/merkle/root").json()
+    assert root["tree_size"] == 5
+    assert root["root_hash"] == tree.root().hex()
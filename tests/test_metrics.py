@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import re
+
+from app import metrics
+from app.audit import flush_audit_log
+from tests.test_api import _create_client
+
+
+def _sample(text: str, name: str, labels: str = "") -> float:
+    pattern = rf"^{re.escape(name + labels)} (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    assert match is not None, f"{name}{labels} not found"
+    return float(match.group(1))
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test.", ("kind",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, ("a",))
+    lines = histogram.render()
+    assert 'test_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{kind="a",le="1"} 3' in lines
+    assert 'test_seconds_bucket{kind="a",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{kind="a"} 4.05' in lines
+    assert 'test_seconds_count{kind="a"} 4' in lines
+    assert histogram.snapshot(("a",)) == (4, 4.05)
+
+
+def test_metrics_endpoint_reports_routes_and_ledger_phases(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+    with client:
+        files = {"file": ("a.bin", b"abc", "application/octet-stream")}
+        data = {"name": "sample", "version": "1.0.0"}
+        assert client.post("/api/v1/records/register", data=data, files=files).status_code == 201
+        assert client.post("/api/v1/ledger/verify").status_code == 200
+        assert client.get("/api/v1/no-such-route").status_code == 404
+
+        assert flush_audit_log(timeout=5)
+        r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+
+    register = '{method="POST",route="/api/v1/records/register"}'
+    assert _sample(text, "checksum_registry_http_request_duration_seconds_count", register) >= 1
+    assert _sample(
+        text,
+        "checksum_registry_http_requests_total",
+        '{method="GET",route="unmatched",status="404"}',
+    ) >= 1
+    assert _sample(text, "checksum_registry_ledger_lock_wait_seconds_count") >= 1
+    verify = '{mode="incremental"}'
+    assert _sample(text, "checksum_registry_verify_chain_seconds_count", verify) >= 1
+    assert _sample(
+        text, "checksum_registry_upload_hash_bytes_total", '{path="multipart_stream"}'
+    ) >= 3
+    assert _sample(
+        text, "checksum_registry_atomic_write_bytes_total", '{file="latest.json"}'
+    ) > 0
+    assert _sample(text, "checksum_registry_ledger_blocks") == 2
+    assert _sample(text, "checksum_registry_ledger_file_bytes") > 0
+    assert _sample(text, "checksum_registry_audit_queued") >= 0
+    assert _sample(text, "checksum_registry_audit_dropped") == 0
+    assert _sample(text, "checksum_registry_audit_written") >= 1
@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 
 from app.ledger import verify_chain
+from app.ledger_store import SegmentedLedgerStore
 from app.migration import migrate_v01_to_v02
 from tests.test_utils import write_test_keys
 
@@ -47,7 +48,7 @@ def test_migrate_v01_to_v02(tmp_path, monkeypatch):
 
     migrate_v01_to_v02(src, Path("data/ledger.json"), Path("anchors/latest.json"))
 
-    migrated = json.loads(Path("data/ledger.json").read_text(encoding="utf-8"))
+    migrated = SegmentedLedgerStore(Path("data/ledger.json")).read()
     assert migrated["schema_version"] == "0.2"
     assert len(migrated["blocks"]) == 2
     assert "signature" in migrated["blocks"][0]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import copy
+from pathlib import Path
+
+import pytest
+
+from app import ledger, parallel_verify
+from app.ledger_store import SegmentedLedgerStore
+from tests.test_utils import write_test_keys
+
+
+def _build_ledger(tmp_path, monkeypatch, records: int) -> dict:
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(parallel_verify, "MIN_PARALLEL_BLOCKS", 1)
+    ledger.ensure_ledger_exists()
+    for i in range(records):
+        ledger.append_record("sample", f"1.0.{i}", "", f"{i:064x}", 10, "a.bin")
+    return copy.deepcopy(ledger.load_ledger())
+
+
+@pytest.mark.parametrize(
+    ("index", "field", "value"),
+    [
+        (3, "prev_hash", "f" * 64),
+        (4, "prev_hash", "f" * 64),
+        (4, "signature", ""),
+        (5, "block_hash", "0" * 64),
+        (6, "index", 99),
+    ],
+)
+def test_parallel_matches_sequential_result(tmp_path, monkeypatch, index, field, value):
+    data = _build_ledger(tmp_path, monkeypatch, 7)
+    data["blocks"][index][field] = value
+    data["blocks"][6]["signature"] = ""
+
+    expected = ledger.verify_chain(data)
+    assert expected[0] is False
+    assert parallel_verify.verify_chain_parallel(data, workers=2, chunk_blocks=2) == expected
+
+
+def test_parallel_verifies_segments_on_disk(tmp_path, monkeypatch):
+    data = _build_ledger(tmp_path, monkeypatch, 6)
+    SegmentedLedgerStore(Path("data/ledger.json"), segment_max_blocks=2).rewrite(
+        data, data["blocks"]
+    )
+    assert parallel_verify.verify_chain_parallel(workers=2, chunk_blocks=2) == (True, None, None)
+
+    segment = SegmentedLedgerStore(Path("data/ledger.json")).data_files()[2]
+    lines = segment.read_text(encoding="utf-8").splitlines()
+    segment.write_text(lines[0] + "\n", encoding="utf-8")
+    assert parallel_verify.verify_chain_parallel(workers=2, chunk_blocks=2) == (
+        False,
+        3,
+        "index_mismatch",
+    )
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from app import profiling
+from tests.test_api import _create_client
+
+
+def _register(client, version: str, headers=None):
+    files = {"file": ("a.bin", version.encode(), "application/octet-stream")}
+    data = {"name": "sample", "version": version}
+    return client.post("/api/v1/records/register", data=data, files=files, headers=headers)
+
+
+def test_slow_request_log_records_phase_breakdown(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "SLOW_REQUEST_SECONDS", 1e-9)
+    client = _create_client(tmp_path, monkeypatch)
+    with client:
+        assert _register(client, "1.0.0").status_code == 201
+
+    lines = Path("logs/slow_requests.jsonl").read_text(encoding="utf-8").splitlines()
+    entries = [json.loads(line) for line in lines]
+    register = next(e for e in entries if e["route"] == "/api/v1/records/register")
+    assert register["status"] == 201
+    assert "profile_id" not in register
+    # 書き込みスレッドでのコミットの内訳も要求側に加わる
+    assert {
+        "upload_hash:multipart_stream",
+        "group_commit_wait",
+        "lock_wait",
+        "ledger_append",
+        "atomic_write:latest.json",
+    } <= set(register["phases"])
+    assert any(name.startswith("verify_chain:") for name in register["phases"])
+    assert all(p["count"] >= 1 for p in register["phases"].values())
+
+
+def test_header_triggered_profile_is_saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TRIGGERS", frozenset({"header"}))
+    monkeypatch.setattr(profiling, "SLOW_REQUEST_SECONDS", 0.0)
+    client = _create_client(tmp_path, monkeypatch)
+    with client:
+        assert "x-profile-id" not in _register(client, "1.0.0").headers
+        r = _register(client, "2.0.0", headers={"X-Profile": "1"})
+    assert r.status_code == 201
+    profile_id = r.headers["x-profile-id"]
+
+    summary = json.loads((profiling.PROFILE_DIR / f"{profile_id}.json").read_text("utf-8"))
+    assert summary["profile_id"] == profile_id
+    assert summary["route"] == "/api/v1/records/register"
+    assert "ledger_append" in summary["phases"]
+    folded = (profiling.PROFILE_DIR / f"{profile_id}.folded").read_text(encoding="utf-8")
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
+    assert not Path("logs/slow_requests.jsonl").exists()
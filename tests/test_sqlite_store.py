@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import ledger
+from app.backup_restore import perform_backup, restore_backup
+from app.ledger_store import SegmentedLedgerStore, _block_line
+from app.sqlite_store import SqliteLedgerStore
+from tests.test_api import _create_client
+from tests.test_utils import write_test_keys
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _append_samples(count: int) -> None:
+    for i in range(count):
+        ledger.append_record("sample", f"1.0.{i}", "", f"{i:02x}" * 32, 10 + i, f"{i}.bin")
+
+
+def test_sqlite_backend_appends_verifies_and_queries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(ledger, "LEDGER_BACKEND", "sqlite")
+
+    ledger.ensure_ledger_exists()
+    _append_samples(3)
+    assert not Path("data/ledger.json").exists()
+    assert ledger.verify_chain(full=True) == (True, None, None)
+    assert ledger.verify_chain() == (True, None, None)
+
+    store = SqliteLedgerStore(Path("data/ledger.sqlite3"))
+    found = store.find_blocks(sha256="01" * 32)
+    assert [b["index"] for b in found] == [2]
+    assert [b["index"] for b in store.find_blocks(name="sample", version="1.0.2")] == [3]
+
+    # 別プロセスの追記相当: キャッシュは増分だけを読み足す
+    cached = ledger.load_ledger()
+    block = ledger._build_signed_block(
+        ledger._build_block_body(4, "2026-01-01T00:00:00Z", cached["blocks"][-1]["block_hash"], {})
+    )
+    store.append([block])
+    assert ledger.load_ledger() is cached
+    assert cached["blocks"][-1] == block
+
+    conn = sqlite3.connect("data/ledger.sqlite3")
+    with pytest.raises(sqlite3.DatabaseError):
+        conn.execute("UPDATE blocks SET block = '{}' WHERE idx = 1")
+    with pytest.raises(sqlite3.DatabaseError):
+        conn.execute("DELETE FROM blocks WHERE idx = 1")
+    conn.close()
+
+
+def test_convert_between_backends_keeps_blocks_identical(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+
+    ledger.ensure_ledger_exists()
+    _append_samples(3)
+    blocks = list(SegmentedLedgerStore(ledger.LEDGER_PATH).iter_blocks())
+
+    script = str(ROOT / "scripts" / "convert_ledger.py")
+    env = {"PYTHONPATH": str(ROOT)}
+    subprocess.run(
+        [sys.executable, script, "--to", "sqlite", "--src", "data/ledger.json",
+         "--dst", "data/ledger.sqlite3"],
+        check=True, env=env, capture_output=True,
+    )
+    converted = list(SqliteLedgerStore(Path("data/ledger.sqlite3")).iter_blocks())
+    assert [_block_line(b) for b in converted] == [_block_line(b) for b in blocks]
+
+    monkeypatch.setattr(ledger, "LEDGER_BACKEND", "sqlite")
+    assert ledger.verify_chain(full=True) == (True, None, None)
+    backup_dir = perform_backup(Path("backups"))
+    assert (backup_dir / "data/ledger.sqlite3").exists()
+
+    monkeypatch.setattr(ledger, "LEDGER_BACKEND", "segmented")
+    restore_backup(backup_dir)
+    assert list(SegmentedLedgerStore(ledger.LEDGER_PATH).iter_blocks()) == blocks
+
+
+def test_sqlite_verified_checkpoint_detects_rewritten_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(ledger, "LEDGER_BACKEND", "sqlite")
+
+    ledger.ensure_ledger_exists()
+    _append_samples(4)
+    assert ledger.verify_chain() == (True, None, None)
+
+    # トリガーを外して途中の行を書き換える（block_hash 列と末尾はそのまま）
+    conn = sqlite3.connect("data/ledger.sqlite3")
+    conn.execute("DROP TRIGGER blocks_no_update")
+    text = conn.execute("SELECT block FROM blocks WHERE idx = 2").fetchone()[0]
+    conn.execute("UPDATE blocks SET block = ? WHERE idx = 2", (text.replace("1.0.1", "9.9.9"),))
+    conn.commit()
+    conn.close()
+
+    assert ledger.verify_chain() == (False, 2, "block_hash_mismatch")
+    assert ledger.verify_chain(full=True) == (False, 2, "block_hash_mismatch")
+
+
+def test_sqlite_lookups_use_indexed_queries(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHECKSUM_REGISTRY_LEDGER_BACKEND", "sqlite")
+    # 再読込で変わるモジュール属性を終了時に元へ戻す
+    monkeypatch.setattr(ledger, "LEDGER_BACKEND", "sqlite")
+    client = _create_client(tmp_path, monkeypatch)
+    with client:
+        for version in ("1.0.0", "1.0.1", "1.0.2"):
+            files = {"file": ("a.bin", version.encode(), "application/octet-stream")}
+            r = client.post(
+                "/api/v1/records/register", data={"name": "app", "version": version}, files=files
+            )
+            assert r.status_code == 201
+
+        # 台帳全体とメモリ上のインデックスを使わずに答える
+        def fail():
+            raise AssertionError("full ledger load")
+
+        monkeypatch.setattr(ledger, "load_indexed_ledger", fail)
+        files = {"file": ("a.bin", b"1.0.1", "application/octet-stream")}
+        r = client.post("/api/v1/records/verify", files=files)
+        assert r.status_code == 200 and r.json()["version"] == "1.0.1"
+        r = client.post(
+            "/api/v1/records/register", data={"name": "app", "version": "1.0.1"}, files=files
+        )
+        assert r.status_code == 409
+        r = client.get("/api/v1/records", params={"name": "app", "limit": 2})
+        assert [item["version"] for item in r.json()["items"]] == ["1.0.0", "1.0.1"]
+        cursor = r.json()["next_cursor"]
+        r = client.get("/api/v1/records", params={"name": "app", "cursor": cursor})
+        assert [item["version"] for item in r.json()["items"]] == ["1.0.2"]
+        assert r.json()["next_cursor"] is None
+
+
+def test_sqlite_append_reads_constant_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_test_keys(tmp_path)
+    monkeypatch.setattr(ledger, "LEDGER_BACKEND", "sqlite")
+    ledger.ensure_ledger_exists()
+    _append_samples(3)
+
+    rows_read = 0
+    connect = SqliteLedgerStore._connect
+
+    def counting_connect(self):
+        conn = connect(self)
+
+        def factory(cursor, row):
+            nonlocal rows_read
+            rows_read += 1
+            return row
+
+        conn.row_factory = factory
+        return conn
+
+    monkeypatch.setattr(SqliteLedgerStore, "_connect", counting_connect)
+
+    def rows_per_append(version: str) -> int:
+        nonlocal rows_read
+        rows_read = 0
+        ledger.append_record("sample", version, "", "ab" * 32, 1, "a.bin")
+        return rows_read
+
+    small = rows_per_append("2.0.0")
+    for i in range(40):
+        ledger.append_record("bulk", str(i), "", "cd" * 32, 1, "b.bin")
+    # 追記ごとに読む行数は台帳の大きさによらない
+    assert rows_per_append("2.0.1") == small
+    assert ledger.verify_chain(full=True) == (True, None, None)
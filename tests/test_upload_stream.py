@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app import upload_stream
+from app.hashing import CHUNK_SIZE
+from app.upload_stream import MultipartFormError, UploadTooLargeError, stream_hash_form
+from tests.test_api import _create_client
+
+BOUNDARY = "test-boundary"
+
+
+def _multipart(parts: list[tuple[str, str | None, bytes]]) -> bytes:
+    body = bytearray()
+    for name, filename, data in parts:
+        body += f"--{BOUNDARY}\r\n".encode()
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += f"Content-Disposition: {disposition}\r\n\r\n".encode()
+        body += data + b"\r\n"
+    body += f"--{BOUNDARY}--\r\n".encode()
+    return bytes(body)
+
+
+def _stream(body: bytes, chunk_size: int):
+    async def gen():
+        for i in range(0, len(body), chunk_size):
+            yield body[i : i + chunk_size]
+
+    return gen()
+
+
+def test_stream_hash_form_hashes_files_across_chunk_boundaries():
+    big = bytes(range(256)) * (CHUNK_SIZE // 256 * 2 + 7)
+    body = _multipart(
+        [("name", None, "パッケージ".encode()), ("file", "a.bin", big), ("file", "b.bin", b"")]
+    )
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+    form = asyncio.run(stream_hash_form(headers, _stream(body, 65536)))
+
+    assert form.get("name") == "パッケージ"
+    files = form.file_list("file")
+    assert [f.filename for f in files] == ["a.bin", "b.bin"]
+    assert files[0].sha256 == hashlib.sha256(big).hexdigest()
+    assert files[0].size_bytes == len(big)
+    assert files[1].sha256 == hashlib.sha256(b"").hexdigest()
+    assert form.throughput()["bytes"] == len(big)
+
+
+def test_stream_hash_form_rejects_oversized_upload():
+    body = _multipart([("file", "a.bin", b"x" * 4096)])
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(stream_hash_form(headers, _stream(body, 1024), max_bytes=4095))
+
+
+def test_register_rejects_upload_over_max_size(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+    monkeypatch.setattr(upload_stream, "MAX_UPLOAD_BYTES", 16)
+
+    files = {"file": ("a.bin", b"x" * 17, "application/octet-stream")}
+    r = client.post("/api/v1/records/register", data={"name": "s", "version": "1"}, files=files)
+    assert r.status_code == 413
+    assert r.json()["error"]["code"] == "PAYLOAD_TOO_LARGE"
+
+    files = {"file": ("a.bin", b"x" * 16, "application/octet-stream")}
+    r = client.post("/api/v1/records/register", data={"name": "s", "version": "1"}, files=files)
+    assert r.status_code == 201
+    assert r.json()["file_size_bytes"] == 16
+
+
+def test_register_rejects_malformed_multipart_body(tmp_path, monkeypatch):
+    client = _create_client(tmp_path, monkeypatch)
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+    for body in (b"not a multipart body", b"--other-boundary\r\nX\r\n\r\n"):
+        r = client.post("/api/v1/records/register", content=body, headers=headers)
+        assert r.status_code == 400
+        assert r.json()["error"]["code"] == "INVALID_REQUEST"
+
+    # 受信途中の切断
+    async def disconnected():
+        yield _multipart([("file", "a.bin", b"x" * 10)])[:40]
+        raise ClientDisconnect()
+
+    with pytest.raises(MultipartFormError):
+        asyncio.run(stream_hash_form(headers, disconnected()))